@@ -0,0 +1,32 @@
+"""
+Async data-access layer concerned with the ``file_changes`` table.
+
+The change log is an append-only, per-owner feed of file and folder
+changes written by database triggers (see ``ini/03-files.sql``); this
+package only reads and compacts it.  Every owner's changes are numbered by
+a monotonic ``seq`` that doubles as the client's sync cursor.
+
+Public API
+----------
+Read
+    list_changes
+
+Delete
+    compact_changes
+
+Exceptions re-exported for callers
+-----------------------------------
+``ChangeOwnerNotFoundError``, ``ChangeError``
+(imported from ``.exceptions``).
+"""
+
+from ._read import list_changes
+from ._delete import compact_changes
+
+
+__all__ = [
+    # Read
+    "list_changes",
+    # Delete
+    "compact_changes",
+]
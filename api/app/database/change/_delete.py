@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from uuid import UUID
+from asyncpg import Connection
+
+
+async def compact_changes(
+    *,
+    conn: Connection,
+    retain: timedelta,
+    owner_id: UUID | None = None,
+) -> int:
+    """Bound the change log: drop superseded changes and those older than *retain*.
+
+    Runs ``fn_compact_file_changes`` per owner, each in its own transaction.
+    Dropping a superseded change never invalidates a cursor, because
+    readers always receive the subject's current state with its latest
+    change.  Expiry drops every change below the oldest one still inside
+    *retain* (``changed_at`` is not monotonic in ``seq``, so only a prefix
+    is ever removed) and raises the owner's ``change_floor`` to the highest
+    ``seq`` dropped, so clients holding an older cursor are told to resync.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    retain:
+        How long changes are kept.
+    owner_id:
+        Owner to compact, or ``None`` for every owner with retained changes.
+
+    Returns
+    -------
+    int
+        Number of change rows removed.
+    """
+    if owner_id is None:
+        owner_ids = [
+            row["user_id"]
+            for row in await conn.fetch(
+                "SELECT user_id FROM users WHERE change_seq > change_floor ORDER BY user_id"
+            )
+        ]
+    else:
+        owner_ids = [owner_id]
+
+    removed = 0
+    for oid in owner_ids:
+        async with conn.transaction():
+            removed += await conn.fetchval(
+                "SELECT fn_compact_file_changes($1, $2)", oid, retain
+            )
+    return removed
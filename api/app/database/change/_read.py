@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.change import ChangeBatch, FileChange
+from ...models.file import File
+from ...models.folder import Folder
+from .._common import assert_found
+from .exceptions import ChangeOwnerNotFoundError
+
+
+async def list_changes(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    since: int = 0,
+    limit: int = 500,
+) -> ChangeBatch:
+    """Return an owner's changes after cursor *since*, compacted to current state.
+
+    Reads run in one read-only ``REPEATABLE READ`` transaction, so the
+    cursor, the retention floor and the current file / folder records all
+    come from the same snapshot.  Within the batch only the latest change
+    per file or folder is kept, together with the subject's current record
+    (``None`` if it has since been deleted).  A ``folder_moved`` change is
+    logged for the moved or renamed folder only: its descendants' paths
+    changed too, and are re-derived from their unchanged ``parent_id``.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the user whose changes are requested.
+    since:
+        Cursor returned by the previous call; ``0`` starts from the oldest
+        retained change.
+    limit:
+        Maximum number of log rows consumed by this batch (the compacted
+        batch may hold fewer changes).
+
+    Returns
+    -------
+    ChangeBatch
+        The changes, the cursor to pass next time, whether more changes are
+        already waiting, and whether *since* is no longer usable (older than
+        the retention floor, or ahead of the log); in that case
+        ``changes`` is empty and the client must re-list everything, then
+        continue from the returned cursor.
+
+    Raises
+    ------
+    ChangeOwnerNotFoundError
+        If no user with *owner_id* exists.
+    """
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        head = await conn.fetchrow(
+            "SELECT change_seq, change_floor FROM users WHERE user_id = $1",
+            owner_id,
+        )
+        head = assert_found(head, ChangeOwnerNotFoundError)
+        if since < head["change_floor"] or since > head["change_seq"]:
+            return ChangeBatch(
+                changes=[],
+                cursor=head["change_seq"],
+                has_more=False,
+                resync_required=True,
+            )
+
+        rows = await conn.fetch(
+            """
+            SELECT seq, kind, file_id, folder_id, changed_at
+            FROM file_changes
+            WHERE owner_id = $1 AND seq > $2
+            ORDER BY seq
+            LIMIT $3
+            """,
+            owner_id,
+            since,
+            limit,
+        )
+        latest = {row["file_id"] or row["folder_id"]: row for row in rows}
+        file_ids = [r["file_id"] for r in latest.values() if r["file_id"] is not None]
+        folder_ids = [r["folder_id"] for r in latest.values() if r["folder_id"] is not None]
+
+        files = {}
+        if file_ids:
+            files = {
+                row["file_id"]: File.from_row(row)
+                for row in await conn.fetch(
+                    "SELECT * FROM v_files WHERE file_id = ANY($1::uuid[])", file_ids
+                )
+            }
+        folders = {}
+        if folder_ids:
+            folders = {
+                row["folder_id"]: Folder.from_row(row)
+                for row in await conn.fetch(
+                    "SELECT * FROM folders WHERE folder_id = ANY($1::uuid[])", folder_ids
+                )
+            }
+
+    changes = [
+        FileChange(
+            seq=row["seq"],
+            kind=row["kind"],
+            file_id=row["file_id"],
+            folder_id=row["folder_id"],
+            changed_at=row["changed_at"],
+            file=files.get(row["file_id"]),
+            folder=folders.get(row["folder_id"]),
+        )
+        for row in sorted(latest.values(), key=lambda r: r["seq"])
+    ]
+    # A short batch has drained the log as of this snapshot, so the cursor
+    # can jump to the head even if compaction left gaps before it.
+    cursor = rows[-1]["seq"] if len(rows) == limit else head["change_seq"]
+    return ChangeBatch(
+        changes=changes,
+        cursor=cursor,
+        has_more=cursor < head["change_seq"],
+        resync_required=False,
+    )
@@ -0,0 +1,9 @@
+"""Exceptions for the data-access layer concerned with the ``file_changes`` table."""
+
+
+class ChangeError(Exception):
+    """Base class for all change-feed errors."""
+
+
+class ChangeOwnerNotFoundError(ChangeError):
+    """Raised when the change feed is requested for a user that does not exist."""
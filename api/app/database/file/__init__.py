@@ -19,6 +19,14 @@ Read
     list_file_meta_by_owner
     list_file_meta_by_folder
 
+Search
+    search_file_meta_by_owner
+    count_file_meta_by_search
+
+Export
+    iter_file_meta_by_owner
+    iter_file_manifest_by_owner
+
 Update
     rename_file_meta
     move_file_meta
@@ -26,26 +34,71 @@ Update
 Delete
     delete_file_meta_and_bytes
 
+Trash
+    trash_file_meta
+    restore_file_meta
+    list_trashed_file_meta
+    count_trashed_file_meta
+    purge_trashed_file_meta_and_bytes
+
+Versions
+    create_file_version
+    list_file_versions
+    restore_file_version
+    delete_file_version
+    prune_file_versions
+
+Batch
+    apply_file_batch
+
 Aggregate / Utility
     count_file_meta_by_owner
+    count_file_meta_by_folder
     total_bytes_by_owner
+    trash_bytes_by_owner
+    reconcile_file_counters
+    get_storage_breakdown
+    list_duplicate_file_meta
     file_meta_and_bytes_exists
 
 Exceptions re-exported for callers
 -----------------------------------
-``FileNotFoundError``, ``FileCreateError``, ``FileError``
-(imported from ``.exceptions``).
+``FileNotFoundError``, ``FileCreateError``, ``FileVersionNotFoundError``,
+``FileError``
+(imported from ``.exceptions``).  Uploads that would exceed the owner's
+quota raise :exc:`~app.database.user.exceptions.StorageQuotaExceededError`.
 
 Notes
 -----
 * All functions use keyword-only arguments (``*``) to prevent positional
   mismatches at call sites.
+* Per-owner and per-folder file counts and byte totals are maintained by
+  the ``fn_files_counters`` trigger, and per-type / per-month rollups by
+  ``fn_files_usage_rollups``; the aggregate helpers read those counters,
+  and :func:`reconcile_file_counters` repairs them if they drift.
+* Files reference their folder by ``folder_id``; reads go through the
+  ``v_files`` view, which adds the folder's path as ``folder`` so the
+  :class:`~app.models.file.File` shape is unchanged.
+* Deleting a file moves it to the trash (``files.trashed_at``); reads,
+  listings, search, export and file counts only see live files, while the
+  trashed file's bytes keep counting towards the quota until
+  :func:`purge_trashed_file_meta_and_bytes` removes row and object.
+* Replacing a file's content keeps the old content in ``file_versions``.
+  Stored objects are addressed by ``object_key``; versions of a file with
+  the same SHA-256 share one object, which is removed only when no version
+  uses it any more.  Every version counts towards the quota at full size,
+  and :func:`prune_file_versions` enforces the retention policy.
+* Duplicate content is found by grouping on ``idx_files_owner_sha256``
+  (owner-scoped, live files only), an index-only scan per owner.
+* Name search is served by a ``pg_trgm`` GIN index on
+  ``(owner_id, current_name)``, partial on live files, so substring and
+  fuzzy matches stay owner-scoped index scans.
 * The helper ``_ALLOWED_ORDER`` guards against SQL-injection in the
   ``ORDER BY`` clause of :func:`list_file_meta_by_owner`.
 * MinIO I/O is intentionally kept outside the asyncpg transaction context
-  where possible; the one exception is :func:`create_file_meta_and_bytes`,
-  which writes to object storage only *after* the DB row has been committed
-  successfully.
+  where possible: :func:`create_file_meta_and_bytes` and
+  :func:`create_file_version` upload before they open their transaction
+  and remove the object again if it ends up unused.
 """
 
 from ._create import create_file_meta_and_bytes
@@ -56,13 +109,34 @@ from ._read import (
     list_file_meta_by_owner,
     list_file_meta_by_folder,
 )
+from ._search import search_file_meta_by_owner, count_file_meta_by_search
+from ._export import iter_file_meta_by_owner, iter_file_manifest_by_owner
 from ._update import rename_file_meta, move_file_meta
 from ._delete import delete_file_meta_and_bytes
+from ._trash import (
+    trash_file_meta,
+    restore_file_meta,
+    list_trashed_file_meta,
+    count_trashed_file_meta,
+    purge_trashed_file_meta_and_bytes,
+)
+from ._version import (
+    create_file_version,
+    list_file_versions,
+    restore_file_version,
+    delete_file_version,
+    prune_file_versions,
+)
+from ._batch import apply_file_batch
 from ._utils import (
     count_file_meta_by_owner,
+    count_file_meta_by_folder,
     total_bytes_by_owner,
+    trash_bytes_by_owner,
+    reconcile_file_counters,
     file_meta_and_bytes_exists,
 )
+from ._stats import get_storage_breakdown, list_duplicate_file_meta
 
 
 __all__ = [
@@ -74,13 +148,38 @@ __all__ = [
     "get_file_meta_and_bytes",
     "list_file_meta_by_owner",
     "list_file_meta_by_folder",
+    # Search
+    "search_file_meta_by_owner",
+    "count_file_meta_by_search",
+    # Export
+    "iter_file_meta_by_owner",
+    "iter_file_manifest_by_owner",
     # Update
     "rename_file_meta",
     "move_file_meta",
     # Delete
     "delete_file_meta_and_bytes",
+    # Trash
+    "trash_file_meta",
+    "restore_file_meta",
+    "list_trashed_file_meta",
+    "count_trashed_file_meta",
+    "purge_trashed_file_meta_and_bytes",
+    # Versions
+    "create_file_version",
+    "list_file_versions",
+    "restore_file_version",
+    "delete_file_version",
+    "prune_file_versions",
+    # Batch
+    "apply_file_batch",
     # Aggregate / Utility
     "count_file_meta_by_owner",
+    "count_file_meta_by_folder",
     "total_bytes_by_owner",
+    "trash_bytes_by_owner",
+    "reconcile_file_counters",
+    "get_storage_breakdown",
+    "list_duplicate_file_meta",
     "file_meta_and_bytes_exists",
 ]
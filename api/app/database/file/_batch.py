@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.file import File, FileBatchResult
+from ...models.types import LogicalPath
+
+
+async def apply_file_batch(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    renames: Mapping[UUID, str] | None = None,
+    moves: Mapping[UUID, LogicalPath] | None = None,
+    deletes: Iterable[UUID] = (),
+) -> FileBatchResult:
+    """Rename, move and trash many of an owner's files in one transaction.
+
+    Ownership of every referenced file is checked with a single
+    ``file_id = ANY(...) AND owner_id = ...`` query; ids that do not exist,
+    belong to someone else or are already in the trash are reported in
+    ``missing`` and otherwise ignored.  That query locks the rows it finds
+    ``FOR UPDATE`` (in ``file_id`` order, so concurrent batches cannot
+    deadlock): a concurrent trash, purge or move waits for the batch, and
+    the per-item results describe the rows as the batch left them.  Each
+    kind of change is then applied as one set-based statement over
+    ``unnest``-ed arrays, so the number of round-trips does not depend on
+    the batch size.  Deleting a file takes precedence over renaming or
+    moving it in the same batch.
+
+    Deleted files are moved to the trash with one flagged ``UPDATE``; their
+    rows and stored bytes stay until they are restored or purged.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    owner_id:
+        UUID of the user the files must belong to.
+    renames:
+        Mapping of file id to its new ``current_name``.
+    moves:
+        Mapping of file id to its destination folder path.  Missing folders
+        (and their ancestors) are created.
+    deletes:
+        Ids of files to move to the trash.
+
+    Returns
+    -------
+    FileBatchResult
+        The updated records, the ids actually moved to the trash (as
+        ``deleted``), and the requested ids that were not found for
+        *owner_id*.
+
+    Raises
+    ------
+    asyncpg.CheckViolationError
+        If a new name is blank or a folder path is malformed; nothing is
+        applied in that case.
+    """
+    renames = dict(renames or {})
+    moves = dict(moves or {})
+    delete_ids = set(deletes)
+    requested = set(renames) | set(moves) | delete_ids
+
+    deleted: list[UUID] = []
+    updated_rows = []
+
+    async with conn.transaction():
+        owned: set[UUID] = {
+            row["file_id"]
+            for row in await conn.fetch(
+                """
+                SELECT file_id FROM files
+                WHERE file_id = ANY($1::uuid[]) AND owner_id = $2 AND trashed_at IS NULL
+                ORDER BY file_id
+                FOR UPDATE
+                """,
+                list(requested),
+                owner_id,
+            )
+        }
+
+        delete_ids &= owned
+        renames = {k: v for k, v in renames.items() if k in owned and k not in delete_ids}
+        moves = {k: v for k, v in moves.items() if k in owned and k not in delete_ids}
+
+        if moves:
+            # Each distinct destination is resolved once, in its own statement,
+            # so folders created here are visible to the UPDATE below.
+            paths = sorted({str(p) for p in moves.values()})
+            folder_ids = {
+                row["path"]: row["folder_id"]
+                for row in await conn.fetch(
+                    """
+                    SELECT p AS path, fn_ensure_folder($1, p) AS folder_id
+                    FROM unnest($2::text[]) AS p
+                    """,
+                    owner_id,
+                    paths,
+                )
+            }
+            await conn.execute(
+                """
+                UPDATE files f
+                SET folder_id = u.folder_id
+                FROM unnest($1::uuid[], $2::uuid[]) AS u(file_id, folder_id)
+                WHERE f.file_id = u.file_id AND f.folder_id <> u.folder_id
+                """,
+                list(moves),
+                [folder_ids[str(p)] for p in moves.values()],
+            )
+
+        if renames:
+            await conn.execute(
+                """
+                UPDATE files f
+                SET current_name = u.name
+                FROM unnest($1::uuid[], $2::text[]) AS u(file_id, name)
+                WHERE f.file_id = u.file_id AND f.current_name <> u.name
+                """,
+                list(renames),
+                list(renames.values()),
+            )
+
+        if renames or moves:
+            updated_rows = await conn.fetch(
+                "SELECT * FROM v_files WHERE file_id = ANY($1::uuid[])",
+                list(set(renames) | set(moves)),
+            )
+
+        if delete_ids:
+            deleted = [
+                row["file_id"]
+                for row in await conn.fetch(
+                    """
+                    UPDATE files
+                    SET trashed_at = NOW() AT TIME ZONE 'utc'
+                    WHERE file_id = ANY($1::uuid[]) AND trashed_at IS NULL
+                    RETURNING file_id
+                    """,
+                    list(delete_ids),
+                )
+            ]
+
+    return FileBatchResult(
+        updated=File.from_rows(updated_rows),
+        deleted=deleted,
+        missing=sorted(requested - owned, key=str),
+    )
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
-from asyncpg import Connection
+import asyncio
+import logging
+from asyncpg import Connection, CheckViolationError, Record
 from typing import BinaryIO
-from uuid import uuid4
+from uuid import UUID, uuid7
 
 from ...models.file import File, FileCreate
-from ._minio_client import put_file
+from ._minio_client import put_file, remove_files
 from .._common import assert_found
+from ..user.exceptions import StorageQuotaExceededError
 from .exceptions import FileNotFoundError, FileCreateError
 
 
+logger = logging.getLogger(__name__)
+
+
 async def create_file_meta_and_bytes(
     *,
     conn: Connection,
@@ -18,11 +24,12 @@ async def create_file_meta_and_bytes(
 ) -> File:
     """Insert a metadata row and upload the file bytes to object storage.
 
-    The database insert and the MinIO ``PUT`` are sequenced so that bytes are
-    only written *after* the row has been committed.  If the insert fails the
-    transaction is rolled back and no bytes are written; if the ``PUT`` fails
-    the row is already committed, so the caller should treat a
-    :exc:`FileCreateError` as a signal to retry or clean up.
+    The target folder (and any missing ancestors) is created on demand.
+    The bytes are uploaded first, in a worker thread and before the
+    transaction opens, so neither the event loop nor the folder and owner
+    rows the insert locks wait on the transfer.  If the upload fails nothing
+    is written; if the insert then fails (including for the quota) the
+    uploaded object is removed again before the error is raised.
 
     Parameters
     ----------
@@ -34,7 +41,7 @@ async def create_file_meta_and_bytes(
         name, MIME type, size, and SHA-256 hash).
     file_bytes:
         Readable binary stream whose content will be uploaded to MinIO under
-        the newly generated ``file_id``.
+        the newly generated ``file_id`` (the first version's ``object_key``).
 
     Returns
     -------
@@ -45,47 +52,87 @@ async def create_file_meta_and_bytes(
     ------
     asyncpg.UniqueViolationError
         If a row with the generated ``file_id`` already exists (astronomically
-        unlikely with UUID v4, but surfaced for completeness).
+        unlikely with UUID v7, but surfaced for completeness).
     asyncpg.ForeignKeyViolationError
         If ``file_meta.owner_id`` does not reference a valid user row.
+    StorageQuotaExceededError
+        If the file would take the owner's ``storage_used`` past their
+        ``storage_quota`` (enforced by the counters trigger and
+        ``chk_users_storage_within_quota``); nothing is written.
     asyncpg.CheckViolationError
-        If any database constraint is violated (e.g. blank name, invalid hash
-        format, folder not starting with ``/``).
+        If any other database constraint is violated (e.g. blank name,
+        invalid hash format, malformed folder path).
     FileCreateError
         If the metadata row could not be inserted for any other reason.
+    minio.error.S3Error
+        If the upload fails; nothing is written to the database.
     """
-    file_id = uuid4()
+    file_id = uuid7()
+    object_key = str(file_id)
+
+    await asyncio.to_thread(
+        put_file,
+        object_key=object_key,
+        file_bytes=file_bytes,
+        size_bytes=file_meta.size_bytes,
+    )
+    try:
+        row = await _insert_file(conn, file_id, object_key, file_meta)
+    except BaseException:
+        # No row references the object; do not leave it behind.
+        if await asyncio.to_thread(remove_files, [object_key]):
+            logger.warning("failed upload left an orphaned object: %s", object_key)
+        raise
+
+    return File.from_row(row)
+
 
+async def _insert_file(
+    conn: Connection,
+    file_id: UUID,
+    object_key: str,
+    file_meta: FileCreate,
+) -> Record:
+    """Insert the ``files`` row for an uploaded object; returns it in ``v_files`` shape."""
     try:
         async with conn.transaction():
+            folder_id = await conn.fetchval(
+                "SELECT fn_ensure_folder($1, $2)",
+                file_meta.owner_id,
+                str(file_meta.folder),
+            )
             row = await conn.fetchrow(
                 """
-                INSERT INTO files (
-                    file_id, owner_id,
-                    bucket, folder,
-                    original_name, current_name,
-                    mime_type, size_bytes, sha256_hex
+                WITH f AS (
+                    INSERT INTO files (
+                        file_id, owner_id,
+                        bucket, folder_id, object_key,
+                        original_name, current_name,
+                        mime_type, size_bytes, sha256_hex
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                    RETURNING *
                 )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                RETURNING *
+                SELECT f.*, d.path AS folder
+                FROM f JOIN folders d ON d.folder_id = f.folder_id
                 """,
                 file_id,
                 file_meta.owner_id,
                 file_meta.bucket,
-                file_meta.folder,
+                folder_id,
+                object_key,
                 file_meta.name,
                 file_meta.name,
                 file_meta.mime_type,
                 file_meta.size_bytes,
-                file_meta.sha256_hex,
+                bytes.fromhex(file_meta.sha256_hex),
             )
-            if assert_found(row, FileNotFoundError):
-                put_file(
-                    file_id=file_id,
-                    file_bytes=file_bytes,
-                    size_bytes=file_meta.size_bytes,
-                )
+            return assert_found(row, FileNotFoundError)
     except FileNotFoundError:
         raise FileCreateError(f"Could not create file '{file_meta.name}'.")
-
-    return File.model_validate(row)
+    except CheckViolationError as exc:
+        if exc.constraint_name == "chk_users_storage_within_quota":
+            raise StorageQuotaExceededError(
+                f"Uploading '{file_meta.name}' would exceed the storage quota."
+            ) from exc
+        raise
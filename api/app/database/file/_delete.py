@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 from uuid import UUID
 from asyncpg import Connection
 
-from ._minio_client import remove_file
+from ._minio_client import remove_files
 from .exceptions import FileError
 
 
@@ -12,14 +13,17 @@ async def delete_file_meta_and_bytes(
     conn: Connection,
     file_id: UUID,
 ) -> bool:
-    """Delete a file's metadata row and its stored bytes atomically.
+    """Delete a file's metadata row, its versions, and all their stored bytes.
+
+    This bypasses the trash; use :func:`trash_file_meta` for a deletion the
+    owner can undo.
 
     The database ``DELETE`` is executed first inside a transaction.  The
-    MinIO ``DELETE`` follows only if the row was removed successfully, so a
-    DB failure leaves storage untouched.  If the MinIO call fails after the
-    row has been deleted, the bytes become orphaned — callers should treat a
-    :exc:`FileError` as a signal that manual clean-up of object storage may
-    be required.
+    MinIO ``DELETE`` of every object the file's versions used follows only
+    once the rows were removed, so a DB failure leaves storage untouched.
+    If the MinIO call fails after the rows have been deleted, the bytes
+    become orphaned — callers should treat a :exc:`FileError` as a signal
+    that manual clean-up of object storage may be required.
 
     Parameters
     ----------
@@ -39,18 +43,37 @@ async def delete_file_meta_and_bytes(
     ------
     FileError
         If the database row could not be deleted, meaning the file bytes
-        were *not* removed and no orphan was created.
+        were *not* removed and no orphan was created; or if some objects
+        could not be removed after the rows were.
     """
     async with conn.transaction():
-        result: str = await conn.execute(
-            "DELETE FROM files WHERE file_id = $1",
+        row = await conn.fetchrow(
+            """
+            WITH versions AS (
+                DELETE FROM file_versions WHERE file_id = $1
+                RETURNING object_key
+            ),
+            deleted AS (
+                DELETE FROM files WHERE file_id = $1
+                RETURNING object_key
+            )
+            SELECT EXISTS (SELECT 1 FROM deleted) AS deleted,
+                   ARRAY(SELECT object_key FROM deleted
+                         UNION
+                         SELECT object_key FROM versions) AS object_keys
+            """,
             file_id,
         )
-        if not result.endswith(" 1"):
+        if not row["deleted"]:
             raise FileError(
                 f"Could not delete the DB record for file '{file_id}'. "
                 "The record is now orphaned and doesn't correspond to any bytes."
             )
-        remove_file(file_id=file_id)
 
+    failed = await asyncio.to_thread(remove_files, row["object_keys"])
+    if failed:
+        raise FileError(
+            f"Deleted file '{file_id}', but {len(failed)} of its stored objects "
+            "could not be removed and are now orphaned."
+        )
     return True
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import AsyncIterator
+from uuid import UUID
+from asyncpg import Connection, Record
+
+from ...models.file import File
+
+
+async def iter_file_meta_by_owner(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    batch_size: int = 1000,
+) -> AsyncIterator[list[File]]:
+    """Stream every live file record of an owner, *batch_size* records at a time.
+
+    Rows come from a server-side cursor inside a read-only ``REPEATABLE
+    READ`` transaction, so the whole export is one consistent snapshot while
+    only one batch is ever held in memory, however many files the owner has.
+    No ``ORDER BY`` is applied: sorting would make Postgres materialise the
+    full result before returning the first row.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection, held (with its transaction open) until the
+        iterator is exhausted or closed.
+    owner_id:
+        UUID of the user whose files should be exported.
+    batch_size:
+        Number of rows fetched from the cursor per round-trip.
+
+    Yields
+    ------
+    list[File]
+        Non-empty batches of file metadata records, in no particular order.
+    """
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        cursor = await conn.cursor("SELECT * FROM v_files WHERE owner_id = $1 AND trashed_at IS NULL", owner_id)
+        while rows := await cursor.fetch(batch_size):
+            yield File.from_rows(rows)
+
+
+async def iter_file_manifest_by_owner(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    batch_size: int = 5000,
+) -> AsyncIterator[tuple[list[Record], list[Record]]]:
+    """Stream an owner's folders and files in the compact form sync manifests use.
+
+    Like :func:`iter_file_meta_by_owner`, everything is read from one
+    read-only ``REPEATABLE READ`` snapshot, files through a server-side
+    cursor.  Columns are converted to their wire form by Postgres, so the
+    caller can encode them without per-field work in Python.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection, held until the iterator is exhausted or
+        closed.
+    owner_id:
+        UUID of the user whose tree should be listed.
+    batch_size:
+        Number of file rows fetched from the cursor per round-trip.
+
+    Yields
+    ------
+    tuple[list[Record], list[Record]]
+        ``(folders, files)``.  The first item carries every folder of the
+        owner, sorted by path, with columns ``folder_id`` and ``path``, and
+        no files; each later item carries one non-empty batch of files and
+        no folders; files in the trash are left out.  File columns are
+        ``file_id`` (16 bytes), ``folder_id``, ``name``, ``size_bytes``,
+        ``mtime_ms`` (epoch milliseconds of the last change) and ``sha256``
+        (32 bytes).
+    """
+    async with conn.transaction(isolation="repeatable_read", readonly=True):
+        folders = await conn.fetch(
+            "SELECT folder_id, path FROM folders WHERE owner_id = $1 ORDER BY path",
+            owner_id,
+        )
+        yield folders, []
+        cursor = await conn.cursor(
+            """
+            SELECT uuid_send(file_id) AS file_id,
+                   folder_id,
+                   current_name AS name,
+                   size_bytes,
+                   (extract(epoch FROM COALESCE(updated_at, created_at)) * 1000)::BIGINT AS mtime_ms,
+                   sha256_hex AS sha256
+            FROM files
+            WHERE owner_id = $1 AND trashed_at IS NULL
+            """,
+            owner_id,
+        )
+        while rows := await cursor.fetch(batch_size):
+            yield [], rows
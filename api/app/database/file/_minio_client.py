@@ -1,8 +1,8 @@
 import os
-from uuid import UUID
-from typing import BinaryIO, Generator
+from typing import BinaryIO, Generator, Iterable
 
 from minio import Minio
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
 from pydantic import BaseModel, computed_field, model_validator
 from urllib3.response import BaseHTTPResponse
@@ -66,7 +66,7 @@ def ensure_bucket() -> None:
 
 def put_file(
     *,
-    file_id: UUID,
+    object_key: str,
     file_bytes: BinaryIO,
     size_bytes: int,
     content_type: str = "application/octet-stream",
@@ -74,7 +74,7 @@ def put_file(
     """Upload a file-like object to MinIO.
 
     Args:
-        file_id:      Unique identifier used as the object key.
+        object_key:   Key to store the object under (``files.object_key``).
         file_bytes:   Readable binary stream.
         size_bytes:   Exact byte length, or ``-1`` for unknown length
                       (triggers chunked / multipart upload with a 5 MB part
@@ -91,7 +91,7 @@ def put_file(
     try:
         client.put_object(
             settings.bucket,
-            str(file_id),
+            object_key,
             file_bytes,
             length=size_bytes,
             part_size=part_size,
@@ -101,14 +101,14 @@ def put_file(
         raise
 
 
-def get_file_stream(file_id: UUID) -> BaseHTTPResponse:
+def get_file_stream(object_key: str) -> BaseHTTPResponse:
     """Return a streaming MinIO response for the given object.
 
     **The caller is responsible for closing the response:**
 
     .. code-block:: python
 
-        stream = get_file_stream(file_id)
+        stream = get_file_stream(object_key)
         try:
             for chunk in stream:
                 ...
@@ -120,21 +120,21 @@ def get_file_stream(file_id: UUID) -> BaseHTTPResponse:
         S3Error: If the object does not exist or cannot be read.
     """
     try:
-        return client.get_object(settings.bucket, str(file_id))
+        return client.get_object(settings.bucket, object_key)
     except S3Error:
         raise
 
 
 def get_file_chunks(
-    file_id: UUID,
+    object_key: str,
     chunk_size: int = 65_536,
 ) -> Generator[bytes, None, None]:
-    """Yield raw bytes chunks for *file_id*, closing the connection on exit.
+    """Yield raw bytes chunks for *object_key*, closing the connection on exit.
 
     Prefer this over :func:`get_file_stream` when you only need the raw bytes
     and don't want to manage the connection lifetime yourself.
     """
-    stream = get_file_stream(file_id)
+    stream = get_file_stream(object_key)
     try:
         yield from stream.stream(chunk_size)
     finally:
@@ -142,10 +142,10 @@ def get_file_chunks(
         stream.release_conn()
 
 
-def file_exists(file_id: UUID) -> bool:
+def file_exists(object_key: str) -> bool:
     """Return ``True`` if the object exists, ``False`` otherwise."""
     try:
-        client.stat_object(settings.bucket, str(file_id))
+        client.stat_object(settings.bucket, object_key)
         return True
     except S3Error as exc:
         if exc.code == "NoSuchKey":
@@ -153,20 +153,41 @@ def file_exists(file_id: UUID) -> bool:
         raise
 
 
-def remove_file(file_id: UUID) -> None:
+def remove_file(object_key: str) -> None:
     """Delete an object from MinIO storage.
 
     This is a no-op if the object does not exist (idempotent delete).
 
     Args:
-        file_id: The object key to delete.
+        object_key: The object key to delete.
 
     Raises:
         S3Error: On unexpected MinIO / S3 errors.
     """
     try:
-        client.remove_object(settings.bucket, str(file_id))
+        client.remove_object(settings.bucket, object_key)
     except S3Error as exc:
         if exc.code == "NoSuchKey":
             return
         raise
+
+
+def remove_files(object_keys: Iterable[str]) -> list[str]:
+    """Delete many objects from MinIO storage with multi-object delete requests.
+
+    Keys are sent in batches of up to 1 000 per request by the MinIO client,
+    so removing a large set costs a handful of round-trips instead of one
+    per object.  Missing objects are not reported as failures.
+
+    Args:
+        object_keys: The object keys to delete.
+
+    Returns:
+        The keys that could not be deleted; empty on full success.
+    """
+    errors = client.remove_objects(
+        settings.bucket,
+        (DeleteObject(key) for key in object_keys),
+    )
+    # remove_objects is lazy: nothing is sent until the errors are iterated.
+    return [error.name for error in errors]
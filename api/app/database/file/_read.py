@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime
 from uuid import UUID
 from asyncpg import Connection
 from urllib3.response import BaseHTTPResponse
@@ -8,6 +9,7 @@ from ...models.file import File
 from ...models.types import SHA256Hex, LogicalPath
 from .._common import assert_found
 from ._minio_client import get_file_stream
+from .exceptions import FileNotFoundError
 
 
 # Allowlist for the ORDER BY column in list_file_meta_by_owner.
@@ -21,6 +23,7 @@ async def get_file_meta(
     *,
     conn: Connection,
     file_id: UUID,
+    include_trashed: bool = False,
 ) -> File:
     """Fetch the metadata record for a single file.
 
@@ -30,6 +33,9 @@ async def get_file_meta(
         Active asyncpg connection.
     file_id:
         Primary key of the file to retrieve.
+    include_trashed:
+        When ``True``, files in the trash are returned too; by default they
+        are treated as missing.
 
     Returns
     -------
@@ -39,13 +45,15 @@ async def get_file_meta(
     Raises
     ------
     FileNotFoundError
-        If no row with *file_id* exists in the ``files`` table.
+        If no row with *file_id* exists in the ``files`` table, or it is in
+        the trash and *include_trashed* is ``False``.
     """
     row = await conn.fetchrow(
-        "SELECT * FROM files WHERE file_id = $1",
+        "SELECT * FROM v_files WHERE file_id = $1"
+        + ("" if include_trashed else " AND trashed_at IS NULL"),
         file_id,
     )
-    return File.model_validate(assert_found(row, FileNotFoundError))
+    return File.from_row(assert_found(row, FileNotFoundError))
 
 
 async def get_file_meta_by_sha256(
@@ -54,7 +62,7 @@ async def get_file_meta_by_sha256(
     sha256_hex: SHA256Hex,
     owner_id: UUID | None = None,
 ) -> File:
-    """Fetch a file record by its SHA-256 content hash.
+    """Fetch a live (not trashed) file record by its SHA-256 content hash.
 
     Useful for content-addressed look-ups and per-user deduplication checks
     before uploading a file that may already exist in storage.
@@ -82,19 +90,19 @@ async def get_file_meta_by_sha256(
     if owner_id is not None:
         row = await conn.fetchrow(
             """
-            SELECT * FROM files
-            WHERE sha256_hex = $1 AND owner_id = $2
+            SELECT * FROM v_files
+            WHERE sha256_hex = $1 AND owner_id = $2 AND trashed_at IS NULL
             LIMIT 1
             """,
-            sha256_hex,
+            bytes.fromhex(sha256_hex),
             owner_id,
         )
     else:
         row = await conn.fetchrow(
-            "SELECT * FROM files WHERE sha256_hex = $1 LIMIT 1",
-            sha256_hex,
+            "SELECT * FROM v_files WHERE sha256_hex = $1 AND trashed_at IS NULL LIMIT 1",
+            bytes.fromhex(sha256_hex),
         )
-    return File.model_validate(assert_found(row, FileNotFoundError))
+    return File.from_row(assert_found(row, FileNotFoundError))
 
 
 async def get_file_meta_and_bytes(
@@ -127,7 +135,7 @@ async def get_file_meta_and_bytes(
         If no row with *file_id* exists in the ``files`` table.
     """
     file = await get_file_meta(conn=conn, file_id=file_id)
-    file_bytes = get_file_stream(file_id=file_id)
+    file_bytes = get_file_stream(file.object_key)
     return file, file_bytes
 
 
@@ -139,8 +147,11 @@ async def list_file_meta_by_owner(
     offset: int = 0,
     order_by: str = "created_at",
     ascending: bool = False,
+    after: tuple[datetime, UUID] | None = None,
 ) -> list[File]:
-    """Return a paginated, sorted list of all files belonging to an owner.
+    """Return a paginated, sorted list of all live files belonging to an owner.
+
+    Files in the trash are left out; see :func:`list_trashed_file_meta`.
 
     Parameters
     ----------
@@ -161,6 +172,14 @@ async def list_file_meta_by_owner(
     ascending:
         Sort direction. ``False`` (default) returns the most-recent files
         first; ``True`` returns the oldest / smallest / alphabetically-first.
+    after:
+        Keyset cursor for creation-order listings: the ``(created_at,
+        file_id)`` of the last file on the previous page.  Rows are then read
+        straight from ``idx_files_owner_created`` however deep the page,
+        instead of being skipped one by one as with *offset*.  The cursor is
+        a position, not a row reference, so it stays valid after that file
+        is trashed or purged.  Only valid with ``order_by="created_at"``;
+        cannot be combined with a nonzero *offset*.
 
     Returns
     -------
@@ -170,26 +189,39 @@ async def list_file_meta_by_owner(
     Raises
     ------
     ValueError
-        If *order_by* is not a member of :data:`_ALLOWED_ORDER`.
+        If *order_by* is not a member of :data:`_ALLOWED_ORDER`, or *after*
+        is given with another order than ``"created_at"`` or with an
+        *offset*.
     """
     if order_by not in _ALLOWED_ORDER:
         raise ValueError(
             f"order_by must be one of {sorted(_ALLOWED_ORDER)!r}, got {order_by!r}."
         )
+    if after is not None and order_by != "created_at":
+        raise ValueError("after can only be used with order_by='created_at'.")
+    if after is not None and offset:
+        raise ValueError("after cannot be combined with offset.")
 
     direction = "ASC" if ascending else "DESC"
+    args: list[object] = [owner_id, limit, offset]
+    keyset = ""
+    if after is not None:
+        args.extend(after)
+        keyset = f"""
+          AND (created_at, file_id) {">" if ascending else "<"} ($4, $5)
+        """
+    # file_id breaks ties, so pages never overlap or skip rows; new ids are
+    # time-ordered (UUID v7), so within a millisecond it is creation order.
     rows = await conn.fetch(
         f"""
-        SELECT * FROM files
-        WHERE owner_id = $1
-        ORDER BY {order_by} {direction}
+        SELECT * FROM v_files
+        WHERE owner_id = $1 AND trashed_at IS NULL{keyset}
+        ORDER BY {order_by} {direction}, file_id {direction}
         LIMIT $2 OFFSET $3
         """,
-        owner_id,
-        limit,
-        offset,
+        *args,
     )
-    return [File.model_validate(row) for row in rows]
+    return File.from_rows(rows)
 
 
 async def list_file_meta_by_folder(
@@ -201,7 +233,7 @@ async def list_file_meta_by_folder(
     limit: int = 50,
     offset: int = 0,
 ) -> list[File]:
-    """Return files stored in a specific logical folder for a given owner.
+    """Return live files stored in a specific logical folder for a given owner.
 
     Parameters
     ----------
@@ -210,13 +242,15 @@ async def list_file_meta_by_folder(
     owner_id:
         UUID of the user whose files should be listed.
     folder:
-        Logical path to match against the ``folder`` column (e.g. ``"/docs"``).
+        Logical path of the folder to list (e.g. ``"/docs"``).
     recursive:
         When ``True``, returns files in *folder* **and** all of its
-        sub-folders via a ``LIKE`` prefix query (e.g. ``"/docs"`` also
-        returns ``"/docs/reports"`` and ``"/docs/2024/q1"``).
-        When ``False`` (default), only rows with an exact ``folder`` match
-        are returned.
+        sub-folders (e.g. ``"/docs"`` also returns ``"/docs/reports"`` and
+        ``"/docs/2024/q1"``).  The subtree is resolved on ``folders`` as a
+        range scan of ``idx_folders_owner_path`` (``~>=~`` / ``~<~``), and
+        each folder's files are then read through ``idx_files_folder_id``.
+        When ``False`` (default), only files directly in *folder* are
+        returned.
     limit:
         Maximum number of rows to return.
     offset:
@@ -229,30 +263,26 @@ async def list_file_meta_by_folder(
         ``(folder, current_name)``.
     """
     if recursive:
-        rows = await conn.fetch(
-            """
-            SELECT * FROM files
-            WHERE owner_id = $1
-              AND (folder = $2 OR folder LIKE ($2 || '/%'))
-            ORDER BY folder, current_name
-            LIMIT $3 OFFSET $4
-            """,
-            owner_id,
-            folder,
-            limit,
-            offset,
-        )
+        subtree = """(d.path = $2 OR (d.path ~>=~ (rtrim($2, '/') || '/')
+                                  AND d.path ~<~ (rtrim($2, '/') || '0')))"""
     else:
-        rows = await conn.fetch(
-            """
-            SELECT * FROM files
-            WHERE owner_id = $1 AND folder = $2
-            ORDER BY current_name
-            LIMIT $3 OFFSET $4
-            """,
-            owner_id,
-            folder,
-            limit,
-            offset,
-        )
-    return [File.model_validate(row) for row in rows]
+        subtree = "d.path = $2"
+
+    # Filtered on folders rather than v_files.folder, which for trashed
+    # files comes from trashed_from and so cannot use the path index.
+    rows = await conn.fetch(
+        f"""
+        SELECT f.*, d.path AS folder
+        FROM folders d
+        JOIN files f ON f.folder_id = d.folder_id
+        WHERE d.owner_id = $1 AND {subtree}
+          AND f.trashed_at IS NULL
+        ORDER BY d.path, f.current_name
+        LIMIT $3 OFFSET $4
+        """,
+        owner_id,
+        str(folder),
+        limit,
+        offset,
+    )
+    return File.from_rows(rows)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.file import File
+from ...models.types import LogicalPath
+from ._read import _ALLOWED_ORDER
+
+
+# "relevance" is only meaningful for searches, so it is kept out of
+# _ALLOWED_ORDER (which also guards list_file_meta_by_owner).
+_ALLOWED_SEARCH_ORDER: frozenset[str] = _ALLOWED_ORDER | {"relevance"}
+
+
+def _like_pattern(query: str) -> str:
+    """Return an ``ILIKE`` pattern matching *query* as a literal substring."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _search_where(folder: LogicalPath | None) -> str:
+    """Build the ``WHERE`` clause shared by search and its count.
+
+    Parameters are ``$1`` owner, ``$2`` ILIKE pattern, ``$3`` raw query and,
+    when *folder* is set, ``$4`` folder path.  Only live files match, which is
+    also the predicate of the partial ``idx_files_owner_name_trgm`` serving
+    both name predicates: the ``ILIKE`` catches exact substrings and ``<%``
+    (word similarity above ``pg_trgm.word_similarity_threshold``) catches
+    typos and near-misses.
+    """
+    where = """
+        owner_id = $1
+        AND trashed_at IS NULL
+        AND (current_name ILIKE $2 OR $3 <% current_name)
+    """
+    if folder is not None and str(folder) != "/":
+        where += """
+        AND folder_id IN (
+            SELECT folder_id FROM folders
+            WHERE owner_id = $1
+              AND (path = $4 OR (path ~>=~ ($4 || '/') AND path ~<~ ($4 || '0')))
+        )
+        """
+    return where
+
+
+def _search_args(
+    owner_id: UUID, query: str, folder: LogicalPath | None
+) -> list[object]:
+    args: list[object] = [owner_id, _like_pattern(query), query]
+    if folder is not None and str(folder) != "/":
+        args.append(str(folder))
+    return args
+
+
+async def search_file_meta_by_owner(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    query: str,
+    folder: LogicalPath | None = None,
+    limit: int = 50,
+    offset: int = 0,
+    order_by: str = "relevance",
+    ascending: bool = False,
+) -> list[File]:
+    """Search an owner's files by name, with substring and fuzzy matching.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the user whose files should be searched.
+    query:
+        Free-text search term, matched against ``current_name``.  ``%``, ``_``
+        and ``\\`` are treated literally.
+    folder:
+        When given, only files in this folder **or any of its sub-folders**
+        are searched.  ``None`` or ``"/"`` searches everything.
+    limit:
+        Maximum number of rows to return.
+    offset:
+        Number of rows to skip before returning results.
+    order_by:
+        ``"relevance"`` (default) puts exact substring matches first, then
+        orders by trigram word similarity to *query*; any column of
+        :data:`_ALLOWED_ORDER` sorts by that column instead.
+    ascending:
+        Sort direction for column sorts; ignored for ``"relevance"``, which
+        always returns the best match first.
+
+    Returns
+    -------
+    list[File]
+        Possibly-empty list of matching file metadata records.
+
+    Raises
+    ------
+    ValueError
+        If *order_by* is not a member of :data:`_ALLOWED_SEARCH_ORDER`.
+    """
+    if order_by not in _ALLOWED_SEARCH_ORDER:
+        raise ValueError(
+            f"order_by must be one of {sorted(_ALLOWED_SEARCH_ORDER)!r}, got {order_by!r}."
+        )
+
+    if order_by == "relevance":
+        order = "current_name ILIKE $2 DESC, word_similarity($3, current_name) DESC, current_name, file_id"
+    else:
+        direction = "ASC" if ascending else "DESC"
+        order = f"{order_by} {direction}, file_id {direction}"
+
+    args = _search_args(owner_id, query, folder)
+    n = len(args)
+    rows = await conn.fetch(
+        f"""
+        SELECT * FROM v_files
+        WHERE {_search_where(folder)}
+        ORDER BY {order}
+        LIMIT ${n + 1} OFFSET ${n + 2}
+        """,
+        *args,
+        limit,
+        offset,
+    )
+    return File.from_rows(rows)
+
+
+async def count_file_meta_by_search(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    query: str,
+    folder: LogicalPath | None = None,
+) -> int:
+    """Return the number of files :func:`search_file_meta_by_owner` would match.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the user whose files should be searched.
+    query:
+        Free-text search term.
+    folder:
+        Optional folder scope (includes sub-folders).
+
+    Returns
+    -------
+    int
+        Number of matching files.
+    """
+    value = await conn.fetchval(
+        f"SELECT count(*) FROM files WHERE {_search_where(folder)}",
+        *_search_args(owner_id, query, folder),
+    )
+    return int(value or 0)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.file import DuplicateGroup, DuplicateReport, File, StorageBreakdown, UsageBucket
+from ...models.types import LogicalPath
+
+
+# Age buckets over whole calendar months since upload: (key, upper bound in
+# months, exclusive).  The last bucket is open-ended.
+_AGE_BUCKETS: tuple[tuple[str, int | None], ...] = (
+    ("0-1m", 1),
+    ("1-6m", 6),
+    ("6-12m", 12),
+    ("1-2y", 24),
+    ("2y+", None),
+)
+
+
+def _age_bucket(month: str, now: datetime) -> str:
+    """Map a ``YYYY-MM`` rollup bucket to its key in :data:`_AGE_BUCKETS`."""
+    year, mon = (int(part) for part in month.split("-"))
+    age = (now.year - year) * 12 + (now.month - mon)
+    for key, upper in _AGE_BUCKETS:
+        if upper is None or age < upper:
+            return key
+    return _AGE_BUCKETS[-1][0]
+
+
+async def get_storage_breakdown(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    folder: LogicalPath | None = None,
+    now: datetime | None = None,
+) -> StorageBreakdown:
+    """Return where an owner's storage goes, by file type, folder and age.
+
+    Everything is read from trigger-maintained rollups, never from ``files``:
+    type and age come from ``file_usage_rollups`` (one row per MIME family
+    and per upload month), folders from the subtree counters on ``folders``.
+    The cost therefore depends on the number of distinct types, months and
+    sub-folders, not on the number of files.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the target user.
+    folder:
+        Folder whose direct sub-folders make up ``by_folder``; defaults to
+        the root, i.e. the top-level folders.  Files stored directly in
+        *folder* are reported under its own path.
+    now:
+        Reference time for age buckets; defaults to the current UTC time.
+
+    Returns
+    -------
+    StorageBreakdown
+        ``by_type`` and ``by_folder`` sorted by size (largest first);
+        ``by_age`` with every bucket of :data:`_AGE_BUCKETS`, youngest first.
+        ``by_folder`` sizes include everything below each sub-folder.
+    """
+    now = now or datetime.now(timezone.utc)
+    path = str(folder) if folder is not None else "/"
+
+    rollups = await conn.fetch(
+        """
+        SELECT dimension, bucket, file_count, size_bytes
+        FROM file_usage_rollups
+        WHERE owner_id = $1
+        """,
+        owner_id,
+    )
+    folders = await conn.fetch(
+        """
+        WITH parent AS (
+            SELECT folder_id, path, file_count, size_bytes
+            FROM folders
+            WHERE owner_id = $1 AND path = $2
+        )
+        SELECT path, file_count, size_bytes FROM parent
+        UNION ALL
+        SELECT f.path, f.tree_file_count, f.tree_size_bytes
+        FROM folders f JOIN parent p ON f.parent_id = p.folder_id
+        """,
+        owner_id,
+        path,
+    )
+
+    by_type: list[UsageBucket] = []
+    ages: dict[str, list[int]] = {key: [0, 0] for key, _ in _AGE_BUCKETS}
+    for row in rollups:
+        if row["dimension"] == "mime_family":
+            by_type.append(
+                UsageBucket(
+                    key=row["bucket"],
+                    file_count=row["file_count"],
+                    size_bytes=row["size_bytes"],
+                )
+            )
+        else:
+            totals = ages[_age_bucket(row["bucket"], now)]
+            totals[0] += row["file_count"]
+            totals[1] += row["size_bytes"]
+
+    by_folder = [
+        UsageBucket(key=row["path"], file_count=row["file_count"], size_bytes=row["size_bytes"])
+        for row in folders
+        if row["file_count"] > 0
+    ]
+
+    return StorageBreakdown(
+        by_type=sorted(by_type, key=lambda b: b.size_bytes, reverse=True),
+        by_folder=sorted(by_folder, key=lambda b: b.size_bytes, reverse=True),
+        by_age=[
+            UsageBucket(key=key, file_count=count, size_bytes=size)
+            for key, (count, size) in ages.items()
+        ],
+    )
+
+
+async def list_duplicate_file_meta(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    limit: int = 50,
+    offset: int = 0,
+) -> DuplicateReport:
+    """Return a page of an owner's live files grouped by identical content.
+
+    Files are grouped by ``sha256_hex``; a group is reported when it has
+    more than one copy.  Grouping is an index-only scan of
+    ``idx_files_owner_sha256`` (owner-scoped, live files only, with
+    ``size_bytes`` included), so its cost follows the owner's file count
+    and nothing else; only the files of the returned page are then read.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the target user.
+    limit:
+        Maximum number of groups to return.
+    offset:
+        Number of groups to skip before returning results.
+
+    Returns
+    -------
+    DuplicateReport
+        Groups ordered by reclaimable bytes (largest first), each with its
+        files oldest first; plus the number of groups and the bytes that
+        could be reclaimed across all of them, not just this page.
+    """
+    rows = await conn.fetch(
+        """
+        WITH groups AS (
+            SELECT sha256_hex, count(*) AS copies, max(size_bytes) AS size_bytes
+            FROM files
+            WHERE owner_id = $1 AND trashed_at IS NULL
+            GROUP BY sha256_hex
+            HAVING count(*) > 1
+        ),
+        totals AS (
+            SELECT count(*) AS total_groups,
+                   COALESCE(sum((copies - 1) * size_bytes), 0) AS total_reclaimable
+            FROM groups
+        ),
+        page AS (
+            SELECT sha256_hex, copies, size_bytes,
+                   (copies - 1) * size_bytes AS reclaimable_bytes
+            FROM groups
+            ORDER BY reclaimable_bytes DESC, sha256_hex
+            LIMIT $2 OFFSET $3
+        )
+        SELECT t.total_groups, t.total_reclaimable, p.*
+        FROM totals t LEFT JOIN page p ON true
+        ORDER BY p.reclaimable_bytes DESC, p.sha256_hex
+        """,
+        owner_id,
+        limit,
+        offset,
+    )
+    page = [row for row in rows if row["sha256_hex"] is not None]
+
+    files: dict[bytes, list[File]] = {row["sha256_hex"]: [] for row in page}
+    if files:
+        for f in File.from_rows(
+            await conn.fetch(
+                """
+                SELECT * FROM v_files
+                WHERE owner_id = $1 AND trashed_at IS NULL
+                  AND sha256_hex = ANY($2::bytea[])
+                ORDER BY created_at, file_id
+                """,
+                owner_id,
+                list(files),
+            )
+        ):
+            files[bytes.fromhex(f.sha256_hex)].append(f)
+
+    return DuplicateReport(
+        groups=[
+            DuplicateGroup(
+                sha256_hex=row["sha256_hex"].hex(),
+                size_bytes=row["size_bytes"],
+                copies=row["copies"],
+                reclaimable_bytes=row["reclaimable_bytes"],
+                files=files[row["sha256_hex"]],
+            )
+            for row in page
+        ],
+        total_groups=rows[0]["total_groups"],
+        reclaimable_bytes=rows[0]["total_reclaimable"],
+    )
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.file import File
+from .._common import assert_found
+from ._minio_client import remove_files
+from .exceptions import FileNotFoundError
+
+
+logger = logging.getLogger(__name__)
+
+
+async def trash_file_meta(
+    *,
+    conn: Connection,
+    file_id: UUID,
+) -> File:
+    """Move a file to the trash.
+
+    A single ``UPDATE`` stamps ``trashed_at``; the row and its stored bytes
+    are kept, so the file can be restored with :func:`restore_file_meta`
+    until it is purged.  Trashed files disappear from listings, searches and
+    file counts, but keep counting towards the owner's storage quota.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    file_id:
+        Primary key of the file to trash.
+
+    Returns
+    -------
+    File
+        The trashed metadata record.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no live (not trashed) row with *file_id* exists.
+    """
+    row = await conn.fetchrow(
+        """
+        WITH f AS (
+            UPDATE files
+            SET trashed_at = NOW() AT TIME ZONE 'utc'
+            WHERE file_id = $1 AND trashed_at IS NULL
+            RETURNING *
+        )
+        SELECT f.*, d.path AS folder
+        FROM f JOIN folders d ON d.folder_id = f.folder_id
+        """,
+        file_id,
+    )
+    return File.from_row(assert_found(row, FileNotFoundError))
+
+
+async def restore_file_meta(
+    *,
+    conn: Connection,
+    file_id: UUID,
+) -> File:
+    """Take a file out of the trash, back into the folder it was deleted from.
+
+    If that folder was deleted in the meantime, it is re-created (with any
+    missing ancestors) from the path recorded in ``trashed_from``.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    file_id:
+        Primary key of the trashed file.
+
+    Returns
+    -------
+    File
+        The restored metadata record.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no row with *file_id* is in the trash.
+    """
+    async with conn.transaction():
+        # Resolved in its own statement so the folder row is visible to the
+        # join below even when it is created here.
+        folder_id = await conn.fetchval(
+            """
+            SELECT fn_ensure_folder(owner_id, trashed_from) FROM files
+            WHERE file_id = $1 AND trashed_from IS NOT NULL
+            """,
+            file_id,
+        )
+        row = await conn.fetchrow(
+            """
+            WITH f AS (
+                UPDATE files
+                SET trashed_at = NULL,
+                    trashed_from = NULL,
+                    folder_id = COALESCE($2, folder_id)
+                WHERE file_id = $1 AND trashed_at IS NOT NULL
+                RETURNING *
+            )
+            SELECT f.*, d.path AS folder
+            FROM f JOIN folders d ON d.folder_id = f.folder_id
+            """,
+            file_id,
+            folder_id,
+        )
+    return File.from_row(assert_found(row, FileNotFoundError))
+
+
+async def list_trashed_file_meta(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[File]:
+    """Return a page of an owner's trash, most recently trashed first.
+
+    Served by the partial index ``idx_files_owner_trashed``, whose size
+    follows the trash rather than the owner's whole library.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the user whose trash should be listed.
+    limit:
+        Maximum number of rows to return.
+    offset:
+        Number of rows to skip before returning results.
+
+    Returns
+    -------
+    list[File]
+        Possibly-empty list of trashed file metadata records.  ``folder`` is
+        the folder each file was deleted from.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT * FROM v_files
+        WHERE owner_id = $1 AND trashed_at IS NOT NULL
+        ORDER BY trashed_at DESC
+        LIMIT $2 OFFSET $3
+        """,
+        owner_id,
+        limit,
+        offset,
+    )
+    return File.from_rows(rows)
+
+
+async def count_trashed_file_meta(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+) -> int:
+    """Return the number of files in *owner_id*'s trash.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the target user.
+
+    Returns
+    -------
+    int
+        Trashed file count.
+    """
+    value = await conn.fetchval(
+        "SELECT count(*) FROM files WHERE owner_id = $1 AND trashed_at IS NOT NULL",
+        owner_id,
+    )
+    return int(value or 0)
+
+
+async def purge_trashed_file_meta_and_bytes(
+    *,
+    conn: Connection,
+    owner_id: UUID | None = None,
+    retain: timedelta | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """Permanently delete trashed files, rows first and then their bytes.
+
+    Files are purged oldest-trashed first, *batch_size* at a time: each
+    batch is one statement deleting the files and their versions in its own
+    transaction, followed by bulk MinIO deletes of every object they used.  Rows locked by a concurrent
+    restore or purge are skipped rather than waited for.  As with
+    :func:`apply_file_batch`, a storage failure leaves orphaned objects,
+    never rows pointing at missing bytes; failed keys are logged.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        Only purge this owner's trash; ``None`` purges every owner's.
+    retain:
+        Only purge files that have been in the trash for longer than this;
+        ``None`` purges regardless of age.
+    batch_size:
+        Number of files deleted per transaction (and per MinIO request).
+
+    Returns
+    -------
+    int
+        Number of files purged.
+    """
+    conditions = ["trashed_at IS NOT NULL"]
+    params: list[object] = []
+    if owner_id is not None:
+        params.append(owner_id)
+        conditions.append(f"owner_id = ${len(params)}")
+    if retain is not None:
+        params.append(retain)
+        conditions.append(f"trashed_at < (NOW() AT TIME ZONE 'utc') - ${len(params)}::interval")
+    params.append(batch_size)
+
+    query = f"""
+        WITH doomed AS (
+            SELECT file_id FROM files
+            WHERE {" AND ".join(conditions)}
+            ORDER BY trashed_at
+            LIMIT ${len(params)}
+            FOR UPDATE SKIP LOCKED
+        ),
+        versions AS (
+            DELETE FROM file_versions
+            WHERE file_id IN (SELECT file_id FROM doomed)
+            RETURNING object_key
+        ),
+        purged AS (
+            DELETE FROM files
+            WHERE file_id IN (SELECT file_id FROM doomed)
+            RETURNING object_key
+        )
+        SELECT (SELECT count(*) FROM purged) AS purged,
+               ARRAY(SELECT object_key FROM purged
+                     UNION
+                     SELECT object_key FROM versions) AS object_keys
+    """
+
+    purged = 0
+    while True:
+        async with conn.transaction():
+            row = await conn.fetchrow(query, *params)
+        if not row["purged"]:
+            break
+        failed = await asyncio.to_thread(remove_files, row["object_keys"])
+        if failed:
+            logger.warning(
+                "purge left %d orphaned objects, e.g. %s", len(failed), failed[0]
+            )
+        purged += row["purged"]
+        if row["purged"] < batch_size:
+            break
+    return purged
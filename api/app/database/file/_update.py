@@ -5,6 +5,7 @@ from asyncpg import Connection
 
 from ...models.file import File
 from .._common import assert_found
+from .exceptions import FileNotFoundError
 from ._read import get_file_meta
 
 
@@ -37,21 +38,25 @@ async def rename_file_meta(
     Raises
     ------
     FileNotFoundError
-        If no row with *file_id* exists.
+        If no live (not trashed) row with *file_id* exists.
     asyncpg.CheckViolationError
         If *new_name* is an empty string or whitespace-only.
     """
     row = await conn.fetchrow(
         """
-        UPDATE files
-        SET current_name = $2
-        WHERE file_id = $1
-        RETURNING *
+        WITH f AS (
+            UPDATE files
+            SET current_name = $2
+            WHERE file_id = $1 AND trashed_at IS NULL
+            RETURNING *
+        )
+        SELECT f.*, d.path AS folder
+        FROM f JOIN folders d ON d.folder_id = f.folder_id
         """,
         file_id,
         new_name,
     )
-    return File.model_validate(assert_found(row, FileNotFoundError))
+    return File.from_row(assert_found(row, FileNotFoundError))
 
 
 async def move_file_meta(
@@ -65,7 +70,7 @@ async def move_file_meta(
 
     Only the fields explicitly passed (i.e. not ``None``) are written to the
     database, allowing callers to move across buckets, into a sub-folder, or
-    both in a single round-trip.  Passing neither argument is a no-op and
+    both in a single call.  Passing neither argument is a no-op and
     returns the current record without issuing an ``UPDATE``.
 
     Parameters
@@ -77,9 +82,8 @@ async def move_file_meta(
     bucket:
         New bucket name, or ``None`` to leave unchanged.
     folder:
-        New logical folder path, or ``None`` to leave unchanged.  Must start
-        with ``"/"`` (enforced by the database constraint
-        ``chk_files_folder_starts_with_slash``).
+        New logical folder path, or ``None`` to leave unchanged.  The folder
+        (and any missing ancestors) is created if it does not exist yet.
 
     Returns
     -------
@@ -90,9 +94,9 @@ async def move_file_meta(
     Raises
     ------
     FileNotFoundError
-        If no row with *file_id* exists.
+        If no live (not trashed) row with *file_id* exists.
     asyncpg.CheckViolationError
-        If *folder* does not start with ``"/"``.
+        If *folder* is not a valid absolute folder path.
     """
     updates: list[str] = []
     params: list[object] = [file_id]
@@ -100,21 +104,39 @@ async def move_file_meta(
     if bucket is not None:
         params.append(bucket)
         updates.append(f"bucket = ${len(params)}")
-    if folder is not None:
-        params.append(folder)
-        updates.append(f"folder = ${len(params)}")
 
-    if not updates:
+    if not updates and folder is None:
         return await get_file_meta(conn=conn, file_id=file_id)
 
-    set_clause = ", ".join(updates)
-    row = await conn.fetchrow(
-        f"""
-        UPDATE files
-        SET {set_clause}
-        WHERE file_id = $1
-        RETURNING *
-        """,
-        *params,
-    )
-    return File.model_validate(assert_found(row, FileNotFoundError))
+    async with conn.transaction():
+        if folder is not None:
+            # Resolved in its own statement so the folder row is visible to
+            # the join below even when it is created here.
+            folder_id = await conn.fetchval(
+                """
+                SELECT fn_ensure_folder(owner_id, $2) FROM files
+                WHERE file_id = $1 AND trashed_at IS NULL
+                """,
+                file_id,
+                str(folder),
+            )
+            if folder_id is None:
+                raise FileNotFoundError(f"No file found for identifier: {file_id!r}")
+            params.append(folder_id)
+            updates.append(f"folder_id = ${len(params)}")
+
+        set_clause = ", ".join(updates)
+        row = await conn.fetchrow(
+            f"""
+            WITH f AS (
+                UPDATE files
+                SET {set_clause}
+                WHERE file_id = $1 AND trashed_at IS NULL
+                RETURNING *
+            )
+            SELECT f.*, d.path AS folder
+            FROM f JOIN folders d ON d.folder_id = f.folder_id
+            """,
+            *params,
+        )
+    return File.from_row(assert_found(row, FileNotFoundError))
@@ -3,6 +3,8 @@ from __future__ import annotations
 from uuid import UUID
 from asyncpg import Connection
 
+from ...models.file import CounterDrift
+from ...models.types import LogicalPath
 from ._minio_client import file_exists
 
 
@@ -11,7 +13,11 @@ async def count_file_meta_by_owner(
     conn: Connection,
     owner_id: UUID,
 ) -> int:
-    """Return the total number of files owned by *owner_id*.
+    """Return the number of live (not trashed) files owned by *owner_id*.
+
+    Reads the ``users.file_count`` counter maintained by the
+    ``fn_files_counters`` trigger, so the cost does not grow with the number
+    of files the owner has.
 
     Parameters
     ----------
@@ -23,12 +29,49 @@ async def count_file_meta_by_owner(
     Returns
     -------
     int
-        Row count; ``0`` if the owner has no files.
+        File count; ``0`` if the owner has no files or does not exist.
     """
-    return await conn.fetchval(  # type: ignore[return-value]
-        "SELECT COUNT(*) FROM files WHERE owner_id = $1",
+    value = await conn.fetchval(
+        "SELECT file_count FROM users WHERE user_id = $1",
         owner_id,
     )
+    return int(value or 0)
+
+
+async def count_file_meta_by_folder(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    folder: LogicalPath,
+) -> int:
+    """Return the number of live files stored directly in *folder* for *owner_id*.
+
+    Reads ``folders.file_count``, maintained by the ``fn_files_counters``
+    trigger; sub-folders are not included.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the target user.
+    folder:
+        Logical folder path (e.g. ``"/docs"``).
+
+    Returns
+    -------
+    int
+        File count; ``0`` if the folder holds no files.
+    """
+    value = await conn.fetchval(
+        """
+        SELECT file_count FROM folders
+        WHERE owner_id = $1 AND path = $2
+        """,
+        owner_id,
+        str(folder),
+    )
+    return int(value or 0)
 
 
 async def total_bytes_by_owner(
@@ -38,6 +81,11 @@ async def total_bytes_by_owner(
 ) -> int:
     """Return the aggregate stored size (in bytes) for all files owned by *owner_id*.
 
+    Reads the ``users.storage_used`` counter maintained by the
+    ``fn_files_counters`` trigger, so the cost does not grow with the number
+    of files the owner has.  Files in the trash are included: their bytes
+    count towards the quota until they are purged.
+
     Parameters
     ----------
     conn:
@@ -48,14 +96,103 @@ async def total_bytes_by_owner(
     Returns
     -------
     int
-        Sum of ``size_bytes`` across all matching rows; ``0`` if the owner
-        has no files (``COALESCE`` prevents a ``NULL`` return).
+        Total stored bytes; ``0`` if the owner has no files or does not exist.
     """
     value = await conn.fetchval(
-        "SELECT COALESCE(SUM(size_bytes), 0) FROM files WHERE owner_id = $1",
+        "SELECT storage_used FROM users WHERE user_id = $1",
         owner_id,
     )
-    return int(value)  # type: ignore[arg-type]
+    return int(value or 0)
+
+
+async def trash_bytes_by_owner(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+) -> int:
+    """Return the size (in bytes) of the current versions of the files in *owner_id*'s trash.
+
+    Sums the trashed rows through the partial index
+    ``idx_files_owner_trashed``, so the cost follows the size of the trash.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the target user.
+
+    Returns
+    -------
+    int
+        Bytes held by the trash; ``0`` if it is empty or the owner does not
+        exist.
+    """
+    value = await conn.fetchval(
+        """
+        SELECT sum(size_bytes) FROM files
+        WHERE owner_id = $1 AND trashed_at IS NOT NULL
+        """,
+        owner_id,
+    )
+    return int(value or 0)
+
+
+async def reconcile_file_counters(
+    *,
+    conn: Connection,
+    owner_id: UUID | None = None,
+    repair: bool = True,
+) -> list[CounterDrift]:
+    """Detect, and optionally repair, drift in the trigger-maintained counters.
+
+    Recomputes ``users.file_count`` / ``users.storage_used`` and
+    ``folders.file_count`` / ``folders.size_bytes`` from the ``files`` rows
+    via ``fn_reconcile_file_counters``; trashed files count towards
+    ``storage_used`` only.  Each owner is checked in its own
+    transaction, holding that owner's counter rows locked only while its
+    files are re-aggregated, so a full sweep never blocks everyone's uploads
+    at once.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        Owner to check, or ``None`` to sweep every user.
+    repair:
+        When ``True`` (default) drifted counters are overwritten with the
+        recomputed values; when ``False`` they are only reported.
+
+    Returns
+    -------
+    list[CounterDrift]
+        One entry per counter row that disagreed with the files it
+        describes (before any repair); empty when everything is consistent.
+
+    Raises
+    ------
+    asyncpg.CheckViolationError
+        If a repaired ``storage_used`` would exceed the owner's quota.
+    """
+    if owner_id is None:
+        owner_ids = [
+            row["user_id"]
+            for row in await conn.fetch("SELECT user_id FROM users ORDER BY user_id")
+        ]
+    else:
+        owner_ids = [owner_id]
+
+    drift: list[CounterDrift] = []
+    for oid in owner_ids:
+        async with conn.transaction():
+            rows = await conn.fetch(
+                "SELECT * FROM fn_reconcile_file_counters($1, $2)",
+                oid,
+                repair,
+            )
+        drift.extend(CounterDrift.from_rows(rows))
+    return drift
 
 
 async def file_meta_and_bytes_exists(
@@ -65,9 +202,9 @@ async def file_meta_and_bytes_exists(
 ) -> bool:
     """Check whether a file exists in both the database and object storage.
 
-    Uses a lightweight ``EXISTS`` sub-query instead of fetching the full row,
-    and only calls the MinIO existence check when the DB row is present (short-
-    circuit evaluation).
+    Fetches only the row's ``object_key`` instead of the full row, and only
+    calls the MinIO existence check when the DB row is present (short-circuit
+    evaluation).
 
     Parameters
     ----------
@@ -82,8 +219,8 @@ async def file_meta_and_bytes_exists(
         ``True`` only if *both* the metadata row and the stored bytes exist;
         ``False`` otherwise.
     """
-    value = await conn.fetchval(
-        "SELECT EXISTS(SELECT 1 FROM files WHERE file_id = $1)",
+    object_key = await conn.fetchval(
+        "SELECT object_key FROM files WHERE file_id = $1",
         file_id,
     )
-    return bool(value) and file_exists(file_id=file_id)
+    return object_key is not None and file_exists(object_key)
@@ -0,0 +1,505 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import BinaryIO
+from uuid import UUID, uuid7
+from asyncpg import Connection, CheckViolationError, Record
+
+from ...models.file import File, FileContent, FileVersion
+from .._common import assert_found
+from ..user.exceptions import StorageQuotaExceededError
+from ._minio_client import put_file, remove_files
+from .exceptions import FileError, FileNotFoundError, FileVersionNotFoundError
+
+
+logger = logging.getLogger(__name__)
+
+
+_LOCK_CURRENT_SQL = """
+    SELECT file_id, owner_id, object_key, mime_type, size_bytes, sha256_hex,
+           version_no, version_created_at
+    FROM files
+    WHERE file_id = $1 AND trashed_at IS NULL
+    FOR UPDATE
+"""
+
+
+# Deletes the file_versions rows selected by the ``doomed`` query (columns
+# file_id, version_no) and returns how many went, plus the object keys that
+# neither the files' current versions nor their remaining versions use.
+_DELETE_VERSIONS_SQL = """
+    WITH doomed AS ({doomed}),
+    gone AS (
+        DELETE FROM file_versions v
+        USING doomed d
+        WHERE v.file_id = d.file_id AND v.version_no = d.version_no
+        RETURNING v.file_id, v.object_key
+    )
+    SELECT (SELECT count(*) FROM gone) AS deleted,
+           ARRAY(
+               SELECT DISTINCT g.object_key FROM gone g
+               WHERE NOT EXISTS (
+                   SELECT 1 FROM files f
+                   WHERE f.file_id = g.file_id AND f.object_key = g.object_key
+               )
+               AND NOT EXISTS (
+                   SELECT 1 FROM file_versions v
+                   WHERE v.file_id = g.file_id AND v.object_key = g.object_key
+                     AND (v.file_id, v.version_no) NOT IN (SELECT file_id, version_no FROM doomed)
+               )
+           ) AS object_keys
+"""
+
+
+async def _replace_current_version(
+    conn: Connection,
+    current: Record,
+    *,
+    object_key: str,
+    mime_type: str,
+    size_bytes: int,
+    sha256: bytes,
+) -> Record:
+    """Make new content the current version, keeping *current* as a version.
+
+    *current* must be the file's row, locked ``FOR UPDATE`` by the caller's
+    transaction.  Returns the updated row in ``v_files`` shape.
+    """
+    row = await conn.fetchrow(
+        """
+        WITH f AS (
+            UPDATE files
+            SET object_key = $2,
+                mime_type = $3,
+                size_bytes = $4,
+                sha256_hex = $5,
+                version_no = version_no + 1,
+                version_created_at = NOW() AT TIME ZONE 'utc'
+            WHERE file_id = $1
+            RETURNING *
+        )
+        SELECT f.*, d.path AS folder
+        FROM f JOIN folders d ON d.folder_id = f.folder_id
+        """,
+        current["file_id"],
+        object_key,
+        mime_type,
+        size_bytes,
+        sha256,
+    )
+    await conn.execute(
+        """
+        INSERT INTO file_versions (
+            file_id, version_no, owner_id, object_key,
+            mime_type, size_bytes, sha256_hex, created_at
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+        """,
+        current["file_id"],
+        current["version_no"],
+        current["owner_id"],
+        current["object_key"],
+        current["mime_type"],
+        current["size_bytes"],
+        current["sha256_hex"],
+        current["version_created_at"],
+    )
+    return row
+
+
+# The key of a stored object holding *sha256* for the file, current version
+# or kept ones.
+_FIND_OBJECT_SQL = """
+    SELECT object_key FROM files WHERE file_id = $1 AND sha256_hex = $2
+    UNION ALL
+    SELECT object_key FROM file_versions WHERE file_id = $1 AND sha256_hex = $2
+    LIMIT 1
+"""
+
+
+async def _upload_version(file_id: UUID, content: FileContent, file_bytes: BinaryIO) -> str:
+    """Upload new content under a fresh key, in a worker thread; returns the key."""
+    object_key = f"{file_id}/{uuid7()}"
+    await asyncio.to_thread(
+        put_file,
+        object_key=object_key,
+        file_bytes=file_bytes,
+        size_bytes=content.size_bytes,
+    )
+    return object_key
+
+
+async def create_file_version(
+    *,
+    conn: Connection,
+    file_id: UUID,
+    content: FileContent,
+    file_bytes: BinaryIO,
+) -> File:
+    """Replace a file's content, keeping the previous content as a version.
+
+    The file keeps its id, name and folder; its version number goes up by
+    one and the old content is recorded in ``file_versions``.  Content is
+    addressed by SHA-256 within a file: if *content* matches the current
+    version or any kept version, the new version points at the object that
+    already holds those bytes and nothing is uploaded.  Uploading content
+    identical to the current version (same hash and MIME type) is a no-op.
+
+    New bytes are uploaded in a worker thread before the file is locked,
+    under a key of their own, so neither the event loop nor the row lock
+    waits on the transfer.  Whether the content is already stored is
+    decided again under the lock; an upload that turns out not to be needed,
+    or whose version could not be written, is removed afterwards.  Only if
+    the stored copy went away in between (a concurrent prune) is the upload
+    made while the lock is held.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    file_id:
+        Primary key of the live file to update.
+    content:
+        MIME type, size and SHA-256 hash of the new content.
+    file_bytes:
+        Readable binary stream with the new content; only read when the
+        content is not already stored.
+
+    Returns
+    -------
+    File
+        The file's metadata record with its new current version.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no live (not trashed) row with *file_id* exists.
+    StorageQuotaExceededError
+        If keeping the old version alongside the new one would take the
+        owner past their quota; nothing is written.
+    """
+    sha256 = bytes.fromhex(content.sha256_hex)
+    uploaded = None
+    if await conn.fetchval(_FIND_OBJECT_SQL, file_id, sha256) is None:
+        uploaded = await _upload_version(file_id, content, file_bytes)
+
+    object_key = used = None
+    try:
+        async with conn.transaction():
+            current = assert_found(
+                await conn.fetchrow(_LOCK_CURRENT_SQL, file_id), FileNotFoundError
+            )
+            if (
+                current["sha256_hex"] == sha256
+                and current["mime_type"] == content.mime_type
+            ):
+                row = await conn.fetchrow("SELECT * FROM v_files WHERE file_id = $1", file_id)
+            else:
+                object_key = await conn.fetchval(_FIND_OBJECT_SQL, file_id, sha256)
+                if object_key is None:
+                    if uploaded is None:
+                        uploaded = await _upload_version(file_id, content, file_bytes)
+                    object_key = uploaded
+                row = await _replace_current_version(
+                    conn,
+                    current,
+                    object_key=object_key,
+                    mime_type=content.mime_type,
+                    size_bytes=content.size_bytes,
+                    sha256=sha256,
+                )
+        used = object_key
+    except CheckViolationError as exc:
+        if exc.constraint_name == "chk_users_storage_within_quota":
+            raise StorageQuotaExceededError(
+                f"A new version of file '{file_id}' would exceed the storage quota."
+            ) from exc
+        raise
+    finally:
+        if uploaded is not None and uploaded != used:
+            if await asyncio.to_thread(remove_files, [uploaded]):
+                logger.warning("unused version upload left an orphaned object: %s", uploaded)
+
+    return File.from_row(row)
+
+
+async def list_file_versions(
+    *,
+    conn: Connection,
+    file_id: UUID,
+) -> list[FileVersion]:
+    """Return every version of a file, newest first.
+
+    The first item is the current version (``superseded_at`` is ``None``)
+    unless the file is in the trash or does not exist.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    file_id:
+        Primary key of the file.
+
+    Returns
+    -------
+    list[FileVersion]
+        Possibly-empty list of versions, by descending ``version_no``.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT file_id, version_no, mime_type, size_bytes, sha256_hex,
+               version_created_at AS created_at,
+               NULL::timestamptz AS superseded_at
+        FROM files
+        WHERE file_id = $1 AND trashed_at IS NULL
+        UNION ALL
+        SELECT file_id, version_no, mime_type, size_bytes, sha256_hex,
+               created_at, superseded_at
+        FROM file_versions
+        WHERE file_id = $1
+        ORDER BY version_no DESC
+        """,
+        file_id,
+    )
+    return FileVersion.from_rows(rows)
+
+
+async def restore_file_version(
+    *,
+    conn: Connection,
+    file_id: UUID,
+    version_no: int,
+) -> File:
+    """Make an earlier version's content current again.
+
+    The restored content becomes a new version on top of the history (the
+    version it was copied from, and the one it replaces, are both kept).
+    The new version shares the old one's stored object, so no bytes are
+    copied, though the owner is charged for both versions.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    file_id:
+        Primary key of the live file.
+    version_no:
+        Number of the noncurrent version to restore.
+
+    Returns
+    -------
+    File
+        The file's metadata record with its new current version.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no live (not trashed) row with *file_id* exists.
+    FileVersionNotFoundError
+        If the file has no noncurrent version *version_no*.
+    StorageQuotaExceededError
+        If the restored version would take the owner past their quota.
+    """
+    try:
+        async with conn.transaction():
+            current = assert_found(
+                await conn.fetchrow(_LOCK_CURRENT_SQL, file_id), FileNotFoundError
+            )
+            version = assert_found(
+                await conn.fetchrow(
+                    """
+                    SELECT object_key, mime_type, size_bytes, sha256_hex
+                    FROM file_versions
+                    WHERE file_id = $1 AND version_no = $2
+                    """,
+                    file_id,
+                    version_no,
+                ),
+                FileVersionNotFoundError,
+            )
+            row = await _replace_current_version(
+                conn,
+                current,
+                object_key=version["object_key"],
+                mime_type=version["mime_type"],
+                size_bytes=version["size_bytes"],
+                sha256=version["sha256_hex"],
+            )
+    except CheckViolationError as exc:
+        if exc.constraint_name == "chk_users_storage_within_quota":
+            raise StorageQuotaExceededError(
+                f"Restoring version {version_no} of file '{file_id}' would exceed the storage quota."
+            ) from exc
+        raise
+
+    return File.from_row(row)
+
+
+async def delete_file_version(
+    *,
+    conn: Connection,
+    file_id: UUID,
+    version_no: int,
+) -> bool:
+    """Permanently delete one noncurrent version of a file.
+
+    The version's object is removed from MinIO after the row, and only if
+    no other version of the file still uses it.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    file_id:
+        Primary key of the file.
+    version_no:
+        Number of the noncurrent version to delete.  The current version
+        cannot be deleted this way; replace or delete the file instead.
+
+    Returns
+    -------
+    bool
+        Always ``True`` on success.
+
+    Raises
+    ------
+    FileVersionNotFoundError
+        If the file has no noncurrent version *version_no*.
+    FileError
+        If the row was deleted but its object could not be removed.
+    """
+    doomed = """
+        SELECT file_id, version_no FROM file_versions
+        WHERE file_id = $1 AND version_no = $2
+    """
+    async with conn.transaction():
+        # Serialises with uploads that might start reusing the object.
+        await conn.execute("SELECT 1 FROM files WHERE file_id = $1 FOR UPDATE", file_id)
+        row = await conn.fetchrow(
+            _DELETE_VERSIONS_SQL.format(doomed=doomed), file_id, version_no
+        )
+        if not row["deleted"]:
+            raise FileVersionNotFoundError(
+                f"File '{file_id}' has no version {version_no} to delete."
+            )
+
+    if await asyncio.to_thread(remove_files, row["object_keys"]):
+        raise FileError(
+            f"Deleted version {version_no} of file '{file_id}', but its stored "
+            "object could not be removed and is now orphaned."
+        )
+    return True
+
+
+async def prune_file_versions(
+    *,
+    conn: Connection,
+    keep: int | None = None,
+    retain: timedelta | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """Delete noncurrent versions outside the retention policy, rows first and then bytes.
+
+    A version is pruned when it was superseded longer than *retain* ago, or
+    when its file has more than *keep* newer noncurrent versions.  Each
+    batch of *batch_size* versions is one statement in its own transaction,
+    followed by bulk MinIO deletes of the objects no kept version uses.
+    Files locked by a concurrent upload or restore are skipped rather than
+    waited for, so an object is never removed while a new version is
+    starting to share it.  Failed object keys are logged.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    keep:
+        Number of noncurrent versions to keep per file; ``None`` keeps any
+        number.
+    retain:
+        How long a superseded version is kept; ``None`` keeps it
+        regardless of age.
+    batch_size:
+        Number of versions deleted per transaction.
+
+    Returns
+    -------
+    int
+        Number of versions pruned.
+    """
+    pruned = 0
+    if retain is not None:
+        query = _DELETE_VERSIONS_SQL.format(doomed="""
+            SELECT v.file_id, v.version_no
+            FROM file_versions v JOIN files f ON f.file_id = v.file_id
+            WHERE v.superseded_at < (NOW() AT TIME ZONE 'utc') - $1::interval
+            ORDER BY v.superseded_at
+            LIMIT $2
+            FOR UPDATE OF f SKIP LOCKED
+        """)
+        while True:
+            deleted = await _delete_version_batch(conn, query, retain, batch_size)
+            pruned += deleted
+            if deleted < batch_size:
+                break
+
+    if keep is not None:
+        # One pass over file_versions finds the files with more than *keep*
+        # noncurrent versions and, for each, the newest version to prune;
+        # the batches then touch only those files' versions.  Each batch
+        # re-counts the newer versions, since a version deleted in between
+        # would otherwise leave fewer than *keep* behind.
+        excess = await conn.fetch(
+            """
+            SELECT file_id, version_no AS cutoff, total - $1 AS doomed
+            FROM (
+                SELECT file_id, version_no,
+                       row_number() OVER (PARTITION BY file_id ORDER BY version_no DESC) AS rn,
+                       count(*) OVER (PARTITION BY file_id) AS total
+                FROM file_versions
+            ) v
+            WHERE rn = $1 + 1
+            ORDER BY file_id
+            """,
+            keep,
+        )
+        query = _DELETE_VERSIONS_SQL.format(doomed="""
+            SELECT v.file_id, v.version_no
+            FROM unnest($1::uuid[], $2::int[]) AS c(file_id, cutoff)
+            JOIN files f ON f.file_id = c.file_id
+            JOIN file_versions v ON v.file_id = c.file_id AND v.version_no <= c.cutoff
+            WHERE (
+                SELECT count(*) FROM file_versions n
+                WHERE n.file_id = v.file_id AND n.version_no > v.version_no
+            ) >= $3
+            FOR UPDATE OF f SKIP LOCKED
+        """)
+        batch: list[Record] = []
+        size = 0
+        for index, row in enumerate(excess):
+            batch.append(row)
+            size += row["doomed"]
+            if size >= batch_size or index == len(excess) - 1:
+                pruned += await _delete_version_batch(
+                    conn, query,
+                    [r["file_id"] for r in batch], [r["cutoff"] for r in batch], keep,
+                )
+                batch, size = [], 0
+    return pruned
+
+
+async def _delete_version_batch(conn: Connection, query: str, *args: object) -> int:
+    """Run one ``_DELETE_VERSIONS_SQL`` batch, then remove the objects it freed."""
+    async with conn.transaction():
+        row = await conn.fetchrow(query, *args)
+    if row["object_keys"]:
+        failed = await asyncio.to_thread(remove_files, row["object_keys"])
+        if failed:
+            logger.warning(
+                "version prune left %d orphaned objects, e.g. %s", len(failed), failed[0]
+            )
+    return row["deleted"]
@@ -11,3 +11,7 @@ class FileNotFoundError(FileError):
 
 class FileCreateError(FileError):
     """Raised when a file could not be created."""
+
+
+class FileVersionNotFoundError(FileError):
+    """Raised when a file has no noncurrent version with a given number."""
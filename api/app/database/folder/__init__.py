@@ -0,0 +1,60 @@
+"""
+Async data-access layer concerned with the ``folders`` table.
+
+Folders form a per-owner tree: every row points at its parent
+(``parent_id``) and carries its materialized ``path``, so both
+"children of X" and "everything under /X" are index lookups.  Each owner
+has a root folder (``"/"``), created on demand together with any missing
+ancestors by the ``fn_ensure_folder`` database function.  ``file_count``
+and ``size_bytes`` are maintained by a trigger on ``files`` and cover the
+live (not trashed) files stored directly in the folder;
+``tree_file_count`` and ``tree_size_bytes`` cover its whole subtree.
+Deleting a folder moves the files inside it to the trash.
+
+Renaming or moving a folder rewrites the ``path`` of the folder rows in its
+subtree only; files keep their ``folder_id``, so the cost is independent of
+how many files the subtree holds.
+
+Public API
+----------
+Create
+    create_folder
+
+Read
+    get_folder
+    get_folder_by_path
+    list_folders
+
+Update
+    rename_folder
+    move_folder
+
+Delete
+    delete_folder_and_contents
+
+Exceptions re-exported for callers
+-----------------------------------
+``FolderNotFoundError``, ``FolderCreateError``, ``FolderExistsError``,
+``FolderMoveError``, ``FolderError``
+(imported from ``.exceptions``).
+"""
+
+from ._create import create_folder
+from ._read import get_folder, get_folder_by_path, list_folders
+from ._update import rename_folder, move_folder
+from ._delete import delete_folder_and_contents
+
+
+__all__ = [
+    # Create
+    "create_folder",
+    # Read
+    "get_folder",
+    "get_folder_by_path",
+    "list_folders",
+    # Update
+    "rename_folder",
+    "move_folder",
+    # Delete
+    "delete_folder_and_contents",
+]
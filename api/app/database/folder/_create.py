@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from asyncpg import Connection
+
+from ...models.folder import Folder, FolderCreate
+from .._common import assert_found
+from .exceptions import FolderNotFoundError, FolderCreateError
+
+
+async def create_folder(
+    *,
+    conn: Connection,
+    folder: FolderCreate,
+) -> Folder:
+    """Create a folder, along with any missing ancestors, and return it.
+
+    Creation is idempotent: if the folder already exists the existing row is
+    returned unchanged.  Ancestors are created by the ``fn_ensure_folder``
+    database function, so ``"/a/b/c"`` on an empty tree yields the root,
+    ``"/a"``, ``"/a/b"`` and ``"/a/b/c"``.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    folder:
+        Value object carrying the owner and the absolute logical path.
+
+    Returns
+    -------
+    Folder
+        The persisted folder row.
+
+    Raises
+    ------
+    asyncpg.ForeignKeyViolationError
+        If ``folder.owner_id`` does not reference a valid user row.
+    asyncpg.CheckViolationError
+        If the path is not a valid absolute folder path.
+    FolderCreateError
+        If the folder row could not be read back after creation.
+    """
+    try:
+        async with conn.transaction():
+            # Two statements: a row created by fn_ensure_folder is not visible
+            # to the snapshot of the statement that called it.
+            folder_id = await conn.fetchval(
+                "SELECT fn_ensure_folder($1, $2)",
+                folder.owner_id,
+                str(folder.path),
+            )
+            row = await conn.fetchrow(
+                "SELECT * FROM folders WHERE folder_id = $1",
+                folder_id,
+            )
+        row = assert_found(row, FolderNotFoundError)
+    except FolderNotFoundError:
+        raise FolderCreateError(f"Could not create folder '{folder.path}'.")
+
+    return Folder.from_row(row)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from uuid import UUID
+from asyncpg import Connection
+
+from ._read import get_folder
+from .exceptions import FolderError
+
+
+async def delete_folder_and_contents(
+    *,
+    conn: Connection,
+    folder_id: UUID,
+) -> list[UUID]:
+    """Delete a folder and its sub-folders, moving every file inside them to the trash.
+
+    The file rows of the whole subtree are trashed with one set-based
+    ``UPDATE`` and the folder rows removed with one ``DELETE`` (sub-folders
+    follow through ``parent_id ... ON DELETE CASCADE``), both in one
+    transaction; no stored bytes are touched.  Because the folders are gone,
+    each file is re-attached to the owner's root folder and remembers its
+    old folder path in ``trashed_from``, where a restore puts it back.
+    Files that were already in the trash are re-attached the same way.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.  A savepoint transaction is opened
+        internally.
+    folder_id:
+        Primary key of the folder to delete.
+
+    Returns
+    -------
+    list[UUID]
+        Ids of the files that were moved to the trash by this call.
+
+    Raises
+    ------
+    FolderNotFoundError
+        If no row with *folder_id* exists.
+    FolderError
+        If *folder_id* is the owner's root folder.
+    """
+    async with conn.transaction():
+        folder = await get_folder(conn=conn, folder_id=folder_id)
+        if folder.parent_id is None:
+            raise FolderError("The root folder cannot be deleted.")
+
+        rows = await conn.fetch(
+            """
+            UPDATE files f
+            SET trashed_at   = COALESCE(f.trashed_at, NOW() AT TIME ZONE 'utc'),
+                trashed_from = COALESCE(f.trashed_from, s.path),
+                folder_id    = (SELECT folder_id FROM folders WHERE owner_id = $1 AND path = '/')
+            FROM (
+                SELECT x.file_id, x.trashed_at IS NULL AS was_live, d.path
+                FROM files x JOIN folders d ON d.folder_id = x.folder_id
+                WHERE d.owner_id = $1
+                  AND (d.path = $2 OR (d.path ~>=~ ($2 || '/') AND d.path ~<~ ($2 || '0')))
+            ) s
+            WHERE f.file_id = s.file_id
+            RETURNING f.file_id, s.was_live
+            """,
+            folder.owner_id,
+            str(folder.path),
+        )
+        await conn.execute("DELETE FROM folders WHERE folder_id = $1", folder_id)
+
+    return [row["file_id"] for row in rows if row["was_live"]]
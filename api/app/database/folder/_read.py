@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from uuid import UUID
+from asyncpg import Connection
+
+from ...models.folder import Folder
+from ...models.types import LogicalPath
+from .._common import assert_found
+from .exceptions import FolderNotFoundError
+
+
+async def get_folder(
+    *,
+    conn: Connection,
+    folder_id: UUID,
+) -> Folder:
+    """Fetch a single folder by primary key.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    folder_id:
+        Primary key of the folder to retrieve.
+
+    Returns
+    -------
+    Folder
+        The matching folder row.
+
+    Raises
+    ------
+    FolderNotFoundError
+        If no row with *folder_id* exists.
+    """
+    row = await conn.fetchrow(
+        "SELECT * FROM folders WHERE folder_id = $1",
+        folder_id,
+    )
+    return Folder.from_row(assert_found(row, FolderNotFoundError))
+
+
+async def get_folder_by_path(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    path: LogicalPath,
+) -> Folder:
+    """Fetch an owner's folder by its logical path.
+
+    Served by the unique ``idx_folders_owner_path`` index.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the folder's owner.
+    path:
+        Absolute logical path (e.g. ``"/docs/reports"``).
+
+    Returns
+    -------
+    Folder
+        The matching folder row.
+
+    Raises
+    ------
+    FolderNotFoundError
+        If the owner has no folder at *path*.
+    """
+    row = await conn.fetchrow(
+        "SELECT * FROM folders WHERE owner_id = $1 AND path = $2",
+        owner_id,
+        str(path),
+    )
+    return Folder.from_row(assert_found(row, FolderNotFoundError))
+
+
+async def list_folders(
+    *,
+    conn: Connection,
+    owner_id: UUID,
+    parent_id: UUID | None = None,
+) -> list[Folder]:
+    """Return an owner's folders ordered by path.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    owner_id:
+        UUID of the folders' owner.
+    parent_id:
+        When provided, only the direct children of this folder are returned
+        (via ``idx_folders_parent_id``).  Omit to return the owner's whole
+        tree, root included (via ``idx_folders_owner_path``).
+
+    Returns
+    -------
+    list[Folder]
+        Possibly-empty list of folder rows.
+    """
+    if parent_id is not None:
+        rows = await conn.fetch(
+            """
+            SELECT * FROM folders
+            WHERE parent_id = $1 AND owner_id = $2
+            ORDER BY path
+            """,
+            parent_id,
+            owner_id,
+        )
+    else:
+        rows = await conn.fetch(
+            "SELECT * FROM folders WHERE owner_id = $1 ORDER BY path",
+            owner_id,
+        )
+    return Folder.from_rows(rows)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from uuid import UUID
+from asyncpg import Connection, UniqueViolationError
+
+from ...models.folder import Folder
+from .._common import assert_found
+from ._read import get_folder
+from .exceptions import FolderNotFoundError, FolderExistsError, FolderMoveError
+
+
+async def _relocate_folder(
+    *,
+    conn: Connection,
+    folder_id: UUID,
+    parent_id: UUID | None,
+    name: str | None,
+) -> Folder:
+    """Give a folder a new parent and/or name, rewriting its whole subtree's paths.
+
+    Files reference folders by id, so only ``folders`` rows in the subtree are
+    touched: the cost depends on the number of sub-folders, never on the
+    number of files they hold.  The subtree is matched with a byte-wise range
+    on ``path`` (``~>=~`` / ``~<~``), which ``idx_folders_owner_path`` serves
+    and which, unlike ``LIKE``, treats ``%`` and ``_`` in names literally.
+    """
+    try:
+        row = await conn.fetchrow(
+            """
+            WITH src AS (
+                SELECT owner_id, parent_id, name, path
+                FROM folders
+                WHERE folder_id = $1 AND parent_id IS NOT NULL
+            ),
+            dst AS (
+                SELECT d.folder_id,
+                       CASE WHEN d.path = '/' THEN '' ELSE d.path END AS prefix
+                FROM folders d, src
+                WHERE d.folder_id = COALESCE($2, src.parent_id)
+                  AND d.owner_id = src.owner_id
+                  AND d.path <> src.path
+                  AND NOT (d.path ~>=~ (src.path || '/') AND d.path ~<~ (src.path || '0'))
+            ),
+            moved AS (
+                UPDATE folders f
+                SET path = dst.prefix || '/' || COALESCE($3, src.name)
+                           || substr(f.path, length(src.path) + 1),
+                    parent_id = CASE WHEN f.folder_id = $1 THEN dst.folder_id ELSE f.parent_id END,
+                    name = CASE WHEN f.folder_id = $1 THEN COALESCE($3, src.name) ELSE f.name END
+                FROM src, dst
+                WHERE f.owner_id = src.owner_id
+                  -- One range for the index, narrowed to the folder and
+                  -- its descendants (excluding siblings like 'a.b' of 'a').
+                  -- Written as an OR of the two, the bounds come from src
+                  -- and the planner falls back to all of the owner's folders.
+                  AND f.path ~>=~ src.path AND f.path ~<~ (src.path || '0')
+                  AND (f.path = src.path OR f.path ~>=~ (src.path || '/'))
+                RETURNING f.*
+            )
+            SELECT * FROM moved WHERE folder_id = $1
+            """,
+            folder_id,
+            parent_id,
+            name,
+        )
+    except UniqueViolationError:
+        raise FolderExistsError("A folder with that path already exists.")
+
+    if row is None:
+        # Work out why nothing moved; only reached on the error path.
+        folder = await get_folder(conn=conn, folder_id=folder_id)
+        if folder.parent_id is None:
+            raise FolderMoveError("The root folder cannot be renamed or moved.")
+        if parent_id is not None:
+            await get_folder(conn=conn, folder_id=parent_id)
+        raise FolderMoveError("A folder cannot be moved into itself or its sub-folders.")
+
+    return Folder.from_row(assert_found(row, FolderNotFoundError))
+
+
+async def rename_folder(
+    *,
+    conn: Connection,
+    folder_id: UUID,
+    new_name: str,
+) -> Folder:
+    """Rename a folder in place; every descendant's path follows in the same statement.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    folder_id:
+        Primary key of the folder to rename.
+    new_name:
+        Replacement name (a single path segment, no ``"/"``; enforced by
+        ``chk_folders_path_format``).
+
+    Returns
+    -------
+    Folder
+        The renamed folder row.
+
+    Raises
+    ------
+    FolderNotFoundError
+        If no row with *folder_id* exists.
+    FolderExistsError
+        If a sibling folder already has *new_name*.
+    FolderMoveError
+        If *folder_id* is the owner's root folder.
+    asyncpg.CheckViolationError
+        If *new_name* is blank or contains ``"/"``.
+    """
+    return await _relocate_folder(
+        conn=conn, folder_id=folder_id, parent_id=None, name=new_name
+    )
+
+
+async def move_folder(
+    *,
+    conn: Connection,
+    folder_id: UUID,
+    parent_id: UUID | None = None,
+    name: str | None = None,
+) -> Folder:
+    """Re-parent a folder, optionally renaming it, together with its whole subtree.
+
+    Only the fields explicitly passed (i.e. not ``None``) change.  The move is
+    a single ``UPDATE`` over the subtree's ``folders`` rows; the files inside
+    keep their ``folder_id`` and are not rewritten.
+
+    Parameters
+    ----------
+    conn:
+        Active asyncpg connection.
+    folder_id:
+        Primary key of the folder to move.
+    parent_id:
+        New parent folder (same owner), or ``None`` to keep the current one.
+    name:
+        New name, or ``None`` to keep the current one.
+
+    Returns
+    -------
+    Folder
+        The moved folder row.
+
+    Raises
+    ------
+    FolderNotFoundError
+        If *folder_id* or *parent_id* does not exist.
+    FolderExistsError
+        If the destination already holds a folder with that name.
+    FolderMoveError
+        If *folder_id* is the root folder, or *parent_id* is the folder itself,
+        one of its descendants, or belongs to another owner.
+    """
+    return await _relocate_folder(
+        conn=conn, folder_id=folder_id, parent_id=parent_id, name=name
+    )
@@ -0,0 +1,21 @@
+"""Exceptions for the data-access layer concerned with the ``folders`` table."""
+
+
+class FolderError(Exception):
+    """Base class for all folder errors."""
+
+
+class FolderNotFoundError(FolderError):
+    """Raised when there is no folder for a given identifier or path."""
+
+
+class FolderCreateError(FolderError):
+    """Raised when a folder could not be created."""
+
+
+class FolderExistsError(FolderError):
+    """Raised when a folder would take a path that another folder already has."""
+
+
+class FolderMoveError(FolderError):
+    """Raised when a folder cannot be moved to the requested place (e.g. into itself)."""
@@ -47,7 +47,7 @@ async def create_refresh_token(
         RETURNING *
         """,
         refresh_token.user_id,
-        refresh_token.token_hash,
+        bytes.fromhex(refresh_token.token_hash),
         refresh_token.family_id,
         refresh_token.device_info,
         refresh_token.ip_address,
@@ -59,5 +59,5 @@ async def create_refresh_token(
         raise TokenCreateError(
             f"Could not create a refresh token for user: {refresh_token.user_id}"
         )
-    return RefreshToken.model_validate(row)
+    return RefreshToken.from_row(row)
 
@@ -35,9 +35,9 @@ async def get_refresh_token_by_hash(
     """
     row = await conn.fetchrow(
         "SELECT * FROM refresh_tokens WHERE token_hash = $1",
-        token_hash,
+        bytes.fromhex(token_hash),
     )
-    return RefreshToken.model_validate(assert_found(row, TokenNotFoundError))
+    return RefreshToken.from_row(assert_found(row, TokenNotFoundError))
 
 
 async def get_refresh_token_by_id(
@@ -68,7 +68,7 @@ async def get_refresh_token_by_id(
         "SELECT * FROM refresh_tokens WHERE token_id = $1",
         token_id,
     )
-    return RefreshToken.model_validate(assert_found(row, TokenNotFoundError))
+    return RefreshToken.from_row(assert_found(row, TokenNotFoundError))
 
 
 async def get_active_refresh_tokens_for_user(
@@ -103,7 +103,7 @@ async def get_active_refresh_tokens_for_user(
         """,
         user_id,
     )
-    return [RefreshToken.model_validate(row) for row in rows]
+    return RefreshToken.from_rows(rows)
 
 
 async def get_refresh_token_family(
@@ -137,4 +137,4 @@ async def get_refresh_token_family(
         """,
         family_id,
     )
-    return [RefreshToken.model_validate(row) for row in rows]
+    return RefreshToken.from_rows(rows)
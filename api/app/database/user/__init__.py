@@ -8,13 +8,12 @@ a straightforward try/except rather than null-checking and error guissing every
 """
 
 from ._create import create_user
-from ._read import get_user_by_id, get_user_by_email, count_users, list_users
+from ._read import get_user_by_id, get_user_usage, get_user_by_email, count_users, list_users
 from ._auth import get_active_verified_user_by_email, record_login
 from ._update import (
     update_email,
     update_name,
     update_password,
-    increment_storage_used,
     update_storage_quota,
 )
 from ._verification import increment_verification_version, mark_verified
@@ -23,6 +22,7 @@ from ._lifecycle import (
     deactivate_user,
     reactivate_user,
     delete_user,
+    list_valid_since,
 )
 
 
@@ -31,6 +31,7 @@ __all__ = [
     "create_user",
     # Read
     "get_user_by_id",
+    "get_user_usage",
     "get_user_by_email",
     "count_users",
     "list_users",
@@ -41,7 +42,6 @@ __all__ = [
     "update_name",
     "update_email",
     "update_password",
-    "increment_storage_used",
     "update_storage_quota",
     # Update — verification
     "increment_verification_version",
@@ -51,4 +51,5 @@ __all__ = [
     "deactivate_user",
     "reactivate_user",
     "delete_user",
+    "list_valid_since",
 ]
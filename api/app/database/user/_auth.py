@@ -35,7 +35,7 @@ async def get_active_verified_user_by_email(
         email,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def record_login(
@@ -59,5 +59,5 @@ async def record_login(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
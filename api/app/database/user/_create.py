@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from uuid import uuid4
+from uuid import uuid7
 from asyncpg import Connection, UniqueViolationError
 
 from .exceptions import UserNotFoundError, UserCreateError, EmailAlreadyExistsError
@@ -21,7 +21,7 @@ async def create_user(
         UserCreateError: The INSERT returned no row (should not happen in
             normal operation, but guards against unexpected DB behaviour).
     """
-    user_id = uuid4()
+    user_id = uuid7()
 
     try:
         row = await conn.fetchrow(
@@ -44,4 +44,4 @@ async def create_user(
     except UniqueViolationError:
         raise EmailAlreadyExistsError(f"User with email {user_data.email!r} already exists.")
 
-    return User.model_validate(row)
+    return User.from_row(row)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from uuid import UUID
+from datetime import datetime
 from asyncpg import Connection
 
 from .exceptions import UserNotFoundError
@@ -33,7 +34,7 @@ async def invalidate_access_tokens(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def deactivate_user(
@@ -62,7 +63,7 @@ async def deactivate_user(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def reactivate_user(
@@ -88,7 +89,7 @@ async def reactivate_user(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def delete_user(
@@ -108,3 +109,22 @@ async def delete_user(
     result: str = await conn.execute("DELETE FROM users WHERE user_id = $1", user_id)
     if result == "DELETE 0":
         raise UserNotFoundError(f"No user found for identifier: {user_id!r}")
+
+
+async def list_valid_since(
+    *,
+    conn: Connection,
+    since: datetime,
+) -> dict[UUID, datetime]:
+    """
+    Return the ``valid_since`` of every user whose value is later than *since*.
+
+    With *since* set one access-token lifetime back, these are the only users
+    whose unexpired tokens a ``valid_since`` check can reject.  Served by
+    ``idx_users_valid_since``.
+    """
+    rows = await conn.fetch(
+        "SELECT user_id, valid_since FROM users WHERE valid_since > $1",
+        since,
+    )
+    return {row["user_id"]: row["valid_since"] for row in rows}
@@ -22,7 +22,25 @@ async def get_user_by_id(
     """
     row = await conn.fetchrow("SELECT * FROM users WHERE user_id = $1", user_id)
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
+
+
+async def get_user_usage(
+    *,
+    conn: Connection,
+    user_id: UUID,
+) -> tuple[int, int]:
+    """
+    Fetch a user's trigger-maintained ``storage_used`` and ``file_count`` counters.
+
+    Raises:
+        UserNotFoundError: No user exists with that UUID.
+    """
+    row = await conn.fetchrow(
+        "SELECT storage_used, file_count FROM users WHERE user_id = $1", user_id
+    )
+    row = assert_found(row, UserNotFoundError)
+    return row["storage_used"], row["file_count"]
 
 
 async def get_user_by_email(
@@ -38,7 +56,7 @@ async def get_user_by_email(
     """
     row = await conn.fetchrow("SELECT * FROM users WHERE email = $1", email)
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def count_users(
@@ -86,7 +104,7 @@ async def list_users(
     base_sql = "SELECT * FROM users{where} ORDER BY created_at DESC LIMIT $1 OFFSET $2"
     where = " WHERE is_active = TRUE" if active_only else ""
     rows = await conn.fetch(base_sql.format(where=where), safe_limit, safe_offset)
-    rows = [User.model_validate(row) for row in rows]
+    rows = User.from_rows(rows)
 
     total = await count_users(conn=conn, active_only=active_only)
     remaining = max(0, total - (safe_offset + len(rows)))
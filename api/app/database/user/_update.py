@@ -32,7 +32,7 @@ async def update_name(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def update_email(
@@ -67,7 +67,7 @@ async def update_email(
         raise EmailAlreadyExistsError(f"User with email {email!r} already exists.")
 
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def update_password(
@@ -95,47 +95,7 @@ async def update_password(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
-
-
-async def increment_storage_used(
-    *,
-    conn: Connection,
-    user_id: UUID,
-    delta_bytes: int,
-) -> User:
-    """
-    Atomically adjust ``storage_used`` by ``delta_bytes`` (positive to
-    consume space, negative to free it).
-
-    The database ``CHECK`` constraint ``storage_used <= storage_quota`` acts
-    as the authoritative ceiling; a violation is caught here and re-raised as
-    a friendlier domain exception.
-
-    Raises:
-        StorageQuotaExceededError: The delta would push usage above quota.
-        UserNotFoundError: No user exists with that UUID.
-    """
-    try:
-        row = await conn.fetchrow(
-            """
-            UPDATE users
-            SET storage_used = storage_used + $1
-            WHERE user_id = $2
-            RETURNING *
-            """,
-            delta_bytes,
-            user_id,
-        )
-    except CheckViolationError as exc:
-        if "storage" in str(exc):
-            raise StorageQuotaExceededError(
-                f"Operation would exceed storage quota for user {user_id}."
-            ) from exc
-        raise
-
-    row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def update_storage_quota(
@@ -172,4 +132,4 @@ async def update_storage_quota(
         ) from exc
 
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
@@ -33,7 +33,7 @@ async def increment_verification_version(
         user_id,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
 
 
 async def mark_verified(
@@ -68,4 +68,4 @@ async def mark_verified(
         verification_version,
     )
     row = assert_found(row, UserNotFoundError)
-    return User.model_validate(row)
+    return User.from_row(row)
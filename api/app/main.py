@@ -1,23 +1,39 @@
 import os
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from asyncpg import Pool, create_pool
+from asyncpg import Pool, connect, create_pool
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .routes.auth import router as auth_router
 from .routes.files import router as files_router
+from .services.housekeeping import start_housekeeping
+from .services.notifications import start_notifications
+from .services.passwords import start_password_hasher
+from .services.principals import create_principal_cache
+from .services.sessions import start_token_cache_stats, valid_since_table, verified_tokens
 
 
-async def get_pool() -> Pool:
-    return await create_pool(
+logger = logging.getLogger(__name__)
+
+
+def _connect_kwargs() -> dict:
+    return dict(
         host=os.environ["POSTGRES_HOST"],
         port=os.environ["POSTGRES_PORT"],
         user=os.environ["POSTGRES_APP_ROLE"],
         password=os.environ["POSTGRES_APP_PASSWORD"],
         database=os.environ["POSTGRES_DB"],
+    )
+
+
+async def get_pool() -> Pool:
+    return await create_pool(
+        **_connect_kwargs(),
         min_size=int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "5")),
         max_size=int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "20")),
     )
@@ -26,7 +42,28 @@ async def get_pool() -> Pool:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.pool = await get_pool()
+    app.state.passwords = start_password_hasher()
+    app.state.principals = create_principal_cache()
+    # Loaded before serving; the notification hub reloads it once listening.
+    async with app.state.pool.acquire() as conn:
+        await valid_since_table.refresh(conn)
+    housekeeping = start_housekeeping(app.state.pool)
+    token_cache_stats = start_token_cache_stats(verified_tokens)
+    notifications, app.state.file_events = start_notifications(
+        lambda: connect(**_connect_kwargs()), app.state.principals
+    )
     yield
+    await notifications.stop()
+    for task in (housekeeping, token_cache_stats):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    app.state.passwords.shutdown()
+    logger.info("verified-token cache: %s", verified_tokens.stats())
     await app.state.pool.close()
 
 
@@ -0,0 +1,56 @@
+from functools import lru_cache
+from pathlib import PurePosixPath
+from typing import Any, Callable, ClassVar, Iterable, Mapping, Self
+
+from pydantic import BaseModel
+
+
+# Rows of one listing share a handful of folders; paths are immutable, so a
+# single instance per distinct path string can be handed to every row.
+row_path = lru_cache(maxsize=4096)(PurePosixPath)
+
+
+class RowModel(BaseModel):
+    """Base for models that are also loaded from trusted database rows.
+
+    Values read back from Postgres have already passed the table's
+    constraints (and, on the way in, the model's own validators), so
+    :meth:`from_row` and :meth:`from_rows` build instances without running
+    validation again.  Only columns whose asyncpg type differs from the
+    field's type are converted, via ``_row_converters``.  Input from clients
+    must keep going through normal validation.
+    """
+
+    # Field name -> callable applied to the column value when it is not None.
+    _row_converters: ClassVar[Mapping[str, Callable[[Any], Any]]] = {}
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> Self:
+        """Build an instance from one database row, without validation.
+
+        *row* must have a column for every field; extra columns are ignored.
+        """
+        return cls.from_rows((row,))[0]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> list[Self]:
+        """Build one instance per database row, without validation."""
+        fields = tuple(cls.model_fields)
+        converters = cls._row_converters.items()
+        new = cls.__new__
+        setattr_ = object.__setattr__
+        out = []
+        for row in rows:
+            values = {name: row[name] for name in fields}
+            for name, convert in converters:
+                if values[name] is not None:
+                    values[name] = convert(values[name])
+            # What model_construct does for a model with no extra or private
+            # attributes, minus its per-field default handling.
+            obj = new(cls)
+            setattr_(obj, "__dict__", values)
+            setattr_(obj, "__pydantic_fields_set__", set(fields))
+            setattr_(obj, "__pydantic_extra__", None)
+            setattr_(obj, "__pydantic_private__", None)
+            out.append(obj)
+        return out
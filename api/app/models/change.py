@@ -0,0 +1,40 @@
+from uuid import UUID
+from typing import Literal
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from .file import File
+from .folder import Folder
+
+
+ChangeKind = Literal[
+    "created",
+    "renamed",
+    "moved",
+    "deleted",
+    "content_changed",
+    "trashed",
+    "restored",
+    "folder_created",
+    "folder_moved",
+    "folder_deleted",
+]
+
+
+class FileChange(BaseModel):
+    seq: int = Field(..., gt=0)
+    kind: ChangeKind
+    file_id: UUID | None
+    folder_id: UUID | None
+    changed_at: datetime
+
+    # Current state of the subject; None once it no longer exists.
+    file: File | None = None
+    folder: Folder | None = None
+
+
+class ChangeBatch(BaseModel):
+    changes: list[FileChange]
+    cursor: int = Field(..., ge=0)
+    has_more: bool
+    resync_required: bool
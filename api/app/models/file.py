@@ -1,25 +1,35 @@
 from uuid import UUID
+from typing import Literal
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
+from ._row import RowModel, row_path
 from .types import SHA256Hex, LogicalPath, Bucket, MimeType
 
 
-class File(BaseModel):
+class File(RowModel):
+    # sha256_hex is stored as 32 raw bytes.
+    _row_converters = {"folder": row_path, "sha256_hex": bytes.hex}
+
     file_id: UUID
     owner_id: UUID
 
     bucket: Bucket
+    folder_id: UUID
     folder: LogicalPath
+    object_key: str
 
     original_name: str = Field(..., min_length=1)
     current_name: str = Field(..., min_length=1)
     mime_type: MimeType
     size_bytes: int = Field(..., gt=0)
     sha256_hex: SHA256Hex
+    version_no: int = Field(1, gt=0)
 
     created_at: datetime
     updated_at: datetime | None
+    # Set while the file is in the trash.
+    trashed_at: datetime | None = None
 
 
 class FileCreate(BaseModel):
@@ -32,6 +42,27 @@ class FileCreate(BaseModel):
     sha256_hex: SHA256Hex
 
 
+class FileContent(BaseModel):
+    mime_type: MimeType
+    size_bytes: int = Field(..., gt=0)
+    sha256_hex: SHA256Hex
+
+
+class FileVersion(RowModel):
+    _row_converters = {"sha256_hex": bytes.hex}
+
+    file_id: UUID
+    version_no: int = Field(..., gt=0)
+
+    mime_type: MimeType
+    size_bytes: int = Field(..., gt=0)
+    sha256_hex: SHA256Hex
+
+    created_at: datetime
+    # None for the current version.
+    superseded_at: datetime | None
+
+
 class FileUpdate(BaseModel):
     owner_id: UUID
     name: str = Field(..., min_length=1)
@@ -47,4 +78,66 @@ class FileResponcse(BaseModel):
     size_bytes: int = Field(..., gt=0)
     sha256_hex: SHA256Hex
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+class FileBatchOperation(BaseModel):
+    op: Literal["rename", "move", "delete"]
+    file_id: UUID
+    name: str | None = Field(None, min_length=1)
+    folder: str | None = None
+
+    @model_validator(mode="after")
+    def _check_arguments(self) -> "FileBatchOperation":
+        if self.op == "rename" and self.name is None:
+            raise ValueError("'rename' operations require 'name'")
+        if self.op == "move" and self.folder is None:
+            raise ValueError("'move' operations require 'folder'")
+        return self
+
+
+class FileBatchRequest(BaseModel):
+    operations: list[FileBatchOperation] = Field(..., min_length=1, max_length=5000)
+
+
+class FileBatchResult(BaseModel):
+    updated: list[File]
+    deleted: list[UUID]
+    missing: list[UUID]
+
+
+class CounterDrift(RowModel):
+    scope: Literal["user", "folder", "folder_tree", "mime_family", "month"]
+    id: UUID
+    bucket: str | None = None
+    owner_id: UUID
+    file_count: int
+    actual_file_count: int
+    size_bytes: int
+    actual_size_bytes: int
+
+
+class UsageBucket(BaseModel):
+    key: str
+    file_count: int = Field(..., ge=0)
+    size_bytes: int = Field(..., ge=0)
+
+
+class StorageBreakdown(BaseModel):
+    by_type: list[UsageBucket]
+    by_folder: list[UsageBucket]
+    by_age: list[UsageBucket]
+
+
+class DuplicateGroup(BaseModel):
+    sha256_hex: SHA256Hex
+    size_bytes: int = Field(..., gt=0)
+    copies: int = Field(..., gt=1)
+    # Bytes freed by keeping a single copy.
+    reclaimable_bytes: int = Field(..., ge=0)
+    files: list[File]
+
+
+class DuplicateReport(BaseModel):
+    groups: list[DuplicateGroup]
+    total_groups: int = Field(..., ge=0)
+    reclaimable_bytes: int = Field(..., ge=0)
@@ -0,0 +1,30 @@
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from ._row import RowModel, row_path
+from .types import LogicalPath
+
+
+class Folder(RowModel):
+    _row_converters = {"path": row_path}
+
+    folder_id: UUID
+    owner_id: UUID
+    parent_id: UUID | None
+
+    name: str
+    path: LogicalPath
+
+    file_count: int = Field(..., ge=0)
+    size_bytes: int = Field(..., ge=0)
+    tree_file_count: int = Field(..., ge=0)
+    tree_size_bytes: int = Field(..., ge=0)
+
+    created_at: datetime
+    updated_at: datetime | None
+
+
+class FolderCreate(BaseModel):
+    owner_id: UUID
+    path: LogicalPath
@@ -1,12 +1,17 @@
 from uuid import UUID
+from ipaddress import ip_address
 from datetime import datetime
 from pydantic import BaseModel, Field, field_serializer, model_validator
 from pydantic.networks import IPvAnyAddress
 
+from ._row import RowModel
 from .types import SHA256Hex
 
 
-class RefreshToken(BaseModel):
+class RefreshToken(RowModel):
+    # token_hash is stored as 32 raw bytes.
+    _row_converters = {"ip_address": ip_address, "token_hash": bytes.hex}
+
     token_id: UUID
     user_id: UUID
 
@@ -1,24 +1,33 @@
 import re
-from typing import Annotated
+from typing import Annotated, Any, Iterable
+from functools import lru_cache
 from pathlib import PurePosixPath
 from pydantic import Field, TypeAdapter, EmailStr
 from pydantic.functional_validators import AfterValidator
 from pydantic.networks import IPvAnyAddress
 
 
-_BUCKET_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9\-]{1,61}[a-z0-9]$")
-_IP_ADDRESS_RE = re.compile(r"^\d+\.\d+\.\d+\.\d+$")
-_MIME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9!#$&\-^_]*\/[a-zA-Z0-9][a-zA-Z0-9!#$&\-^_.+]*$")
+_BUCKET_NAME_RE = re.compile(r"[a-z0-9][a-z0-9\-]{1,61}[a-z0-9]")
+_IP_ADDRESS_RE = re.compile(r"\d+\.\d+\.\d+\.\d+")
+_MIME_RE = re.compile(r"[a-zA-Z0-9][a-zA-Z0-9!#$&\-^_]*\/[a-zA-Z0-9][a-zA-Z0-9!#$&\-^_.+]*")
+_SHA256_HEX_RE = re.compile(r"[0-9a-fA-F]{64}")
+_HEX_RE = re.compile(r"[0-9a-fA-F]*")
 
+# Building a TypeAdapter compiles a validator; do it once, not per value.
+_EMAIL_ADAPTER = TypeAdapter(EmailStr)
 
+
+# Bucket names and MIME types take few distinct values, so successful
+# validations are cached; failures raise and are never cached.
+@lru_cache(maxsize=256)
 def _validate_bucket_name(value: str) -> str:
-    if not _BUCKET_NAME_RE.match(value):
+    if not _BUCKET_NAME_RE.fullmatch(value):
         raise ValueError(
             f"'{value}' is not a valid bucket name: must be 3-63 characters, "
             "lowercase letters, numbers, and hyphens only, "
             "and must start and end with a letter or number"
         )
-    if _IP_ADDRESS_RE.match(value):
+    if _IP_ADDRESS_RE.fullmatch(value):
         raise ValueError(
             f"'{value}' is not a valid bucket name: must not be an IP address"
         )
@@ -29,27 +38,28 @@ def _validate_bucket_name(value: str) -> str:
     return value
 
 
+@lru_cache(maxsize=1024)
 def _validate_mime(value: str) -> str:
-    if not _MIME_RE.match(value):
+    if not _MIME_RE.fullmatch(value):
         raise ValueError(f"'{value}' is not a valid MIME type")
     return value.lower()
 
 
 def _validate_hex(value: str) -> str:
-    if not all(c in "0123456789abcdefABCDEF" for c in value):
+    if _SHA256_HEX_RE.fullmatch(value):
+        return value.lower()
+    if not _HEX_RE.fullmatch(value):
         raise ValueError(
             f"'{value}' is not a valid hex string. It contains illegal characters."
         )
-    if len(value) != 64:
-        raise ValueError(
-            f"'{value}' is not a valid hex string. It's not 64 characters long."
-        )
-    return value.lower()
+    raise ValueError(
+        f"'{value}' is not a valid hex string. It's not 64 characters long."
+    )
 
 
 def _validate_email(value: str) -> str:
     try:
-        TypeAdapter(EmailStr).validate_python(value)
+        _EMAIL_ADAPTER.validate_python(value)
     except Exception as exc:
         raise ValueError(f"'{value}' is not a valid email string") from exc
     return value.lower()
@@ -58,9 +68,10 @@ def _validate_email(value: str) -> str:
 def _validate_logical_path(value: PurePosixPath) -> PurePosixPath:
     if not value.is_absolute():
         raise ValueError(f"'{value}' is not an absolute path")
-    if ".." in value.parts:
+    parts = value.parts
+    if ".." in parts:
         raise ValueError(f"'{value}' contains '..' which is not allowed")
-    if "" in value.parts:
+    if "" in parts:
         raise ValueError(f"'{value}' contains empty path segments")
     return value
 
@@ -70,3 +81,19 @@ MimeType = Annotated[str, AfterValidator(_validate_mime)]
 SHA256Hex = Annotated[str, AfterValidator(_validate_hex)]
 Email = Annotated[str, AfterValidator(_validate_email)]
 LogicalPath = Annotated[PurePosixPath, AfterValidator(_validate_logical_path)]
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(item_type: Any) -> TypeAdapter:
+    return TypeAdapter(list[item_type])
+
+
+def validate_many(item_type: Any, values: Iterable[Any]) -> list[Any]:
+    """Validate every value against *item_type* in a single pydantic call.
+
+    One ``list[item_type]`` adapter is built per type and reused, so bulk
+    input (batch requests, imports) is checked in one pass through
+    pydantic-core instead of one adapter call per item.  Raises
+    :class:`pydantic.ValidationError` listing every invalid index.
+    """
+    return _list_adapter(item_type).validate_python(list(values))
@@ -2,10 +2,11 @@ from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, Field
 
+from ._row import RowModel
 from .types import SHA256Hex, Email
 
 
-class User(BaseModel):
+class User(RowModel):
     user_id: UUID
     email: Email
     password_hash: SHA256Hex
@@ -17,6 +18,7 @@ class User(BaseModel):
     
     storage_used: int = Field(..., ge=0)
     storage_quota: int = Field(..., ge=0)
+    file_count: int = Field(0, ge=0)
 
     verification_version: int = Field(..., ge=0)
 
@@ -44,3 +46,4 @@ class UserResponse(BaseModel):
     last_login: datetime | None
     storage_used: int = Field(..., ge=0)
     storage_quota: int = Field(..., ge=0)
+    file_count: int = Field(0, ge=0)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import asyncpg
-from fastapi import Request, Depends
+from fastapi import Request, Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from collections.abc import AsyncGenerator
 
@@ -17,3 +17,14 @@ async def get_token(
     token = credentials.credentials  # the raw token, "Bearer" already stripped
     # validate token, fetch user, etc.
     yield token
+
+
+async def get_stream_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(HTTPBearer(auto_error=False)),
+    access_token: str | None = Query(None, description="Bearer token, for clients such as EventSource that cannot set headers"),
+) -> str:
+    if credentials is not None:
+        return credentials.credentials
+    if access_token:
+        return access_token
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from uuid import UUID
 from asyncpg import Record, Connection, UniqueViolationError
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import HTMLResponse
 
 from ...models.token import RefreshTokenResponse
@@ -11,13 +12,16 @@ from ...database.user import (
     invalidate_access_tokens,
     mark_verified,
     get_user_by_email,
+    get_user_usage,
     record_login,
 )
+from ...database.user.exceptions import UserNotFoundError
 from ...services.email_verification import (
     send_email,
     create_token,
     validate_token,
 )
+from ...services.passwords import PasswordHasherBusyError
 from ...models.user import (
     UserRegister,
     UserLogin,
@@ -25,8 +29,6 @@ from ...models.user import (
 )
 from .utils import (
     get_current_user_id,
-    hash_password,
-    verify_password,
     create_access_token,
     get_current_user
     # create_refresh_token,
@@ -35,17 +37,33 @@ from .utils import (
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _hasher_busy() -> HTTPException:
+    # The password hasher's queue is full; clients should back off.
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED
 )
-async def register(user_data: UserRegister, conn: Connection = Depends(get_db)):
+async def register(user_data: UserRegister, request: Request):
+    # Hashed before a connection is taken, so none is held while bcrypt runs.
     try:
-        new_user: Record = await create_user(
-            conn=conn,
-            email=user_data.email,
-            password_hash=hash_password(user_data.password),
-            name=user_data.name,
-        )
+        password_hash = await request.app.state.passwords.hash(user_data.password)
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
+
+    try:
+        async with request.app.state.pool.acquire() as conn:
+            new_user: Record = await create_user(
+                conn=conn,
+                email=user_data.email,
+                password_hash=password_hash,
+                name=user_data.name,
+            )
     except UniqueViolationError as exc:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -121,29 +139,46 @@ async def verify_email(
 
 
 @router.post("/login", response_model=RefreshTokenResponse, status_code=status.HTTP_200_OK)
-async def login(credentials: UserLogin, conn: Connection = Depends(get_db)):
-    # Find user by email
-    user: Record = await get_user_by_email(conn=conn, email=credentials.email)
+async def login(credentials: UserLogin, request: Request):
+    # Connections are taken around, not across, the password check: a
+    # quarter second of bcrypt per login would otherwise drain the pool
+    # during a login flood.
+    pool = request.app.state.pool
 
-    if not user or not verify_password(
-        plain_password=credentials.password, hashed_password=str(user["password_hash"])
-    ):
+    # Find user by email
+    async with pool.acquire() as conn:
+        try:
+            user = await get_user_by_email(conn=conn, email=credentials.email)
+        except UserNotFoundError:
+            user = None
+
+    # An unknown email is still checked (against a dummy hash), so the
+    # response time does not reveal whether the account exists.
+    try:
+        valid = await request.app.state.passwords.verify(
+            plain_password=credentials.password,
+            hashed_password=user.password_hash if user is not None else None,
+        )
+    except PasswordHasherBusyError:
+        raise _hasher_busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
-    if not user["verified"]:
+    if not user.verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email not verified. Please check your inbox for verification instructions.",
         )
 
     # Update last login
-    await record_login(conn=conn, user_id=user["user_id"])
+    async with pool.acquire() as conn:
+        await record_login(conn=conn, user_id=user.user_id)
 
     # Create tokens
-    access_token, exp = create_access_token(str(user["user_id"]))
+    access_token, exp = create_access_token(str(user.user_id))
 
     return RefreshTokenResponse(
         access_token=access_token,
@@ -227,8 +262,23 @@ async def logout(
 
 
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
-async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
+async def get_current_user_info(
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user),
+    user_id: str = Depends(get_current_user_id),
+):
     """
     Get current authenticated user information.
+
+    The profile comes from the principal cache; the storage counters, which
+    every upload and delete changes, are read fresh.
     """
-    return current_user
+    try:
+        async with request.app.state.pool.acquire() as conn:
+            storage_used, file_count = await get_user_usage(conn=conn, user_id=UUID(user_id))
+    except UserNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+        )
+    return current_user.model_copy(update={"storage_used": storage_used, "file_count": file_count})
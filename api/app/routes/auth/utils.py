@@ -1,15 +1,14 @@
 import os
-import asyncpg
 from uuid import UUID
 from fastapi.security import OAuth2PasswordBearer
-import jwt, jwt.exceptions as JWTError
-from passlib.context import CryptContext
+import jwt
 from datetime import datetime, timedelta, timezone
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 
 from ...models.user import UserResponse
-from .._common import get_db
 from ...database.user import get_user_by_id
+from ...database.user.exceptions import UserNotFoundError
+from ...services.sessions import valid_since_table, verified_tokens
 
 # Configuration
 _SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "")
@@ -17,25 +16,19 @@ _ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-# Password hashing
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return password_context.hash(password)
-
-
-def verify_password(*, plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return password_context.verify(plain_password, hashed_password)
-
-
 def create_access_token(user_id: str) -> tuple[str, datetime]:
     """Create a JWT access token."""
     minutes = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
-    expire_at = datetime.now(timezone.utc) + timedelta(minutes=minutes)
-    token = {"sub": str(user_id), "exp": expire_at, "type": "access"}
+    issued_at = datetime.now(timezone.utc)
+    expire_at = issued_at + timedelta(minutes=minutes)
+    # iat keeps its fraction of a second: a token issued just after a
+    # "log out everywhere" must not look older than users.valid_since.
+    token = {
+        "sub": str(user_id),
+        "iat": issued_at.timestamp(),
+        "exp": expire_at,
+        "type": "access",
+    }
     assert _SECRET_KEY
     return (jwt.encode(token, _SECRET_KEY, algorithm=_ALGORITHM), expire_at)
 
@@ -49,19 +42,42 @@ def create_access_token(user_id: str) -> tuple[str, datetime]:
 #     return jwt.encode(token, _SECRET_KEY, algorithm=_ALGORITHM)
 
 
+def _verify_token(token: str) -> dict:
+    return jwt.decode(
+        token,
+        _SECRET_KEY,
+        algorithms=[_ALGORITHM],
+        options={"require": ["exp", "iat", "sub"]},
+    )
+
+
 def decode_token(token: str) -> dict | None:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token.
+
+    The signature is checked once per token and worker; later calls are
+    served from the verified-token cache until the token expires.  Tokens
+    issued before their user's ``valid_since`` are rejected, checked
+    against this worker's in-memory table rather than the database.  The
+    returned claims are shared and must not be modified.
+    """
     try:
-        return jwt.decode(token, _SECRET_KEY, algorithms=[_ALGORITHM])
+        payload = verified_tokens.get_or_verify(token, _verify_token)
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    if valid_since_table.is_revoked(payload["sub"], payload["iat"]):
+        return None
+    return payload
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), conn: asyncpg.Connection = Depends(get_db)
+    request: Request, token: str = Depends(oauth2_scheme)
 ) -> UserResponse:
+    """Get the current user, from this worker's principal cache when possible.
+
+    A pool connection is only taken on a cache miss.
+    """
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,32 +85,37 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, _SECRET_KEY, algorithms=[_ALGORITHM])
-        uuid: str = payload.get("sub")
-        if uuid is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
+    uuid: str = payload["sub"]
+
+    user_id = UUID(uuid)
+
+    async def load() -> UserResponse:
+        async with request.app.state.pool.acquire() as conn:
+            user = await get_user_by_id(conn=conn, user_id=user_id)
+
+        # storage_used / file_count change without a user_changes
+        # notification, so they go stale here; /auth/me reads them fresh.
+        return UserResponse(
+            name=user.name,
+            email=user.email,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            last_login=user.last_login,
+            storage_quota=user.storage_quota,
+            storage_used=user.storage_used,
+            file_count=user.file_count,
+        )
 
-    user = await get_user_by_id(conn=conn, user_id=UUID(uuid))
-    if user is None:
+    try:
+        return await request.app.state.principals.get_or_load(user_id, load)
+    except UserNotFoundError:
         raise credentials_exception
-    
-    user_response = UserResponse(
-        name=str(user["name"]),
-        email=user["email"],
-        created_at=user["created_at"],
-        storage_quota=user["storage_quota"],
-        storage_used=user["storage_used"],
-    )
 
-    return user_response
-
-async def get_current_user_id(
-    token: str = Depends(oauth2_scheme), conn: asyncpg.Connection = Depends(get_db)
-) -> str:
-    """Get the current user's ID from the access token."""
+async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+    """Get the current user's ID from the access token, without a database connection."""
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -102,12 +123,9 @@ async def get_current_user_id(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, _SECRET_KEY, algorithms=[_ALGORITHM])
-        uuid: str = payload.get("sub")
-        if uuid is None:
-            raise credentials_exception
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise credentials_exception
+    uuid: str = payload["sub"]
 
     return uuid
\ No newline at end of file
@@ -1,30 +1,85 @@
 import re
+import time
+import base64
+import struct
 import uuid
+import zlib
 import hashlib
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
 from tempfile import NamedTemporaryFile
 
 import asyncpg
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, status
+import msgpack
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
-
-from ._common import get_db, get_token
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from ._common import get_db, get_token, get_stream_token
+from ._json import ORJSONResponse, dumps, stream_json_object
+from ..models.file import File as FileMeta, FileCreate, FileContent, FileVersion, FileBatchRequest
+from ..models.folder import Folder, FolderCreate
+from ..models.types import LogicalPath, validate_many
 from ..database.file import (
-    create_file,
-    get_file_by_id,
-    list_files_by_owner,
-    list_files_by_folder,
-    rename_file,
-    move_file,
-    delete_file as repo_delete_file,
-    count_files_by_owner,
-    total_bytes_by_owner,
+    create_file_meta_and_bytes,
+    get_file_meta,
+    list_file_meta_by_owner,
+    list_file_meta_by_folder,
+    rename_file_meta,
+    move_file_meta,
+    delete_file_meta_and_bytes,
+    trash_file_meta,
+    restore_file_meta,
+    list_trashed_file_meta,
+    count_trashed_file_meta,
+    purge_trashed_file_meta_and_bytes,
+    create_file_version,
+    list_file_versions,
+    restore_file_version,
+    delete_file_version,
+    apply_file_batch,
+    count_file_meta_by_owner,
+    count_file_meta_by_folder,
+    trash_bytes_by_owner,
+    search_file_meta_by_owner,
+    count_file_meta_by_search,
+    get_storage_breakdown,
+    list_duplicate_file_meta,
+    iter_file_meta_by_owner,
+    iter_file_manifest_by_owner,
 )
-from ..auth.utils import decode_token
-
-router = APIRouter(prefix="/files", tags=["files"])
+from ..database.folder import (
+    create_folder,
+    get_folder,
+    get_folder_by_path,
+    list_folders as repo_list_folders,
+    move_folder,
+    delete_folder_and_contents,
+)
+from ..database.folder.exceptions import (
+    FolderError,
+    FolderNotFoundError,
+    FolderExistsError,
+    FolderMoveError,
+)
+from ..database.change import list_changes
+from ..database.change.exceptions import ChangeOwnerNotFoundError
+from ..database.user import get_user_by_id
+from ..database.user.exceptions import UserNotFoundError, StorageQuotaExceededError
+from ..database.file._minio_client import settings as minio_settings, get_file_stream
+from ..database.file.exceptions import FileError, FileNotFoundError, FileVersionNotFoundError
+from ..services.notifications import TooManySubscriptionsError
+from .auth.utils import decode_token
+
+router = APIRouter(prefix="/files", tags=["files"], default_response_class=ORJSONResponse)
 _CHUNK_SIZE = 1024 * 1024  # 1 MiB
 
 _ALLOWED_SORT = {"created_at", "current_name", "size_bytes", "updated_at"}
+_EVENTS_HEARTBEAT_SECONDS = 15.0
+# Listing pages with more items than this are streamed in chunks.
+_STREAM_MIN_ITEMS = 256
+_MANIFEST_VERSION = 1
 
 
 # ─── helpers ──────────────────────────────────────────────────────────────────
@@ -44,13 +99,17 @@ def _normalize_folder(raw: str | None) -> str:
     Rules
     -----
     - ``None`` or empty → root  → ``"/"``
-    - Otherwise sanitize, strip leading/trailing slashes, prepend ``/``
-      e.g. ``"docs/reports/"`` → ``"/docs/reports"``
+    - Otherwise sanitize each segment, drop empty / ``.`` / ``..`` segments,
+      prepend ``/``  e.g. ``"docs//reports/"`` → ``"/docs/reports"``
     """
     if not raw or not raw.strip():
         return "/"
-    clean = _sanitize_filename(raw.strip("/"))
-    return f"/{clean}"
+    segments = [
+        _sanitize_filename(part)
+        for part in raw.split("/")
+        if part.strip() and part.strip() not in (".", "..")
+    ]
+    return "/" + "/".join(segments)
 
 
 def _require_token(token: str) -> dict:
@@ -61,18 +120,128 @@ def _require_token(token: str) -> dict:
     return tok
 
 
+# Keyset cursor of GET /files: the last row's (created_at, file_id), as
+# microseconds since the epoch and the 16 id bytes, base64url-encoded.
+_AFTER = struct.Struct(">q16s")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _encode_after(f: FileMeta) -> str:
+    """Encode the keyset position just past *f* as an opaque cursor."""
+    micros = (f.created_at - _EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(_AFTER.pack(micros, f.file_id.bytes)).decode("ascii")
+
+
+def _decode_after(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Decode a cursor from :func:`_encode_after`, or raise 400."""
+    try:
+        micros, file_id = _AFTER.unpack(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _EPOCH + timedelta(microseconds=micros), uuid.UUID(bytes=file_id)
+    except (ValueError, struct.error, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid after cursor")
+
+
+async def _get_owned_folder(
+    conn: asyncpg.Connection, folder_id: str, owner_id: uuid.UUID
+) -> Folder:
+    """Fetch a folder, or raise 400/404/403 for bad id, missing folder, or foreign owner."""
+    try:
+        folder_uuid = uuid.UUID(folder_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid folder_id format")
+
+    try:
+        folder = await get_folder(conn=conn, folder_id=folder_uuid)
+    except FolderNotFoundError:
+        raise HTTPException(status_code=404, detail="Folder not found")
+    if folder.owner_id != owner_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return folder
+
+
+async def _get_owned_file(
+    conn: asyncpg.Connection, file_id: str, owner_id: uuid.UUID, include_trashed: bool = False
+) -> FileMeta:
+    """Fetch a file's metadata, or raise 400/404/403 for bad id, missing file, or foreign owner.
+
+    Files in the trash count as missing unless *include_trashed* is set.
+    """
+    try:
+        file_uuid = uuid.UUID(file_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid file_id format")
+
+    try:
+        meta = await get_file_meta(conn=conn, file_id=file_uuid, include_trashed=include_trashed)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    if meta.owner_id != owner_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return meta
+
+
+async def _spool_upload(file: UploadFile, tmp) -> tuple[int, str]:
+    """Copy an upload into *tmp*, returning its size and SHA-256 hex digest.
+
+    Raises 400 for an empty upload.  *tmp* is rewound for reading.
+    """
+    h = hashlib.sha256()
+    size = 0
+
+    while chunk := await file.read(_CHUNK_SIZE):
+        tmp.write(chunk)
+        h.update(chunk)
+        size += len(chunk)
+
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    tmp.seek(0)
+    return size, h.hexdigest()
+
+
 def _serialize(f: FileMeta) -> dict:
-    """Serialize a FileMeta TypedDict for JSON responses."""
+    """Serialize a File metadata record for JSON responses.
+
+    UUIDs and datetimes are left as is; :class:`ORJSONResponse` encodes them.
+    """
+    return {
+        "file_id": f.file_id,
+        "name": f.current_name,
+        "original_name": f.original_name,
+        "folder": str(f.folder),
+        "content_type": f.mime_type,
+        "size_bytes": f.size_bytes,
+        "sha256": f.sha256_hex,
+        "version": f.version_no,
+        "created_at": f.created_at,
+        "updated_at": f.updated_at,
+        "trashed_at": f.trashed_at,
+    }
+
+
+def _serialize_version(v: FileVersion) -> dict:
+    """Serialize a FileVersion record for JSON responses."""
+    return {
+        "version": v.version_no,
+        "content_type": v.mime_type,
+        "size_bytes": v.size_bytes,
+        "sha256": v.sha256_hex,
+        "created_at": v.created_at,
+        "superseded_at": v.superseded_at,
+        "current": v.superseded_at is None,
+    }
+
+
+def _serialize_folder(f: Folder) -> dict:
+    """Serialize a Folder record for JSON responses."""
     return {
-        "file_id": str(f["file_id"]),
-        "name": f["current_name"],
-        "original_name": f["original_name"],
-        "folder": f["folder"],
-        "content_type": f["content_type"],
-        "size_bytes": f["size_bytes"],
-        "sha256": f["sha256_hex"],
-        "created_at": f["created_at"].isoformat(),
-        "updated_at": f["updated_at"].isoformat() if f["updated_at"] else None,
+        "folder_id": f.folder_id,
+        "name": str(f.path),
+        "parent_id": f.parent_id,
+        "file_count": f.file_count,
+        "size_bytes": f.size_bytes,
+        "tree_file_count": f.tree_file_count,
+        "tree_size_bytes": f.tree_size_bytes,
     }
 
 
@@ -90,53 +259,43 @@ async def upload_file(
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    file_uuid = uuid.uuid4()
-    file_key = make_file_key(user_id=owner_id, file_uuid=file_uuid)
     folder_path = _normalize_folder(folder)
     current_name = _sanitize_filename(logical_name or file.filename or "unnamed")
 
     with NamedTemporaryFile(delete=True) as tmp:
-        h = hashlib.sha256()
-        size = 0
-
-        while chunk := await file.read(_CHUNK_SIZE):
-            tmp.write(chunk)
-            h.update(chunk)
-            size += len(chunk)
-
-        if size == 0:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty")
-
-        tmp.seek(0)
-        put_bytes(
-            file_key=file_key,
-            data=tmp,  # type: ignore[arg-type]
-            length=size,
-            content_type=file.content_type or "application/octet-stream",
-            metadata={"original-name": file.filename or ""},
-        )
+        size, sha256_hex = await _spool_upload(file, tmp)
 
-    try:
-        meta = await create_file(
-            conn=conn,
-            file_id=file_uuid,
-            owner_id=owner_id,
-            bucket=settings.bucket,
-            file_key=file_key,
-            original_name=current_name,
-            current_name=current_name,
-            folder=folder_path,
-            content_type=file.content_type,
-            size_bytes=size,
-            sha256_hex=h.hexdigest(),
-        )
-    except asyncpg.UniqueViolationError:
-        # file_key collision (should not happen with uuid4, but be safe)
-        minio_delete_file(file_key)
-        raise HTTPException(status_code=409, detail="File key conflict; please retry")
-    except asyncpg.ForeignKeyViolationError:
-        minio_delete_file(file_key)
-        raise HTTPException(status_code=400, detail="Owner account not found")
+        try:
+            file_meta = FileCreate(
+                owner_id=owner_id,
+                bucket=minio_settings.bucket,
+                folder=folder_path,  # type: ignore[arg-type]
+                name=current_name,
+                mime_type=file.content_type or "application/octet-stream",
+                size_bytes=size,
+                sha256_hex=sha256_hex,
+            )
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid file metadata")
+
+        try:
+            meta = await create_file_meta_and_bytes(
+                conn=conn,
+                file_meta=file_meta,
+                file_bytes=tmp,  # type: ignore[arg-type]
+            )
+        except asyncpg.UniqueViolationError:
+            # file_id collision (should not happen with uuid7, but be safe)
+            raise HTTPException(status_code=409, detail="File id conflict; please retry")
+        except asyncpg.ForeignKeyViolationError:
+            raise HTTPException(status_code=400, detail="Owner account not found")
+        except StorageQuotaExceededError:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Storage quota exceeded",
+            )
+        except FileError as exc:
+            raise HTTPException(status_code=500, detail=str(exc))
 
     return _serialize(meta)
 
@@ -146,10 +305,13 @@ async def upload_file(
 @router.get("")
 async def list_files(
     folder: str | None = Query(None, description="Filter by folder path (omit for all files)"),
-    sort_by: str = Query("created_at", description="Sort field: current_name, size_bytes, created_at, updated_at"),
+    search: str | None = Query(None, max_length=255, description="Match file names (substring or fuzzy)"),
+    sort_by: str | None = Query(None, description="Sort field: current_name, size_bytes, created_at, updated_at, relevance"),
     sort_order: str = Query("desc", description="Sort order: asc or desc"),
     limit: int = Query(100, ge=1, le=1000, description="Max results"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    after: str | None = Query(None, description="Keyset cursor: next_after of the previous page"),
+    include_total: bool = Query(True, description="Set to false to skip computing total_count"),
     conn: asyncpg.Connection = Depends(get_db),
     token: str = Depends(get_token),
 ):
@@ -157,89 +319,324 @@ async def list_files(
     List the current user's files with optional folder filtering and pagination.
 
     - **folder**: omit to return all files; ``/`` for root; ``/docs`` for a sub-folder
-    - **sort_by**: ``current_name`` | ``size_bytes`` | ``created_at`` | ``updated_at``
+    - **search**: only files whose name contains, or closely resembles, this text;
+      combined with **folder**, the folder and its sub-folders are searched
+    - **sort_by**: ``current_name`` | ``size_bytes`` | ``created_at`` | ``updated_at`` |
+      ``relevance`` (search only; the default when **search** is given, otherwise ``created_at``)
     - **sort_order**: ``asc`` or ``desc``
     - **limit** / **offset**: pagination
+    - **after**: instead of **offset** (which must then be 0), continue after
+      the previous page's ``next_after``, an opaque cursor; only for all files
+      (no **folder** or **search**) sorted by ``created_at``, and cheap at any
+      depth; still valid if that page's last file has since been deleted
+    - **include_total**: ``false`` returns ``total_count: null``; ``has_more`` is always set
     """
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    if sort_by not in _ALLOWED_SORT:
+    search = search.strip() if search else None
+    allowed = _ALLOWED_SORT | {"relevance"} if search else _ALLOWED_SORT
+    if sort_by is None:
+        sort_by = "relevance" if search else "created_at"
+    if sort_by not in allowed:
         raise HTTPException(
             status_code=400,
-            detail=f"sort_by must be one of {sorted(_ALLOWED_SORT)}",
+            detail=f"sort_by must be one of {sorted(allowed)}",
         )
 
+    # Keyset pagination only covers the plain creation-order listing.
+    keyset = not search and folder is None and sort_by == "created_at"
+    after_key: tuple[datetime, uuid.UUID] | None = None
+    if after is not None:
+        if not keyset:
+            raise HTTPException(
+                status_code=400,
+                detail="after is only supported when listing all files by created_at",
+            )
+        if offset:
+            raise HTTPException(status_code=400, detail="after cannot be combined with offset")
+        after_key = _decode_after(after)
+
     ascending = sort_order.lower() == "asc"
+    total: int | None = None
 
-    if folder is not None:
+    # One row past the page tells us whether another page exists, so
+    # has_more never depends on the total.
+    if search:
+        canonical = _normalize_folder(folder) if folder is not None else None
+        rows = await search_file_meta_by_owner(
+            conn=conn,
+            owner_id=owner_id,
+            query=search,
+            folder=canonical,  # type: ignore[arg-type]
+            limit=limit + 1,
+            offset=offset,
+            order_by=sort_by,
+            ascending=ascending,
+        )
+        if include_total:
+            total = await count_file_meta_by_search(
+                conn=conn, owner_id=owner_id, query=search, folder=canonical  # type: ignore[arg-type]
+            )
+    elif folder is not None:
         # Caller explicitly wants a specific folder
         canonical = _normalize_folder(folder)
-        rows = await list_files_by_folder(
-            conn,
-            owner_id,
-            canonical,
-            limit=limit,
+        rows = await list_file_meta_by_folder(
+            conn=conn,
+            owner_id=owner_id,
+            folder=canonical,  # type: ignore[arg-type]
+            limit=limit + 1,
             offset=offset,
         )
-        # Count for has_more
-        total = await conn.fetchval(
-            "SELECT COUNT(*) FROM files WHERE owner_id = $1 AND folder = $2",
-            owner_id,
-            canonical,
-        )
+        if include_total:
+            total = await count_file_meta_by_folder(
+                conn=conn, owner_id=owner_id, folder=canonical  # type: ignore[arg-type]
+            )
     else:
-        rows = await list_files_by_owner(
-            conn,
-            owner_id,
-            limit=limit,
+        rows = await list_file_meta_by_owner(
+            conn=conn,
+            owner_id=owner_id,
+            limit=limit + 1,
             offset=offset,
             order_by=sort_by,
             ascending=ascending,
+            after=after_key,
         )
-        total = await count_files_by_owner(conn, owner_id)
+        if include_total:
+            total = await count_file_meta_by_owner(conn=conn, owner_id=owner_id)
 
-    return {
-        "items": [_serialize(r) for r in rows],
+    page = rows[:limit]
+    has_more = len(rows) > limit
+    rest = {
         "total_count": total,
         "limit": limit,
         "offset": offset,
-        "has_more": (offset + limit) < total, # type: ignore
+        "has_more": has_more,
+        "next_after": _encode_after(page[-1]) if keyset and has_more else None,
     }
+    if len(page) > _STREAM_MIN_ITEMS:
+        return stream_json_object("items", map(_serialize, page), rest)
+    return ORJSONResponse({"items": [_serialize(r) for r in page], **rest})
 
 
 # ─── GET /files/folders ───────────────────────────────────────────────────────
 
 @router.get("/folders")
 async def list_folders(
+    parent: str | None = Query(None, description="Only list the direct sub-folders of this path"),
     conn: asyncpg.Connection = Depends(get_db),
     token: str = Depends(get_token),
 ):
-    """Return the distinct folder paths that belong to the current user, with file counts."""
+    """Return the current user's folders with the file count and bytes stored directly in each."""
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    rows = await conn.fetch(
-        """
-        SELECT folder, COUNT(*) AS file_count
-        FROM files
-        WHERE owner_id = $1
-        GROUP BY folder
-        ORDER BY folder
-        """,
-        owner_id,
-    )
+    parent_id: uuid.UUID | None = None
+    if parent is not None:
+        try:
+            parent_folder = await get_folder_by_path(
+                conn=conn, owner_id=owner_id, path=_normalize_folder(parent)  # type: ignore[arg-type]
+            )
+        except FolderNotFoundError:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        parent_id = parent_folder.folder_id
+
+    rows = await repo_list_folders(conn=conn, owner_id=owner_id, parent_id=parent_id)
+
+    folders = [_serialize_folder(r) for r in rows if str(r.path) != "/"]
+    root_count = next((r.file_count for r in rows if str(r.path) == "/"), 0)
+
+    return ORJSONResponse({"folders": folders, "root_file_count": root_count})
+
+
+# ─── POST /files/folders ──────────────────────────────────────────────────────
+
+@router.post("/folders", status_code=status.HTTP_201_CREATED)
+async def create_folder_endpoint(
+    path: str = Form(...),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Create a folder (and any missing parents). Creating an existing folder is a no-op."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    canonical = _normalize_folder(path)
+    if canonical == "/":
+        raise HTTPException(status_code=400, detail="Folder path must not be empty")
+
+    try:
+        folder = await create_folder(
+            conn=conn,
+            folder=FolderCreate(owner_id=owner_id, path=canonical),  # type: ignore[arg-type]
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(status_code=400, detail="Owner account not found")
+    except FolderError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    return _serialize_folder(folder)
 
-    folders = [
-        {"name": r["folder"], "file_count": r["file_count"]}
-        for r in rows
-        if r["folder"] != "/"
-    ]
-    root_count = next(
-        (r["file_count"] for r in rows if r["folder"] == "/"), 0
-    )
 
-    return {"folders": folders, "root_file_count": root_count}
+# ─── PATCH /files/folders/{folder_id} ─────────────────────────────────────────
+
+@router.patch("/folders/{folder_id}")
+async def update_folder(
+    folder_id: str,
+    name: str | None = Form(None),
+    parent: str | None = Form(None),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    Rename a folder and/or move it under a different parent, with everything inside it.
+
+    - **name**: new folder name
+    - **parent**: path of the new parent folder (created if missing); ``"/"`` moves it to root
+
+    Only the folder rows of the subtree are rewritten; the files inside are untouched.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    folder = await _get_owned_folder(conn, folder_id, owner_id)
+
+    new_name: str | None = None
+    if name is not None:
+        new_name = _sanitize_filename(name)
+
+    if new_name is None and parent is None:
+        return _serialize_folder(folder)
+
+    # One transaction, so parents created for a move that then fails
+    # (name clash, move into its own subtree) are rolled back with it.
+    try:
+        async with conn.transaction():
+            parent_id: uuid.UUID | None = None
+            if parent is not None:
+                parent_folder = await create_folder(
+                    conn=conn,
+                    folder=FolderCreate(owner_id=owner_id, path=_normalize_folder(parent)),  # type: ignore[arg-type]
+                )
+                parent_id = parent_folder.folder_id
+
+            folder = await move_folder(
+                conn=conn, folder_id=folder.folder_id, parent_id=parent_id, name=new_name
+            )
+    except FolderNotFoundError:
+        raise HTTPException(status_code=404, detail="Folder not found")
+    except FolderExistsError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except FolderMoveError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return _serialize_folder(folder)
+
+
+# ─── DELETE /files/folders/{folder_id} ────────────────────────────────────────
+
+@router.delete("/folders/{folder_id}", status_code=status.HTTP_200_OK)
+async def delete_folder_endpoint(
+    folder_id: str,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Delete a folder together with its sub-folders, moving every file inside them to the trash."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    folder = await _get_owned_folder(conn, folder_id, owner_id)
+    if folder.parent_id is None:
+        raise HTTPException(status_code=400, detail="The root folder cannot be deleted")
+
+    try:
+        file_ids = await delete_folder_and_contents(conn=conn, folder_id=folder.folder_id)
+    except FolderNotFoundError:
+        raise HTTPException(status_code=404, detail="Folder not found")
+    except FolderError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    return {"success": True, "folder_id": folder_id, "trashed_files": len(file_ids)}
+
+
+# ─── POST /files/batch ────────────────────────────────────────────────────────
+
+@router.post("/batch")
+async def batch_update_files(
+    body: FileBatchRequest,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    Rename, move or delete many files in one request.
+
+    Operations are applied in a single transaction, as one statement per kind;
+    deleted files are moved to the trash.  If a file appears in several
+    operations, a delete wins and its renames and moves are not applied;
+    otherwise the last rename and the last move for it apply.
+
+    Each operation gets a result in request order with ``status`` ``ok``,
+    ``skipped`` (a rename or move of a file the same batch deletes) or
+    ``not_found`` (unknown id, not owned by the caller, or already in the trash).
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    renames: dict[uuid.UUID, str] = {}
+    moves: dict[uuid.UUID, str] = {}
+    deletes: set[uuid.UUID] = set()
+    for op in body.operations:
+        if op.op == "rename":
+            renames[op.file_id] = _sanitize_filename(op.name or "")
+        elif op.op == "move":
+            moves[op.file_id] = _normalize_folder(op.folder)
+        else:
+            deletes.add(op.file_id)
+
+    try:
+        destinations = validate_many(LogicalPath, moves.values())
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch operation: {exc}")
+
+    try:
+        result = await apply_file_batch(
+            conn=conn,
+            owner_id=owner_id,
+            renames=renames,
+            moves=dict(zip(moves, destinations)),
+            deletes=deletes,
+        )
+    except asyncpg.CheckViolationError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch operation: {exc}")
+
+    updated = {f.file_id: _serialize(f) for f in result.updated}
+    deleted = set(result.deleted)
+    missing = set(result.missing)
+    results = []
+    skipped = 0
+    for index, op in enumerate(body.operations):
+        if op.file_id in missing:
+            outcome = "not_found"
+        elif op.op != "delete" and op.file_id in deleted:
+            outcome = "skipped"
+            skipped += 1
+        else:
+            outcome = "ok"
+        results.append({
+            "index": index,
+            "op": op.op,
+            "file_id": op.file_id,
+            "status": outcome,
+            "file": updated.get(op.file_id) if outcome == "ok" and op.op != "delete" else None,
+        })
+
+    return ORJSONResponse({
+        "results": results,
+        "updated": len(result.updated),
+        "deleted": len(result.deleted),
+        "skipped": skipped,
+        "not_found": len(missing),
+    })
 
 
 # ─── GET /files/stats ─────────────────────────────────────────────────────────
@@ -249,18 +646,426 @@ async def get_storage_stats(
     conn: asyncpg.Connection = Depends(get_db),
     token: str = Depends(get_token),
 ):
-    """Return aggregate storage statistics for the current user."""
+    """
+    Return storage statistics for the current user from the trigger-maintained counters.
+
+    ``total_files`` counts live files; ``total_bytes`` also includes the
+    ``trash_bytes`` held by the trash and the bytes of old file versions, which
+    count towards the quota until purged or pruned.
+    """
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    total_files = await count_files_by_owner(conn, owner_id)
-    total_bytes = await total_bytes_by_owner(conn, owner_id)
+    try:
+        user = await get_user_by_id(conn=conn, user_id=owner_id)
+    except UserNotFoundError:
+        raise HTTPException(status_code=404, detail="User not found")
 
     return {
-        "total_files": total_files,
-        "total_bytes": total_bytes,
-        "total_mb": round(total_bytes / (1024 * 1024), 2),
+        "total_files": user.file_count,
+        "total_bytes": user.storage_used,
+        "total_mb": round(user.storage_used / (1024 * 1024), 2),
+        "quota_bytes": user.storage_quota,
+        "trash_bytes": await trash_bytes_by_owner(conn=conn, owner_id=owner_id),
+    }
+
+
+# ─── GET /files/stats/breakdown ───────────────────────────────────────────────
+
+@router.get("/stats/breakdown")
+async def get_storage_breakdown_endpoint(
+    folder: str | None = Query(None, description="Break down this folder's sub-folders (default: top level)"),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    Return where the current user's storage goes.
+
+    - **by_type**: per MIME family (``image``, ``video``, ...)
+    - **by_folder**: per sub-folder of **folder**, including everything below it;
+      files stored directly in **folder** are listed under its own path
+    - **by_age**: per upload age (``0-1m``, ``1-6m``, ``6-12m``, ``1-2y``, ``2y+``)
+
+    Served from precomputed rollups, so the cost does not grow with the number of files.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    breakdown = await get_storage_breakdown(
+        conn=conn,
+        owner_id=owner_id,
+        folder=_normalize_folder(folder),  # type: ignore[arg-type]
+    )
+    return breakdown.model_dump()
+
+
+# ─── GET /files/duplicates ────────────────────────────────────────────────────
+
+@router.get("/duplicates")
+async def list_duplicate_files(
+    limit: int = Query(50, ge=1, le=500, description="Max groups"),
+    offset: int = Query(0, ge=0, description="Pagination offset"),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    List groups of the current user's files that have identical content.
+
+    Groups are ordered by **reclaimable_bytes**, the space freed by keeping a
+    single copy, largest first.  The top-level **reclaimable_bytes** and
+    **total_count** cover every group, not just this page.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    report = await list_duplicate_file_meta(
+        conn=conn, owner_id=owner_id, limit=limit, offset=offset
+    )
+    return ORJSONResponse({
+        "items": [
+            {
+                "sha256": g.sha256_hex,
+                "size_bytes": g.size_bytes,
+                "copies": g.copies,
+                "reclaimable_bytes": g.reclaimable_bytes,
+                "files": [_serialize(f) for f in g.files],
+            }
+            for g in report.groups
+        ],
+        "total_count": report.total_groups,
+        "reclaimable_bytes": report.reclaimable_bytes,
+        "limit": limit,
+        "offset": offset,
+        "has_more": offset + len(report.groups) < report.total_groups,
+    })
+
+
+# ─── GET /files/changes ───────────────────────────────────────────────────────
+
+@router.get("/changes")
+async def list_file_changes(
+    since: int = Query(0, ge=0, description="Cursor from the previous response (0 = from the start)"),
+    limit: int = Query(500, ge=1, le=5000, description="Max change-log entries per batch"),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    Return the current user's file and folder changes after **since**.
+
+    Each file or folder appears at most once per batch, with its latest change
+    ``kind`` and its current metadata (``null`` once deleted). Pass the returned
+    ``cursor`` as the next **since**; ``has_more`` means another batch is already
+    waiting. ``resync_required`` means **since** has fallen out of the retained
+    history: re-list everything with ``GET /files``, then continue from ``cursor``.
+    ``folder_moved`` is reported for the renamed or moved folder only; every
+    folder below it moved with it and keeps its ``parent_id``.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    try:
+        batch = await list_changes(conn=conn, owner_id=owner_id, since=since, limit=limit)
+    except ChangeOwnerNotFoundError:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    return ORJSONResponse({
+        "cursor": batch.cursor,
+        "has_more": batch.has_more,
+        "resync_required": batch.resync_required,
+        "changes": [
+            {
+                "seq": c.seq,
+                "kind": c.kind,
+                "file_id": c.file_id,
+                "folder_id": c.folder_id,
+                "changed_at": c.changed_at,
+                "file": _serialize(c.file) if c.file else None,
+                "folder": _serialize_folder(c.folder) if c.folder else None,
+            }
+            for c in batch.changes
+        ],
+    })
+
+
+# ─── GET /files/export ────────────────────────────────────────────────────────
+
+@router.get("/export")
+async def export_files(
+    request: Request,
+    token: str = Depends(get_token),
+):
+    """
+    Stream the current user's complete file inventory as NDJSON.
+
+    One JSON object per line, in the same shape as the items of ``GET /files``
+    and in no particular order. The inventory is a consistent snapshot taken
+    when the export starts, and is streamed from a server-side cursor, so
+    any number of files can be exported without paging.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+    pool = request.app.state.pool
+
+    async def _lines():
+        # The connection is acquired here rather than through get_db, so it
+        # is held only while the body streams, and goes back to the pool as
+        # soon as the export ends or the client disconnects.
+        async with pool.acquire() as conn, aclosing(
+            iter_file_meta_by_owner(conn=conn, owner_id=owner_id)
+        ) as batches:
+            async for batch in batches:
+                yield b"".join([dumps(_serialize(f)) + b"\n" for f in batch])
+
+    return StreamingResponse(
+        _lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="files.ndjson"'},
+    )
+
+
+# ─── GET /files/manifest ──────────────────────────────────────────────────────
+
+@router.get("/manifest")
+async def get_file_manifest(
+    request: Request,
+    token: str = Depends(get_token),
+):
+    """
+    Stream the current user's whole file tree as a compact msgpack manifest.
+
+    Meant for sync clients that need every file at once; it covers the same
+    files as ``GET /files`` (the caller's own). The body is a sequence of
+    msgpack values:
+
+    1. a header map ``{"version": 1, "folders": N}``;
+    2. N folder entries ``[folder_id, path]``, sorted by path; a folder is
+       referenced by its position in this sequence (0 to N-1);
+    3. one entry per file, in no particular order:
+       ``[file_id, folder, name, size_bytes, mtime_ms, sha256]``, where
+       ``folder`` is that position, ``mtime_ms`` is the last change in epoch
+       milliseconds, and the ids (16 bytes) and hash (32 bytes) are raw binary.
+
+    The manifest is a consistent snapshot, and it is gzip-compressed
+    (``Content-Encoding: gzip``) when the client accepts it.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+    pool = request.app.state.pool
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+
+    packer = msgpack.Packer()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    folder_index: dict[uuid.UUID, int] = {}
+
+    def _encode_folders(folders: list[asyncpg.Record]) -> bytes:
+        for row in folders:
+            folder_index[row["folder_id"]] = len(folder_index)
+        data = packer.pack({"version": _MANIFEST_VERSION, "folders": len(folders)})
+        data += b"".join(packer.pack([row["folder_id"].bytes, row["path"]]) for row in folders)
+        return compressor.compress(data) if compressor else data
+
+    def _encode_files(files: list[asyncpg.Record]) -> bytes:
+        data = b"".join(
+            packer.pack([
+                row["file_id"],
+                folder_index[row["folder_id"]],
+                row["name"],
+                row["size_bytes"],
+                row["mtime_ms"],
+                row["sha256"],
+            ])
+            for row in files
+        )
+        return compressor.compress(data) if compressor else data
+
+    async def _body():
+        # Connection handling as in export_files; encoding and compression
+        # run in the thread pool so large manifests do not stall the loop.
+        async with pool.acquire() as conn, aclosing(
+            iter_file_manifest_by_owner(conn=conn, owner_id=owner_id)
+        ) as chunks:
+            first = True
+            async for folders, files in chunks:
+                if first:
+                    first = False
+                    yield await run_in_threadpool(_encode_folders, folders)
+                elif data := await run_in_threadpool(_encode_files, files):
+                    yield data
+        if compressor:
+            yield compressor.flush()
+
+    headers = {
+        "Content-Disposition": 'attachment; filename="manifest.msgpack"',
+        "Vary": "Accept-Encoding",
     }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_body(), media_type="application/vnd.msgpack", headers=headers)
+
+
+# ─── GET /files/events ────────────────────────────────────────────────────────
+
+def _sse(event: str, data: dict) -> bytes:
+    """Format one server-sent event."""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@router.get("/events")
+async def stream_file_events(
+    request: Request,
+    token: str = Depends(get_stream_token),
+):
+    """
+    Stream change notifications for the current user as server-sent events.
+
+    After ``ready``, a ``changes`` event is sent whenever the user's change log
+    advances, carrying its newest ``cursor``; fetch the changes themselves with
+    ``GET /files/changes?since=<your last cursor>``. Bursts are coalesced, so a
+    slow reader receives one event with the latest cursor rather than a backlog.
+    ``resync: true`` means notifications may have been missed: poll the change
+    feed even if ``cursor`` looks unchanged. A comment line is sent every 15 s
+    to keep the connection alive; the stream ends with ``expired`` when the
+    access token does. The token may be passed as ``?access_token=`` for
+    clients that cannot set an ``Authorization`` header.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+    expires_at = tok.get("exp")
+
+    broker = request.app.state.file_events
+    if not broker.can_subscribe(owner_id):
+        raise HTTPException(status_code=429, detail="Too many open event streams")
+
+    async def _events():
+        # Holds no database connection: the stream only waits on the
+        # subscription, which this worker's LISTEN connection feeds.  It
+        # subscribes here rather than in the route, so a client gone before
+        # the body starts leaves no subscription behind.
+        try:
+            sub = broker.subscribe(owner_id)
+        except TooManySubscriptionsError:
+            # Filled up since the check above; the headers are already
+            # sent, so just end the stream and let the client retry.
+            return
+        try:
+            yield b"retry: 5000\n\n"
+            yield _sse("ready", {})
+            while True:
+                timeout = _EVENTS_HEARTBEAT_SECONDS
+                if expires_at is not None:
+                    timeout = min(timeout, max(expires_at - time.time(), 0))
+                news = await sub.wait(timeout)
+                if await request.is_disconnected():
+                    break
+                if news is not None:
+                    cursor, resync = news
+                    yield _sse("changes", {"cursor": cursor, "resync": resync})
+                elif expires_at is not None and time.time() >= expires_at:
+                    yield _sse("expired", {})
+                    break
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ─── GET /files/trash ─────────────────────────────────────────────────────────
+
+@router.get("/trash")
+async def list_trash(
+    limit: int = Query(100, ge=1, le=1000, description="Max results"),
+    offset: int = Query(0, ge=0, description="Pagination offset"),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    List the current user's trash, most recently deleted first.
+
+    ``folder`` is where each file was deleted from, and where a restore puts it back.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    rows = await list_trashed_file_meta(
+        conn=conn, owner_id=owner_id, limit=limit + 1, offset=offset
+    )
+    total = await count_trashed_file_meta(conn=conn, owner_id=owner_id)
+    return ORJSONResponse({
+        "items": [_serialize(r) for r in rows[:limit]],
+        "total_count": total,
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(rows) > limit,
+    })
+
+
+# ─── DELETE /files/trash ──────────────────────────────────────────────────────
+
+@router.delete("/trash", status_code=status.HTTP_200_OK)
+async def empty_trash(
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Permanently delete every file in the current user's trash."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    purged = await purge_trashed_file_meta_and_bytes(conn=conn, owner_id=owner_id)
+    return {"success": True, "purged_files": purged}
+
+
+# ─── POST /files/trash/{file_id}/restore ──────────────────────────────────────
+
+@router.post("/trash/{file_id}/restore")
+async def restore_file_endpoint(
+    file_id: str,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Restore a file from the trash into the folder it was deleted from."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id, include_trashed=True)
+    if meta.trashed_at is None:
+        raise HTTPException(status_code=404, detail="File not found in trash")
+
+    try:
+        meta = await restore_file_meta(conn=conn, file_id=meta.file_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found in trash")
+
+    return _serialize(meta)
+
+
+# ─── DELETE /files/trash/{file_id} ────────────────────────────────────────────
+
+@router.delete("/trash/{file_id}", status_code=status.HTTP_200_OK)
+async def purge_file_endpoint(
+    file_id: str,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Permanently delete one file from the trash, with its stored bytes."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id, include_trashed=True)
+    if meta.trashed_at is None:
+        raise HTTPException(status_code=404, detail="File not found in trash")
+
+    try:
+        await delete_file_meta_and_bytes(conn=conn, file_id=meta.file_id)
+    except FileError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    return {"success": True, "file_id": file_id, "message": "File deleted permanently"}
 
 
 # ─── GET /files/{file_id} ─────────────────────────────────────────────────────
@@ -275,18 +1080,8 @@ async def download_file(
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    try:
-        file_uuid = uuid.UUID(file_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid file_id format")
-
-    meta = await get_file_by_id(conn, file_uuid)
-    if not meta:
-        raise HTTPException(status_code=404, detail="File not found")
-    if meta["owner_id"] != owner_id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    obj = get_file_stream(meta["file_key"])
+    meta = await _get_owned_file(conn, file_id, owner_id)
+    obj = get_file_stream(meta.object_key)
 
     def _iterator():
         try:
@@ -297,12 +1092,12 @@ async def download_file(
             obj.release_conn()
 
     headers = {
-        "Content-Disposition": f'attachment; filename="{_sanitize_filename(meta["current_name"])}"',
-        "X-Content-SHA256": meta["sha256_hex"],
+        "Content-Disposition": f'attachment; filename="{_sanitize_filename(meta.current_name)}"',
+        "X-Content-SHA256": meta.sha256_hex,
     }
     return StreamingResponse(
         _iterator(),
-        media_type=meta["content_type"] or "application/octet-stream",
+        media_type=meta.mime_type or "application/octet-stream",
         headers=headers,
     )
 
@@ -315,31 +1110,23 @@ async def delete_file_endpoint(
     conn: asyncpg.Connection = Depends(get_db),
     token: str = Depends(get_token),
 ):
-    """Delete a file from object storage and remove its database record."""
+    """
+    Move a file to the trash.
+
+    It can be restored through ``POST /files/trash/{file_id}/restore`` until it
+    is purged, ``TRASH_RETENTION_DAYS`` after deletion.
+    """
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    try:
-        file_uuid = uuid.UUID(file_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid file_id format")
-
-    meta = await get_file_by_id(conn, file_uuid)
-    if not meta:
-        raise HTTPException(status_code=404, detail="File not found")
-    if meta["owner_id"] != owner_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    meta = await _get_owned_file(conn, file_id, owner_id)
 
-    # Best-effort MinIO delete; DB record is authoritative
     try:
-        minio_delete_file(str(meta["file_key"]))
-    except Exception as exc:
-        # Log and continue - stale objects can be cleaned up separately
-        print(f"[WARN] MinIO delete failed for {meta['file_key']}: {exc}")
-
-    await repo_delete_file(conn, file_uuid)
+        await trash_file_meta(conn=conn, file_id=meta.file_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
 
-    return {"success": True, "file_id": file_id, "message": "File deleted successfully"}
+    return {"success": True, "file_id": file_id, "message": "File moved to trash"}
 
 
 # ─── PATCH /files/{file_id} ───────────────────────────────────────────────────
@@ -361,27 +1148,149 @@ async def update_file_metadata(
     tok = _require_token(token)
     owner_id = uuid.UUID(tok["sub"])
 
-    try:
-        file_uuid = uuid.UUID(file_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid file_id format")
-
-    meta = await get_file_by_id(conn, file_uuid)
-    if not meta:
-        raise HTTPException(status_code=404, detail="File not found")
-    if meta["owner_id"] != owner_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    meta = await _get_owned_file(conn, file_id, owner_id)
 
     # Apply rename if requested
     if name is not None:
-        updated = await rename_file(conn, file_uuid, _sanitize_filename(name))
-        if updated:
-            meta = updated
+        meta = await rename_file_meta(
+            conn=conn, file_id=meta.file_id, new_name=_sanitize_filename(name)
+        )
 
     # Apply folder move if requested
     if folder is not None:
-        updated = await move_file(conn, file_uuid, folder=_normalize_folder(folder))
-        if updated:
-            meta = updated
+        meta = await move_file_meta(
+            conn=conn, file_id=meta.file_id, folder=_normalize_folder(folder)
+        )
+
+    return _serialize(meta)
+
+
+# ─── PUT /files/{file_id}/content ─────────────────────────────────────────────
+
+@router.put("/{file_id}/content")
+async def replace_file_content(
+    file_id: str,
+    file: UploadFile = File(...),
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """
+    Upload new content for a file, keeping the previous content as a version.
+
+    Content identical to one of the file's versions is not stored again.
+    Old versions count towards the quota until pruned, after
+    ``FILE_VERSIONS_RETENTION_DAYS`` or beyond ``FILE_VERSIONS_KEEP`` per file.
+    """
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id)
+
+    with NamedTemporaryFile(delete=True) as tmp:
+        size, sha256_hex = await _spool_upload(file, tmp)
+
+        try:
+            content = FileContent(
+                mime_type=file.content_type or meta.mime_type,
+                size_bytes=size,
+                sha256_hex=sha256_hex,
+            )
+        except ValidationError:
+            raise HTTPException(status_code=400, detail="Invalid file metadata")
+
+        try:
+            meta = await create_file_version(
+                conn=conn,
+                file_id=meta.file_id,
+                content=content,
+                file_bytes=tmp,  # type: ignore[arg-type]
+            )
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+        except StorageQuotaExceededError:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Storage quota exceeded",
+            )
+
+    return _serialize(meta)
+
+
+# ─── GET /files/{file_id}/versions ────────────────────────────────────────────
+
+@router.get("/{file_id}/versions")
+async def list_file_versions_endpoint(
+    file_id: str,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """List a file's versions, newest (the current one) first."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id)
+    versions = await list_file_versions(conn=conn, file_id=meta.file_id)
+    return ORJSONResponse({"items": [_serialize_version(v) for v in versions]})
+
+
+# ─── POST /files/{file_id}/versions/{version_no}/restore ─────────────────────
+
+@router.post("/{file_id}/versions/{version_no}/restore")
+async def restore_file_version_endpoint(
+    file_id: str,
+    version_no: int,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Make an earlier version current again, as a new version on top of the history."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id)
+    if version_no == meta.version_no:
+        return _serialize(meta)
+
+    try:
+        meta = await restore_file_version(
+            conn=conn, file_id=meta.file_id, version_no=version_no
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    except FileVersionNotFoundError:
+        raise HTTPException(status_code=404, detail="Version not found")
+    except StorageQuotaExceededError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Storage quota exceeded",
+        )
+
+    return _serialize(meta)
+
+
+# ─── DELETE /files/{file_id}/versions/{version_no} ───────────────────────────
+
+@router.delete("/{file_id}/versions/{version_no}", status_code=status.HTTP_200_OK)
+async def delete_file_version_endpoint(
+    file_id: str,
+    version_no: int,
+    conn: asyncpg.Connection = Depends(get_db),
+    token: str = Depends(get_token),
+):
+    """Permanently delete a noncurrent version of a file."""
+    tok = _require_token(token)
+    owner_id = uuid.UUID(tok["sub"])
+
+    meta = await _get_owned_file(conn, file_id, owner_id)
+    if version_no == meta.version_no:
+        raise HTTPException(
+            status_code=400, detail="The current version cannot be deleted"
+        )
+
+    try:
+        await delete_file_version(conn=conn, file_id=meta.file_id, version_no=version_no)
+    except FileVersionNotFoundError:
+        raise HTTPException(status_code=404, detail="Version not found")
+    except FileError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
 
-    return _serialize(meta)
\ No newline at end of file
+    return {"success": True, "file_id": file_id, "version": version_no}
@@ -10,7 +10,7 @@ from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr, parseaddr
 from urllib.parse import quote
 
-from ....queries.exceptions import (
+from .exceptions import (
     MailerError,
     SMTPAuthenticationError,
     SMTPConnectionError,
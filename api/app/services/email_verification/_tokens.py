@@ -7,7 +7,7 @@ import json
 import os
 import time
 from typing import TypedDict
-from ....queries.exceptions import (
+from ...database.token.exceptions import (
     TokenError,
     TokenTypeError,
     TokenExpiredError,
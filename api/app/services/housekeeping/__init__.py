@@ -0,0 +1,29 @@
+"""
+Housekeeping package.
+
+Periodic background maintenance of database state that grows without
+bound: compaction and retention of the file change log, purging of files
+that have sat in the trash past their retention period, and pruning of
+old file versions.  Every API worker starts the loop; a Postgres advisory
+lock ensures only one of them sweeps at a time.
+
+Submodules:
+    _runner.py:   Configuration, the sweep, and the background loop.
+
+Configuration (environment):
+    HOUSEKEEPING_INTERVAL_SECONDS:  Seconds between sweeps (default 3600).
+    CHANGE_LOG_RETENTION_DAYS:      Days of change-log history kept (default 30).
+    TRASH_RETENTION_DAYS:           Days a deleted file stays restorable
+                                    (default 30).
+    FILE_VERSIONS_KEEP:             Noncurrent versions kept per file
+                                    (default 10).
+    FILE_VERSIONS_RETENTION_DAYS:   Days a replaced version is kept
+                                    (default 30).
+"""
+
+from ._runner import run_housekeeping_once, start_housekeeping
+
+__all__ = [
+    "run_housekeeping_once",
+    "start_housekeeping",
+]
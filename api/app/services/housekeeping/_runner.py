@@ -0,0 +1,106 @@
+import os
+import asyncio
+import logging
+from datetime import timedelta
+from functools import lru_cache
+from dataclasses import dataclass
+
+from asyncpg import Pool
+
+from ...database.change import compact_changes
+from ...database.file import purge_trashed_file_meta_and_bytes, prune_file_versions
+
+
+logger = logging.getLogger(__name__)
+
+# Session-level advisory lock key; only one API worker runs a sweep at a time.
+_LOCK_KEY = 0x5D_C0_FFEE
+
+
+# ---------------------------------------------------------------------------
+# Config dataclass
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _HousekeepingConfig:
+    INTERVAL: timedelta
+    CHANGE_RETENTION: timedelta
+    TRASH_RETENTION: timedelta
+    VERSIONS_KEEP: int
+    VERSIONS_RETENTION: timedelta
+
+    def __post_init__(self):
+        if self.INTERVAL <= timedelta(0):
+            raise ValueError("HOUSEKEEPING_INTERVAL_SECONDS must be positive.")
+        if self.CHANGE_RETENTION <= timedelta(0):
+            raise ValueError("CHANGE_LOG_RETENTION_DAYS must be positive.")
+        if self.TRASH_RETENTION < timedelta(0):
+            raise ValueError("TRASH_RETENTION_DAYS must not be negative.")
+        if self.VERSIONS_KEEP < 0:
+            raise ValueError("FILE_VERSIONS_KEEP must not be negative.")
+        if self.VERSIONS_RETENTION < timedelta(0):
+            raise ValueError("FILE_VERSIONS_RETENTION_DAYS must not be negative.")
+
+
+@lru_cache(maxsize=None)
+def _load_config() -> _HousekeepingConfig:
+    return _HousekeepingConfig(
+        INTERVAL=timedelta(seconds=int(os.getenv("HOUSEKEEPING_INTERVAL_SECONDS", "3600"))),
+        CHANGE_RETENTION=timedelta(days=int(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))),
+        TRASH_RETENTION=timedelta(days=int(os.getenv("TRASH_RETENTION_DAYS", "30"))),
+        VERSIONS_KEEP=int(os.getenv("FILE_VERSIONS_KEEP", "10")),
+        VERSIONS_RETENTION=timedelta(days=int(os.getenv("FILE_VERSIONS_RETENTION_DAYS", "30"))),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+async def run_housekeeping_once(pool: Pool) -> bool:
+    """Run one sweep of every housekeeping job, unless another worker is already running one.
+
+    Returns:
+        ``True`` if this call ran the sweep, ``False`` if it was skipped.
+    """
+    config = _load_config()
+    async with pool.acquire() as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", _LOCK_KEY):
+            return False
+        try:
+            removed = await compact_changes(conn=conn, retain=config.CHANGE_RETENTION)
+            logger.info("housekeeping: removed %d change-log rows", removed)
+            purged = await purge_trashed_file_meta_and_bytes(
+                conn=conn, retain=config.TRASH_RETENTION
+            )
+            logger.info("housekeeping: purged %d trashed files", purged)
+            pruned = await prune_file_versions(
+                conn=conn, keep=config.VERSIONS_KEEP, retain=config.VERSIONS_RETENTION
+            )
+            logger.info("housekeeping: pruned %d old file versions", pruned)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", _LOCK_KEY)
+    return True
+
+
+async def _loop(pool: Pool) -> None:
+    interval = _load_config().INTERVAL.total_seconds()
+    while True:
+        try:
+            await run_housekeeping_once(pool)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # A failed sweep is retried on the next tick; never kill the loop.
+            logger.exception("housekeeping sweep failed")
+        await asyncio.sleep(interval)
+
+
+def start_housekeeping(pool: Pool) -> asyncio.Task:
+    """Start the periodic housekeeping loop on the running event loop.
+
+    The caller owns the returned task and should cancel it on shutdown.
+    """
+    return asyncio.create_task(_loop(pool), name="housekeeping")
@@ -0,0 +1,42 @@
+"""
+Migrations package.
+
+Versioned changes to a database whose schema was created from ``ini/*.sql``.
+Those scripts run once, when the Postgres volume is first initialised, and
+remain the baseline; everything after them is a migration in ``versions/``,
+applied in order by ``python -m app.services.migrations`` (``make migrate``)
+on new and existing databases alike.
+
+Each migration is a file ``NNNN_description.sql``.  Its SHA-256 is recorded
+in ``schema_migrations`` when it is applied, and the runner refuses to go on
+if an applied file was edited or removed afterwards.  A migration normally
+runs in one transaction, together with its ``schema_migrations`` row.  A file
+whose first line is ``-- migrate: no-transaction`` instead runs statement by
+statement, which ``CREATE INDEX CONCURRENTLY`` needs; such a file is re-run
+from the top after a failure, so each of its statements must be safe to
+repeat.
+
+Submodules:
+    _runner.py:     Loading, verifying and applying migrations.
+    __main__.py:    Command line: ``migrate [--target N]`` and ``status``.
+    exceptions.py:  Migration errors.
+
+Configuration (environment):
+    POSTGRES_MIGRATION_USER:      Role that runs migrations; it must own the
+                                  schema (default POSTGRES_USER).
+    POSTGRES_MIGRATION_PASSWORD:  Its password (default POSTGRES_PASSWORD).
+"""
+
+from ._runner import Migration, MigrationState, load_migrations, migrate, migration_status
+from .exceptions import MigrationError, MigrationChecksumError, MissingMigrationError
+
+__all__ = [
+    "Migration",
+    "MigrationState",
+    "load_migrations",
+    "migrate",
+    "migration_status",
+    "MigrationError",
+    "MigrationChecksumError",
+    "MissingMigrationError",
+]
@@ -0,0 +1,52 @@
+import os
+import sys
+import asyncio
+import logging
+import argparse
+
+from asyncpg import connect
+
+from ._runner import migrate, migration_status
+from .exceptions import MigrationError
+
+
+async def _main(args: argparse.Namespace) -> int:
+    conn = await connect(
+        host=os.environ["POSTGRES_HOST"],
+        port=os.environ["POSTGRES_PORT"],
+        user=os.getenv("POSTGRES_MIGRATION_USER") or os.environ["POSTGRES_USER"],
+        password=os.getenv("POSTGRES_MIGRATION_PASSWORD") or os.environ["POSTGRES_PASSWORD"],
+        database=os.environ["POSTGRES_DB"],
+    )
+    try:
+        if args.command == "status":
+            for state in await migration_status(conn):
+                applied = state.applied_at.isoformat() if state.applied_at else "pending"
+                print(f"{state.migration.name:<48} {applied}")
+        else:
+            applied = await migrate(conn, target=args.target)
+            print(f"applied {len(applied)} migration(s)")
+    except MigrationError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        await conn.close()
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.services.migrations")
+    sub = parser.add_subparsers(dest="command")
+    apply = sub.add_parser("migrate", help="apply pending migrations (default)")
+    apply.add_argument("--target", type=int, default=None, help="stop after this version")
+    sub.add_parser("status", help="list migrations and when they were applied")
+    args = parser.parse_args()
+    if args.command is None:
+        args = parser.parse_args(["migrate"])
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import re
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from asyncpg import Connection
+
+from .exceptions import MigrationError, MigrationChecksumError, MissingMigrationError
+
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIR = Path(__file__).parent / "versions"
+
+# Session-level advisory lock key; only one runner applies migrations at a time.
+_LOCK_KEY = 0x5D_5C_4E_3A
+_LOCK_POLL_SECONDS = 1.0
+
+_FILENAME = re.compile(r"^(\d{4})_([a-z0-9_]+)\.sql$")
+_NO_TRANSACTION = "-- migrate: no-transaction"
+# Statement boundaries of no-transaction migrations: a ';' ending a line.
+_STATEMENT_END = re.compile(r";[ \t]*(?:--[^\n]*)?$", re.MULTILINE)
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version      INT PRIMARY KEY,
+        name         TEXT NOT NULL,
+        checksum     CHAR(64) NOT NULL,
+        applied_at   TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+        duration_ms  INT NOT NULL
+    )
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One SQL file under :data:`VERSIONS_DIR`, named ``NNNN_description.sql``."""
+
+    version: int
+    name: str
+    sql: str
+    checksum: str
+    # False when the file starts with "-- migrate: no-transaction".
+    transactional: bool
+
+    def statements(self) -> list[str]:
+        """Split a no-transaction migration into its statements.
+
+        Every statement must end with ``;`` at the end of a line, so these
+        files cannot hold function bodies or other multi-line literals.
+        """
+        parts = _STATEMENT_END.split(self.sql)
+        return [
+            part.strip() for part in parts
+            if any(line.strip() and not line.strip().startswith("--") for line in part.splitlines())
+        ]
+
+
+@dataclass(frozen=True)
+class MigrationState:
+    migration: Migration
+    applied_at: datetime | None
+
+
+def load_migrations(directory: Path = VERSIONS_DIR) -> list[Migration]:
+    """Read every migration in *directory*, ordered by version.
+
+    Raises:
+        MigrationError: If a ``.sql`` file is misnamed or two share a version.
+    """
+    migrations: dict[int, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise MigrationError(f"Migration file '{path.name}' is not named NNNN_description.sql.")
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Migrations '{migrations[version].name}' and '{path.stem}' share version {version}.")
+        # Normalised so a checkout's line endings do not change the checksum.
+        sql = path.read_text(encoding="utf-8").replace("\r\n", "\n")
+        migrations[version] = Migration(
+            version=version,
+            name=path.stem,
+            sql=sql,
+            checksum=hashlib.sha256(sql.encode()).hexdigest(),
+            transactional=not sql.lstrip().startswith(_NO_TRANSACTION),
+        )
+    return [migrations[v] for v in sorted(migrations)]
+
+
+async def _applied(conn: Connection) -> dict[int, tuple[str, datetime]]:
+    rows = await conn.fetch("SELECT version, checksum, applied_at FROM schema_migrations")
+    return {row["version"]: (row["checksum"], row["applied_at"]) for row in rows}
+
+
+def _verify(migrations: list[Migration], applied: dict[int, tuple[str, datetime]]) -> None:
+    known = {m.version: m for m in migrations}
+    for version, (checksum, _) in sorted(applied.items()):
+        migration = known.get(version)
+        if migration is None:
+            raise MissingMigrationError(f"Migration {version:04d} is applied but has no file.")
+        if migration.checksum != checksum.strip():
+            raise MigrationChecksumError(
+                f"Migration '{migration.name}' was changed after it was applied; "
+                "add a new migration instead."
+            )
+
+
+async def migration_status(
+    conn: Connection, migrations: list[Migration] | None = None
+) -> list[MigrationState]:
+    """Return every known migration with when it was applied (``None`` if pending).
+
+    Raises:
+        MigrationChecksumError: If an applied migration's file was edited.
+        MissingMigrationError: If an applied migration's file is gone.
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    applied = await _applied(conn) if exists else {}
+    _verify(migrations, applied)
+    return [
+        MigrationState(migration=m, applied_at=applied[m.version][1] if m.version in applied else None)
+        for m in migrations
+    ]
+
+
+async def _apply(conn: Connection, migration: Migration) -> None:
+    started = time.monotonic()
+    record = "INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES ($1, $2, $3, $4)"
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            await conn.execute(
+                record, migration.version, migration.name, migration.checksum,
+                int((time.monotonic() - started) * 1000),
+            )
+        return
+
+    # One implicit transaction per statement, as CREATE/DROP INDEX
+    # CONCURRENTLY require.  If one fails the migration is not recorded and
+    # is run again from the top, so its statements must be re-runnable.
+    for statement in migration.statements():
+        await conn.execute(statement)
+    await conn.execute(
+        record, migration.version, migration.name, migration.checksum,
+        int((time.monotonic() - started) * 1000),
+    )
+
+
+async def migrate(
+    conn: Connection,
+    migrations: list[Migration] | None = None,
+    target: int | None = None,
+) -> list[Migration]:
+    """Apply pending migrations in version order, up to *target* if given.
+
+    Holds a session-level advisory lock for the whole run, so concurrent
+    runners (say, several deploys starting at once) apply each migration
+    once.  Applied migrations are verified against their checksums first;
+    nothing is applied if any was edited or removed.  Transactional
+    migrations are recorded in the same transaction as their changes.
+
+    *conn* must belong to a role that owns the schema, not the app role.
+
+    Returns:
+        The migrations applied by this call.
+    """
+    migrations = load_migrations() if migrations is None else migrations
+    pending: list[Migration] = []
+    # Polled rather than waited for: a session blocked in pg_advisory_lock()
+    # holds a snapshot, which a CREATE INDEX CONCURRENTLY in the session
+    # holding the lock would wait for in turn.
+    while not await conn.fetchval("SELECT pg_try_advisory_lock($1)", _LOCK_KEY):
+        await asyncio.sleep(_LOCK_POLL_SECONDS)
+    try:
+        await conn.execute(_CREATE_TABLE_SQL)
+        applied = await _applied(conn)
+        _verify(migrations, applied)
+        pending = [
+            m for m in migrations
+            if m.version not in applied and (target is None or m.version <= target)
+        ]
+        for migration in pending:
+            logger.info("applying migration %s", migration.name)
+            await _apply(conn, migration)
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", _LOCK_KEY)
+    return pending
@@ -0,0 +1,13 @@
+"""Exceptions for the schema migration runner."""
+
+
+class MigrationError(Exception):
+    """Base class for all migration errors."""
+
+
+class MigrationChecksumError(MigrationError):
+    """Raised when an applied migration's file no longer matches what was applied."""
+
+
+class MissingMigrationError(MigrationError):
+    """Raised when the database has a migration applied that has no file."""
@@ -0,0 +1,37 @@
+-- migrate: no-transaction
+--
+-- Owner-scoped indexes for the file listings (GET /files), which filter on
+-- owner_id and sort by created_at (the default) or current_name.
+-- idx_files_owner_created also takes over from idx_files_owner_id,
+-- including the users(user_id) ON DELETE CASCADE lookups, so that one is
+-- dropped once its replacement is in place.
+--
+-- Built CONCURRENTLY so writes to files are not blocked.  A failed
+-- concurrent build leaves an INVALID index behind; each build therefore
+-- drops any leftover first, which makes re-running this file safe.
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_files_owner_created;
+CREATE INDEX CONCURRENTLY idx_files_owner_created
+    ON files(owner_id, created_at);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_files_owner_name;
+CREATE INDEX CONCURRENTLY idx_files_owner_name
+    ON files(owner_id, current_name) WHERE trashed_at IS NULL;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_files_owner_id;
+
+-- v_files looks each file's folder path up by primary key instead of
+-- joining folders.  With the join, an owner filter is applied to both
+-- tables, and the planner multiplies the two selectivities: for a large
+-- account it estimated a few dozen rows where there were thousands, so it
+-- listed the owner's files by walking their folders and sorting
+-- everything, rather than reading the indexes above in order and stopping
+-- at the LIMIT.  As a scalar subquery the path is fetched only for the
+-- rows a query returns, and v_files plans like files alone.  folder_id is
+-- NOT NULL and references folders, and a folder always has its files'
+-- owner, so no row is added or lost.  The columns are unchanged.
+CREATE OR REPLACE VIEW v_files AS
+    SELECT f.*,
+           COALESCE(f.trashed_from,
+                    (SELECT d.path FROM folders d WHERE d.folder_id = f.folder_id)) AS folder
+      FROM files f;
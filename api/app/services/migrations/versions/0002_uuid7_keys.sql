@@ -0,0 +1,28 @@
+-- Time-ordered (version 7) UUIDs for new rows.  Random (version 4) keys
+-- land all over their B-tree index, so each insert dirties a different
+-- leaf page; version 7 keys start with a millisecond timestamp and are
+-- appended to the right-hand edge instead.  files and users get theirs
+-- from the application (uuid.uuid7()); rows whose ids Postgres generates
+-- use fn_uuid7().  Existing ids are kept.
+
+-- Postgres 15 has no uuidv7().  Laid out like the one in Postgres 18:
+-- 48 bits of Unix time in milliseconds, the version (7), 12 bits of
+-- sub-millisecond fraction, so ids generated by one statement still come
+-- out in order, and 64 random bits (with the variant) taken from a
+-- version 4 UUID.
+CREATE OR REPLACE FUNCTION fn_uuid7()
+RETURNS UUID AS $$
+    SELECT encode(
+        substring(int8send(t.us / 1000) FROM 3)
+        || substring(int4send((x'7000'::INT | ((t.us % 1000) * 4096 / 1000))::INT) FROM 3)
+        || substring(uuid_send(gen_random_uuid()) FROM 9),
+        'hex')::UUID
+    FROM (SELECT (extract(epoch FROM clock_timestamp()) * 1000000)::BIGINT AS us) t;
+$$ LANGUAGE sql VOLATILE;
+
+ALTER TABLE folders
+    ALTER COLUMN folder_id SET DEFAULT fn_uuid7();
+
+ALTER TABLE refresh_tokens
+    ALTER COLUMN token_id SET DEFAULT fn_uuid7(),
+    ALTER COLUMN family_id SET DEFAULT fn_uuid7();
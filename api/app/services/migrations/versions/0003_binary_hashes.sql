@@ -0,0 +1,39 @@
+-- SHA-256 digests as 32 raw bytes instead of 64 hex characters: half the
+-- heap width and roughly half the index size for the content lookups
+-- (idx_files_sha256, idx_files_owner_sha256) and the refresh-token lookup
+-- (idx_refresh_tokens_token_hash).  The API keeps speaking hex; the
+-- conversion happens where the data-access layer binds parameters and
+-- loads rows.  Column names are unchanged.
+--
+-- Each ALTER rewrites its table and rebuilds its indexes under an ACCESS
+-- EXCLUSIVE lock, so run this in a maintenance window on large installs.
+
+-- v_files selects f.*, which pins the type of every files column.
+DROP VIEW v_files;
+
+ALTER TABLE files
+    DROP CONSTRAINT chk_files_sha256_format,
+    ALTER COLUMN sha256_hex TYPE BYTEA USING decode(sha256_hex, 'hex'),
+    ADD CONSTRAINT chk_files_sha256_length
+        CHECK (octet_length(sha256_hex) = 32);
+
+ALTER TABLE file_versions
+    DROP CONSTRAINT chk_file_versions_sha256_format,
+    ALTER COLUMN sha256_hex TYPE BYTEA USING decode(sha256_hex, 'hex'),
+    ADD CONSTRAINT chk_file_versions_sha256_length
+        CHECK (octet_length(sha256_hex) = 32);
+
+ALTER TABLE refresh_tokens
+    DROP CONSTRAINT chk_tokens_hash_format,
+    ALTER COLUMN token_hash TYPE BYTEA USING decode(token_hash, 'hex'),
+    ADD CONSTRAINT chk_tokens_hash_length
+        CHECK (octet_length(token_hash) = 32);
+
+-- As left by 0001_files_owner_listing_indexes.sql.
+CREATE VIEW v_files AS
+    SELECT f.*,
+           COALESCE(f.trashed_from,
+                    (SELECT d.path FROM folders d WHERE d.folder_id = f.folder_id)) AS folder
+      FROM files f;
+
+GRANT SELECT ON TABLE v_files TO secure_drive;
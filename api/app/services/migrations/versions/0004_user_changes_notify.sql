@@ -0,0 +1,25 @@
+-- Tell every API worker when a user row changes or goes away, so principals
+-- cached in memory (app.services.principals) are dropped rather than served
+-- stale.  Delivered at commit on channel 'user_changes'; the payload is the
+-- user id.  Several changes to one user in a transaction arrive as one
+-- notification, since Postgres folds identical payloads.
+
+CREATE OR REPLACE FUNCTION fn_users_notify_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('user_changes', OLD.user_id::TEXT);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Counter updates (storage_used, file_count) count as changes too: the
+-- cached principal reports them.
+CREATE TRIGGER trg_users_notify_update
+    AFTER UPDATE ON users
+    FOR EACH ROW
+    WHEN (OLD IS DISTINCT FROM NEW)
+    EXECUTE FUNCTION fn_users_notify_change();
+
+CREATE TRIGGER trg_users_notify_delete
+    AFTER DELETE ON users
+    FOR EACH ROW EXECUTE FUNCTION fn_users_notify_change();
@@ -0,0 +1,16 @@
+-- user_changes notifications also carry the user's valid_since, as
+-- '<user_id>:<epoch seconds>', so workers can reject access tokens issued
+-- before it (app.services.sessions) without reading the row.  A deleted
+-- user's tokens are all rejected: the deletion time is sent instead.
+
+CREATE OR REPLACE FUNCTION fn_users_notify_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'user_changes',
+        OLD.user_id::TEXT || ':' || extract(epoch FROM
+            CASE TG_OP WHEN 'DELETE' THEN NOW() ELSE NEW.valid_since END)
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
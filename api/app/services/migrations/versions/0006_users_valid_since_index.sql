@@ -0,0 +1,11 @@
+-- migrate: no-transaction
+--
+-- Workers load the users whose valid_since moved within the last access
+-- token lifetime at startup and whenever their LISTEN connection is
+-- (re)established.  valid_since only changes on "log out everywhere" and
+-- (de)activation; the counter updates do not touch it, so the index does
+-- not keep them from being HOT updates.
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_users_valid_since;
+CREATE INDEX CONCURRENTLY idx_users_valid_since
+    ON users(valid_since);
@@ -0,0 +1,20 @@
+-- Only notify user_changes when a column the cached principal or the
+-- valid_since table depends on changes.  The counters (file_count,
+-- storage_used, change_seq, change_floor) and updated_at move with every
+-- file upload, move and delete; notifying on those evicted the principal
+-- from every worker's cache on each file mutation.  /auth/me reads the
+-- counters fresh instead.
+
+DROP TRIGGER trg_users_notify_update ON users;
+
+CREATE TRIGGER trg_users_notify_update
+    AFTER UPDATE OF email, name, password_hash, storage_quota, last_login,
+                    verified, is_active, valid_since, verification_version
+    ON users
+    FOR EACH ROW
+    WHEN ((OLD.email, OLD.name, OLD.password_hash, OLD.storage_quota, OLD.last_login,
+           OLD.verified, OLD.is_active, OLD.valid_since, OLD.verification_version)
+          IS DISTINCT FROM
+          (NEW.email, NEW.name, NEW.password_hash, NEW.storage_quota, NEW.last_login,
+           NEW.verified, NEW.is_active, NEW.valid_since, NEW.verification_version))
+    EXECUTE FUNCTION fn_users_notify_change();
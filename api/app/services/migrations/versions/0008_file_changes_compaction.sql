@@ -0,0 +1,99 @@
+-- Compact the change log by seq, and log only the root of a moved folder.
+--
+-- fn_compact_file_changes expired rows by changed_at, which is the
+-- writing transaction's start time and so not monotonic in seq: a long
+-- transaction can commit a low-changed_at row after others, and the
+-- expiry then left holes below rows it kept.  Expiry now drops the seq
+-- prefix below the oldest change still inside p_retain, and the floor is
+-- the highest seq it dropped.
+--
+-- Renaming or moving a folder rewrites the path of every folder beneath
+-- it, and each of those rows was logged as its own folder_moved change.
+-- Only the moved folder is logged now; its descendants keep their
+-- parent_id and name, so clients re-derive their paths from it.
+
+CREATE OR REPLACE FUNCTION fn_folders_log_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    owners     UUID[];
+    folder_ids UUID[];
+    kinds      TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(owner_id ORDER BY path), array_agg(folder_id ORDER BY path),
+               array_agg('folder_created'::TEXT ORDER BY path)
+          INTO owners, folder_ids, kinds
+          FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(owner_id ORDER BY path), array_agg(folder_id ORDER BY path),
+               array_agg('folder_deleted'::TEXT ORDER BY path)
+          INTO owners, folder_ids, kinds
+          FROM old_rows;
+    ELSE
+        -- A moved subtree is one statement; skip folders whose parent
+        -- moved with them.
+        WITH moved AS (
+            SELECT nr.owner_id, nr.folder_id, nr.parent_id, nr.path
+              FROM old_rows o JOIN new_rows nr USING (folder_id)
+             WHERE o.path <> nr.path
+        )
+        SELECT array_agg(m.owner_id ORDER BY m.path), array_agg(m.folder_id ORDER BY m.path),
+               array_agg('folder_moved'::TEXT ORDER BY m.path)
+          INTO owners, folder_ids, kinds
+          FROM moved m
+         WHERE NOT EXISTS (SELECT 1 FROM moved p WHERE p.folder_id = m.parent_id);
+    END IF;
+
+    IF owners IS NOT NULL THEN
+        PERFORM fn_log_file_changes(owners, array_fill(NULL::UUID, ARRAY[cardinality(owners)]), folder_ids, kinds);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_compact_file_changes(
+    p_owner_id UUID,
+    p_retain   INTERVAL
+)
+RETURNS BIGINT AS $$
+DECLARE
+    v_superseded BIGINT;
+    v_expired    BIGINT;
+    v_keep_from  BIGINT;
+    v_floor      BIGINT;
+BEGIN
+    DELETE FROM file_changes c
+     USING (SELECT seq,
+                   row_number() OVER (PARTITION BY COALESCE(file_id, folder_id)
+                                      ORDER BY seq DESC) AS rn
+              FROM file_changes
+             WHERE owner_id = p_owner_id) x
+     WHERE c.owner_id = p_owner_id
+       AND c.seq = x.seq
+       AND x.rn > 1;
+    GET DIAGNOSTICS v_superseded = ROW_COUNT;
+
+    -- Everything below the oldest retained change expires, whatever its
+    -- changed_at; with nothing retained, the whole log does.
+    SELECT MIN(seq) INTO v_keep_from
+      FROM file_changes
+     WHERE owner_id = p_owner_id
+       AND changed_at >= (NOW() AT TIME ZONE 'utc') - p_retain;
+
+    WITH expired AS (
+        DELETE FROM file_changes
+         WHERE owner_id = p_owner_id
+           AND (v_keep_from IS NULL OR seq < v_keep_from)
+        RETURNING seq
+    )
+    SELECT COUNT(*), MAX(seq) INTO v_expired, v_floor FROM expired;
+
+    IF v_floor IS NOT NULL THEN
+        UPDATE users
+           SET change_floor = GREATEST(change_floor, v_floor)
+         WHERE user_id = p_owner_id;
+    END IF;
+
+    RETURN v_superseded + v_expired;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,63 @@
+"""
+Notifications package.
+
+Server push for file changes.  Each API worker holds one Postgres
+``LISTEN`` connection; ``fn_log_file_changes`` sends ``NOTIFY file_changes``
+with ``'<owner_id>:<seq>'`` as each change commits, so every worker sees
+every change no matter which worker made it.  Open event streams subscribe
+per owner and are woken with the owner's newest change-log cursor.  The
+same connection listens on ``user_changes`` for the principal cache and
+the ``valid_since`` table of the sessions package.
+
+Submodules:
+    _hub.py:          The shared LISTEN connection, with reconnect.
+    _file_events.py:  Per-owner, per-stream subscriptions to file changes.
+
+Configuration (environment):
+    FILE_EVENTS_MAX_STREAMS_PER_USER:  Open streams allowed per user and
+                                       worker (default 10).
+"""
+
+import os
+
+from ..principals import USER_CHANGES_CHANNEL, PrincipalCache
+from ..sessions import valid_since_table
+from ._hub import Connector, NotificationHub
+from ._file_events import (
+    FILE_CHANGES_CHANNEL,
+    FileEventBroker,
+    FileEventSubscription,
+    TooManySubscriptionsError,
+)
+
+
+def start_notifications(
+    connect: Connector, principals: PrincipalCache
+) -> tuple[NotificationHub, FileEventBroker]:
+    """Start this worker's notification hub and return it with its file-event broker.
+
+    *connect* opens the hub's dedicated LISTEN connection; it is called again
+    to reconnect.  *principals* is invalidated from ``user_changes``, which
+    also keeps the sessions package's ``valid_since`` table current.
+    """
+    broker = FileEventBroker(
+        max_per_owner=int(os.getenv("FILE_EVENTS_MAX_STREAMS_PER_USER", "10"))
+    )
+    hub = NotificationHub(connect)
+    hub.add_handler(FILE_CHANGES_CHANNEL, broker.handle_notification)
+    hub.on_reconnect(broker.handle_reconnect)
+    hub.add_handler(USER_CHANGES_CHANNEL, principals.handle_notification)
+    hub.on_reconnect(principals.handle_reconnect)
+    hub.add_handler(USER_CHANGES_CHANNEL, valid_since_table.handle_notification)
+    hub.on_listen(valid_since_table.refresh)
+    hub.start()
+    return hub, broker
+
+
+__all__ = [
+    "NotificationHub",
+    "FileEventBroker",
+    "FileEventSubscription",
+    "TooManySubscriptionsError",
+    "start_notifications",
+]
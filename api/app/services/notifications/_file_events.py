@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from uuid import UUID
+
+
+logger = logging.getLogger(__name__)
+
+# Channel written by fn_log_file_changes; payload is '<owner_id>:<seq>'.
+FILE_CHANGES_CHANNEL = "file_changes"
+
+
+class TooManySubscriptionsError(Exception):
+    """Raised when an owner already has the maximum number of open streams."""
+
+
+class FileEventSubscription:
+    """One client's view of its owner's change-log head.
+
+    Pending notifications are *coalesced*: only the newest cursor is kept, so
+    a subscription holds constant state no matter how many changes happen
+    while its client is slow to read.  Clients fetch the actual changes
+    through ``GET /files/changes``, so nothing is lost by skipping
+    intermediate cursors.
+    """
+
+    def __init__(self, owner_id: UUID) -> None:
+        self.owner_id = owner_id
+        self._cursor = 0
+        self._resync = False
+        self._pending = asyncio.Event()
+
+    def _push(self, cursor: int) -> None:
+        if cursor > self._cursor:
+            self._cursor = cursor
+            self._pending.set()
+
+    def _mark_resync(self) -> None:
+        self._resync = True
+        self._pending.set()
+
+    async def wait(self, timeout: float) -> tuple[int, bool] | None:
+        """Wait up to *timeout* seconds for news.
+
+        Returns:
+            ``(cursor, resync)`` once something happened, where ``resync``
+            means notifications may have been missed and the client should
+            poll the change feed regardless of *cursor*; ``None`` on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._pending.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._pending.clear()
+        resync, self._resync = self._resync, False
+        return self._cursor, resync
+
+
+class FileEventBroker:
+    """Fan out ``file_changes`` notifications to this worker's subscriptions."""
+
+    def __init__(self, *, max_per_owner: int) -> None:
+        self._max_per_owner = max_per_owner
+        self._subscriptions: dict[UUID, set[FileEventSubscription]] = {}
+
+    def can_subscribe(self, owner_id: UUID) -> bool:
+        """Whether :meth:`subscribe` would currently accept *owner_id*."""
+        return len(self._subscriptions.get(owner_id, ())) < self._max_per_owner
+
+    def subscribe(self, owner_id: UUID) -> FileEventSubscription:
+        """Open a subscription to *owner_id*'s changes.
+
+        Raises:
+            TooManySubscriptionsError: If the owner already has
+                ``max_per_owner`` subscriptions on this worker.
+        """
+        if not self.can_subscribe(owner_id):
+            raise TooManySubscriptionsError(owner_id)
+        subs = self._subscriptions.setdefault(owner_id, set())
+        sub = FileEventSubscription(owner_id)
+        subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: FileEventSubscription) -> None:
+        subs = self._subscriptions.get(sub.owner_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subscriptions[sub.owner_id]
+
+    def handle_notification(self, payload: str) -> None:
+        owner, _, seq = payload.partition(":")
+        try:
+            owner_id, cursor = UUID(owner), int(seq)
+        except ValueError:
+            logger.warning("malformed %s payload: %r", FILE_CHANGES_CHANNEL, payload)
+            return
+        for sub in self._subscriptions.get(owner_id, ()):
+            sub._push(cursor)
+
+    def handle_reconnect(self) -> None:
+        for subs in self._subscriptions.values():
+            for sub in subs:
+                sub._mark_resync()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from asyncpg import Connection
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between liveness probes on the LISTEN connection, and the bounds
+# of the reconnect back-off after it is lost.
+_PROBE_INTERVAL = 15.0
+_RECONNECT_MIN = 0.5
+_RECONNECT_MAX = 30.0
+
+Connector = Callable[[], Awaitable[Connection]]
+NotificationHandler = Callable[[str], None]
+ReconnectHandler = Callable[[], None]
+ListenHandler = Callable[[Connection], Awaitable[None]]
+
+
+class NotificationHub:
+    """One Postgres ``LISTEN`` connection per worker, shared by every consumer.
+
+    The connection is opened with *connect* rather than taken from the pool:
+    it lives as long as the worker and must not be handed to other queries.
+
+    Handlers are plain (non-async) callables invoked on the event loop for
+    every payload received on their channel; they must not block.  If the
+    connection is lost, notifications sent while reconnecting are gone for
+    good, so every ``on_reconnect`` handler is called once listening resumes
+    and consumers can tell their clients to catch up from durable state.
+    """
+
+    def __init__(self, connect: Connector) -> None:
+        self._connect = connect
+        self._handlers: dict[str, list[NotificationHandler]] = {}
+        self._reconnect_handlers: list[ReconnectHandler] = []
+        self._listen_handlers: list[ListenHandler] = []
+        self._task: asyncio.Task | None = None
+        self._listened = False
+        self._delay = _RECONNECT_MIN
+
+    def add_handler(self, channel: str, handler: NotificationHandler) -> None:
+        """Call *handler* with the payload of every notification on *channel*.
+
+        Must be called before :meth:`start`.
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler: ReconnectHandler) -> None:
+        """Call *handler* after listening resumes on a new connection."""
+        self._reconnect_handlers.append(handler)
+
+    def on_listen(self, handler: ListenHandler) -> None:
+        """Await *handler* with the LISTEN connection each time listening
+        starts, the first time included.
+
+        For consumers that load durable state once notifications can no
+        longer be missed.  The handler may query the connection but must
+        not keep it; a failing handler is logged and does not stop the hub.
+        """
+        self._listen_handlers.append(handler)
+
+    def start(self) -> asyncio.Task:
+        """Start listening in a background task and return it."""
+        self._task = asyncio.create_task(self._run(), name="notification-hub")
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ------------------------------------------------------------------
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("notification handler failed on %s", channel)
+
+    def _on_notification(self, _conn: Connection, _pid: int, channel: str, payload: str) -> None:
+        self._dispatch(channel, payload)
+
+    async def _listen(self) -> None:
+        conn = await self._connect()
+        try:
+            for channel in self._handlers:
+                await conn.add_listener(channel, self._on_notification)
+            self._delay = _RECONNECT_MIN
+            if self._listened:
+                for handler in self._reconnect_handlers:
+                    handler()
+            self._listened = True
+            for listen in self._listen_handlers:
+                try:
+                    await listen(conn)
+                except Exception:
+                    logger.exception("listen handler failed")
+            # asyncpg delivers notifications from its protocol callbacks;
+            # this loop only has to notice when the connection goes away.
+            while True:
+                await asyncio.sleep(_PROBE_INTERVAL)
+                await conn.execute("SELECT 1")
+        finally:
+            conn.terminate()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("notification listener lost; reconnecting in %.1fs", self._delay)
+                await asyncio.sleep(self._delay)
+                self._delay = min(self._delay * 2, _RECONNECT_MAX)
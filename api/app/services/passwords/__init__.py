@@ -0,0 +1,37 @@
+"""
+Passwords package.
+
+bcrypt hashing and verification off the event loop.  One bcrypt call is
+about 250 ms of CPU; run inline in a route it stalls every other request
+on the worker.  Each API worker owns a small process pool for it, behind
+a bounded queue, so a login flood is shed with 503s instead of queueing.
+
+Submodules:
+    _hasher.py:     The process pool and its admission limit.
+    exceptions.py:  PasswordHasherBusyError.
+
+Configuration (environment):
+    PASSWORD_HASH_WORKERS:      Hashing processes per API worker (default 2).
+    PASSWORD_HASH_QUEUE_LIMIT:  Calls allowed to wait for a free process
+                                (default 16); further calls are shed.
+"""
+
+import os
+
+from ._hasher import PasswordHasher
+from .exceptions import PasswordHasherBusyError
+
+
+def start_password_hasher() -> PasswordHasher:
+    """Create this worker's password hasher from the environment."""
+    return PasswordHasher(
+        workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+        queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "16")),
+    )
+
+
+__all__ = [
+    "PasswordHasher",
+    "PasswordHasherBusyError",
+    "start_password_hasher",
+]
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+from .exceptions import PasswordHasherBusyError
+
+
+logger = logging.getLogger(__name__)
+
+# Built on import, i.e. once in every pool process.
+_password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# The hash of a random password nobody knows, at the context's default cost.
+# Checking a password for an account that does not exist verifies against
+# it, so that takes as long as checking one for an account that does.
+_DUMMY_HASH = "$2b$12$.M1ESdrpUGcntJnPKzs1/.NNX1bwxMpkd47TI9ZB4SdqUtB7E9sMC"
+
+
+def _hash(password: str) -> str:
+    return _password_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return _password_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification in a process pool, with load shedding.
+
+    At most *workers* calls run at once, each in its own process, so a
+    burst of logins costs the event loop nothing and cannot take more than
+    *workers* cores from the API worker.  Up to *queue_limit* further calls
+    wait for a free process; past that, calls fail immediately with
+    :class:`PasswordHasherBusyError` rather than queueing behind a flood
+    they would time out in anyway.
+
+    A call stops counting against the limit when its process finishes, or
+    when it is cancelled before a process picked it up.  If a pool process
+    dies, the pool is replaced: the calls it had in flight fail with
+    ``BrokenProcessPool``, later ones run in the new pool.
+    """
+
+    def __init__(self, *, workers: int, queue_limit: int) -> None:
+        if workers < 1:
+            raise ValueError("PASSWORD_HASH_WORKERS must be at least 1.")
+        if queue_limit < 0:
+            raise ValueError("PASSWORD_HASH_QUEUE_LIMIT must not be negative.")
+        self._workers = workers
+        self._limit = workers + queue_limit
+        self._pending = 0
+        self._executor = self._start_executor()
+
+    @property
+    def pending(self) -> int:
+        """Calls running or waiting for a process."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Return the bcrypt hash of *password*.
+
+        Raises:
+            PasswordHasherBusyError: The queue is full.
+        """
+        return await self._submit(_hash, password)
+
+    async def verify(self, *, plain_password: str, hashed_password: str | None) -> bool:
+        """Check *plain_password* against a stored bcrypt hash.
+
+        Pass ``None`` for an account that does not exist: the check still
+        costs a full bcrypt verification, so response times do not tell
+        which accounts exist, and always fails.
+
+        Raises:
+            PasswordHasherBusyError: The queue is full.
+        """
+        if hashed_password is None:
+            await self._submit(_verify, plain_password, _DUMMY_HASH)
+            return False
+        return await self._submit(_verify, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Drop queued calls and stop the pool processes once idle."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        # The API worker has an event loop and threads running, which fork()
+        # would copy mid-flight; forkserver children start from a clean image.
+        return ProcessPoolExecutor(
+            max_workers=self._workers, mp_context=multiprocessing.get_context("forkserver")
+        )
+
+    def _replace_broken(self, executor: ProcessPoolExecutor) -> None:
+        # Every call that was in flight sees the same broken pool; only the
+        # first replaces it.
+        if self._executor is executor:
+            logger.warning("password hashing pool broke; starting a new one")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start_executor()
+
+    def _release(self, _future: Future) -> None:
+        self._pending -= 1
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self._limit:
+            raise PasswordHasherBusyError(
+                f"{self._pending} password hashing calls already pending."
+            )
+        loop = asyncio.get_running_loop()
+        executor = self._executor
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Broke since the last call finished; nothing ran yet.
+            self._replace_broken(executor)
+            executor = self._executor
+            future = executor.submit(fn, *args)
+        self._pending += 1
+        # Done callbacks run on the executor's management thread.
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self._release, f))
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            raise
@@ -0,0 +1,5 @@
+"""Exceptions for the passwords service"""
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when the hashing queue is full and a call is shed."""
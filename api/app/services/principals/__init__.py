@@ -0,0 +1,40 @@
+"""
+Principals package.
+
+An in-process cache of authenticated users, so a request with a valid
+access token does not have to read its user's row.  ``fn_users_notify_change``
+sends ``NOTIFY user_changes`` naming the user whenever one of the columns a
+principal is built from changes, or the user is deleted; every worker's
+notification hub passes it on, and the entry is dropped.  The file counters
+(``storage_used``, ``file_count``) change with every upload and delete and
+do not notify, so cached principals carry them as loaded and ``/auth/me``
+reads them fresh.  Entries also expire after a TTL, which bounds staleness
+if a notification is ever lost.
+
+Submodules:
+    _cache.py:  The TTL / LRU cache and its notification handlers.
+
+Configuration (environment):
+    PRINCIPAL_CACHE_TTL_SECONDS:  Seconds an entry is served (default 60).
+    PRINCIPAL_CACHE_SIZE:         Entries kept per worker (default 10000);
+                                  0 disables the cache.
+"""
+
+import os
+
+from ._cache import USER_CHANGES_CHANNEL, PrincipalCache
+
+
+def create_principal_cache() -> PrincipalCache:
+    """Create this worker's principal cache from the environment."""
+    return PrincipalCache(
+        ttl=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+        max_entries=int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000")),
+    )
+
+
+__all__ = [
+    "USER_CHANGES_CHANNEL",
+    "PrincipalCache",
+    "create_principal_cache",
+]
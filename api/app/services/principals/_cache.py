@@ -0,0 +1,104 @@
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from ...models.user import UserResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Channel written by fn_users_notify_change; payload is
+# '<user_id>:<valid_since epoch seconds>'.
+USER_CHANGES_CHANNEL = "user_changes"
+
+
+class PrincipalCache:
+    """This worker's authenticated principals, by user id.
+
+    Entries are dropped when a ``user_changes`` notification names their
+    user, and expire after *ttl* seconds regardless, which bounds how stale
+    an entry can get if a notification is lost.  All entries are dropped
+    when the notification hub reconnects, since notifications sent while it
+    was away are gone.  At most *max_entries* are kept, least recently
+    used first out.
+
+    A load racing an invalidation of the same user is returned to its
+    caller but not stored, so a row read before a change cannot outlive
+    the change's notification.
+    """
+
+    def __init__(self, *, ttl: float, max_entries: int) -> None:
+        if ttl < 0:
+            raise ValueError("PRINCIPAL_CACHE_TTL_SECONDS must not be negative.")
+        if max_entries < 0:
+            raise ValueError("PRINCIPAL_CACHE_SIZE must not be negative.")
+        self._ttl = ttl
+        self._max_entries = max_entries
+        # user_id -> (expires_at on the monotonic clock, principal)
+        self._entries: OrderedDict[UUID, tuple[float, UserResponse]] = OrderedDict()
+        # Loads in flight per user, and users invalidated during one.
+        self._loading: dict[UUID, int] = {}
+        self._stale: set[UUID] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_load(
+        self, user_id: UUID, load: Callable[[], Awaitable[UserResponse]]
+    ) -> UserResponse:
+        """Return *user_id*'s cached principal, or await *load* and cache it.
+
+        Exceptions from *load* propagate and nothing is cached.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            del self._entries[user_id]
+        self.misses += 1
+
+        self._loading[user_id] = self._loading.get(user_id, 0) + 1
+        try:
+            principal = await load()
+        finally:
+            remaining = self._loading.pop(user_id) - 1
+            if remaining:
+                self._loading[user_id] = remaining
+            stale = user_id in self._stale
+            if not remaining:
+                self._stale.discard(user_id)
+
+        if not stale and self._max_entries:
+            self._entries[user_id] = (time.monotonic() + self._ttl, principal)
+            self._entries.move_to_end(user_id)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop *user_id*'s entry, and keep loads in flight from storing one."""
+        self._entries.pop(user_id, None)
+        if user_id in self._loading:
+            self._stale.add(user_id)
+
+    def clear(self) -> None:
+        """Drop every entry, as :meth:`invalidate` does for one."""
+        self._entries.clear()
+        self._stale.update(self._loading)
+
+    def handle_notification(self, payload: str) -> None:
+        try:
+            user_id = UUID(payload.partition(":")[0])
+        except ValueError:
+            logger.warning("malformed %s payload: %r", USER_CHANGES_CHANNEL, payload)
+            return
+        self.invalidate(user_id)
+
+    def handle_reconnect(self) -> None:
+        self.clear()
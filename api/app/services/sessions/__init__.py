@@ -0,0 +1,59 @@
+"""
+Sessions package.
+
+Per-worker state for checking access tokens cheaply.
+
+Enforcement of ``users.valid_since`` ("log out everywhere", deactivation)
+without a query per request.  Each worker keeps the ``valid_since`` of
+recently changed users in memory: loaded from ``users`` when the
+notification hub starts listening, then kept current by the
+``user_changes`` notifications, which carry the new value.  Decoding a
+token checks its ``iat`` against the table.
+
+Verified tokens are cached, so a token sent with every call of a page
+load has its signature checked once.  Each worker logs the cache's hits,
+misses and size periodically, and once more at shutdown.
+
+Both are module-level singletons, one per worker process, because tokens
+are decoded in plain functions with no access to the app.
+
+Submodules:
+    _valid_since.py:   The per-worker user_id -> valid_since table.
+    _token_cache.py:   LRU of verified token digests -> claims.
+    _stats.py:         Periodic logging of the cache's counters.
+
+Configuration (environment):
+    ACCESS_TOKEN_EXPIRE_MINUTES:  Access-token lifetime (default 60), shared
+                                  with token issuance; older changes are
+                                  not kept.
+    JWT_CACHE_SIZE:               Verified tokens cached per worker
+                                  (default 4096); 0 disables the cache.
+    JWT_CACHE_STATS_INTERVAL_SECONDS:
+                                  Seconds between cache stats log lines
+                                  (default 300); 0 disables them.
+"""
+
+import os
+from datetime import timedelta
+
+from ._stats import start_token_cache_stats
+from ._token_cache import VerifiedTokenCache
+from ._valid_since import ValidSinceTable
+
+
+valid_since_table = ValidSinceTable(
+    horizon=timedelta(minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")))
+)
+
+verified_tokens = VerifiedTokenCache(
+    max_entries=int(os.getenv("JWT_CACHE_SIZE", "4096"))
+)
+
+
+__all__ = [
+    "ValidSinceTable",
+    "VerifiedTokenCache",
+    "start_token_cache_stats",
+    "valid_since_table",
+    "verified_tokens",
+]
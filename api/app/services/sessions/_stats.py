@@ -0,0 +1,27 @@
+import os
+import asyncio
+import logging
+
+from ._token_cache import VerifiedTokenCache
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _loop(cache: VerifiedTokenCache, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("verified-token cache: %s", cache.stats())
+
+
+def start_token_cache_stats(cache: VerifiedTokenCache) -> asyncio.Task | None:
+    """Log *cache*'s hits, misses and size periodically on the running event loop.
+
+    The interval is ``JWT_CACHE_STATS_INTERVAL_SECONDS``; ``0`` starts
+    nothing and returns ``None``.  Otherwise the caller owns the returned
+    task and should cancel it on shutdown.
+    """
+    interval = float(os.getenv("JWT_CACHE_STATS_INTERVAL_SECONDS", "300"))
+    if interval <= 0:
+        return None
+    return asyncio.create_task(_loop(cache, interval), name="token-cache-stats")
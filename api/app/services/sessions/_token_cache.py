@@ -0,0 +1,58 @@
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Callable
+
+
+class VerifiedTokenCache:
+    """Claims of recently verified access tokens, keyed by SHA-256 of the token.
+
+    Verifying a JWT is an HMAC over the token plus base64 and JSON decoding;
+    a page load sends the same token with every API call, and one request
+    may decode it more than once.  A hit costs one SHA-256 and a dict
+    probe.  Only successfully verified tokens are cached, hits are checked
+    against ``exp`` so an expired token is never served, and at most
+    *max_entries* tokens are kept, least recently used first out.  The
+    digest, not the token, is kept, so the cache holds no bearer secrets.
+
+    Revocation (``valid_since``) is not cached: callers check it on every
+    use.  Claims are shared between hits and must not be modified.  Not
+    thread-safe; use it from the event loop.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        if max_entries < 0:
+            raise ValueError("JWT_CACHE_SIZE must not be negative.")
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_verify(self, token: str, verify: Callable[[str], dict]) -> dict:
+        """Return *token*'s claims, from the cache or by calling *verify*.
+
+        Exceptions from *verify* propagate and nothing is cached.
+        """
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self._entries.get(key)
+        if claims is not None:
+            if claims["exp"] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self._entries[key]
+        self.misses += 1
+
+        claims = verify(token)
+        if self._max_entries:
+            self._entries[key] = claims
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return claims
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counts since startup, and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
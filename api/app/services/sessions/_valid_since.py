@@ -0,0 +1,78 @@
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+
+from asyncpg import Connection
+
+from ...database.user import list_valid_since
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps of entries older than the horizon.
+_PRUNE_INTERVAL = 60.0
+
+
+class ValidSinceTable:
+    """This worker's ``user_id -> valid_since``, for revoking access tokens.
+
+    A token is revoked when it was issued (``iat``) before its user's
+    ``valid_since``.  Only users whose ``valid_since`` lies within *horizon*
+    (the access-token lifetime) are kept: every token issued before an
+    older ``valid_since`` has expired anyway.  So the table holds the users
+    who recently logged out everywhere or were (de)activated, not every
+    user, and a lookup is one dict probe keyed by the token's ``sub``.
+
+    Kept current by ``user_changes`` notifications and reloaded from
+    ``users`` whenever the notification hub starts listening.
+    """
+
+    def __init__(self, *, horizon: timedelta) -> None:
+        self._horizon = horizon.total_seconds()
+        # str(user_id), as in the token's "sub" -> epoch seconds.
+        self._valid_since: dict[str, float] = {}
+        self._pruned_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._valid_since)
+
+    def is_revoked(self, user_id: str, issued_at: float) -> bool:
+        """Whether a token for *user_id* issued at *issued_at* (epoch seconds) is revoked."""
+        valid_since = self._valid_since.get(user_id)
+        return valid_since is not None and issued_at < valid_since
+
+    def update(self, user_id: str, valid_since: float) -> None:
+        """Record *user_id*'s ``valid_since`` (epoch seconds); it only moves forward."""
+        if (
+            valid_since > time.time() - self._horizon
+            and valid_since > self._valid_since.get(user_id, 0.0)
+        ):
+            self._valid_since[user_id] = valid_since
+        if time.monotonic() - self._pruned_at > _PRUNE_INTERVAL:
+            self._prune()
+
+    async def refresh(self, conn: Connection) -> None:
+        """Load every ``valid_since`` within the horizon from ``users``.
+
+        Also a NotificationHub listen handler: run on the LISTEN connection,
+        it cannot miss a change committed after its snapshot.
+        """
+        since = datetime.now(timezone.utc) - timedelta(seconds=self._horizon)
+        rows = await list_valid_since(conn=conn, since=since)
+        for user_id, valid_since in rows.items():
+            self.update(str(user_id), valid_since.timestamp())
+        self._prune()
+
+    def handle_notification(self, payload: str) -> None:
+        user, _, epoch = payload.partition(":")
+        try:
+            valid_since = float(epoch)
+        except ValueError:
+            logger.warning("malformed user_changes payload: %r", payload)
+            return
+        self.update(user, valid_since)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._horizon
+        self._valid_since = {u: v for u, v in self._valid_since.items() if v > cutoff}
+        self._pruned_at = time.monotonic()
@@ -0,0 +1,16 @@
+"""Fixtures shared by the benchmarks."""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+async def loop() -> asyncio.AbstractEventLoop:
+    """The session's event loop, for benchmarks of async code.
+
+    pytest-benchmark times synchronous callables, so a benchmark of a
+    coroutine runs it with ``loop.run_until_complete``; the loop is idle
+    while a synchronous test runs.
+    """
+    return asyncio.get_running_loop()
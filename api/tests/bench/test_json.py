@@ -0,0 +1,52 @@
+"""Benchmarks of encoding a 1000-item ``GET /files`` page.
+
+Compares FastAPI's default path (``jsonable_encoder`` then ``JSONResponse``)
+with :class:`ORJSONResponse`, which the files router uses, and with the
+chunked writer that streams large pages.  All three encode the same
+``_serialize`` output built from seeded rows.
+"""
+
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.file import File
+from app.routes._json import ORJSONResponse, iter_json_object
+from app.routes.files import _serialize
+
+pytestmark = pytest.mark.bench
+
+
+@pytest.fixture
+async def page(conn, seed):
+    rows = await conn.fetch("SELECT * FROM v_files WHERE owner_id = $1 LIMIT 1000", seed.owner_id)
+    items = [_serialize(f) for f in File.from_rows(rows)]
+    rest = {"total_count": 1000, "limit": 1000, "offset": 0, "has_more": False, "next_after": None}
+    return items, rest
+
+
+def _default_encoder(items, rest):
+    return JSONResponse(jsonable_encoder({"items": items, **rest})).body
+
+
+def _orjson(items, rest):
+    return ORJSONResponse({"items": items, **rest}).body
+
+
+def _streamed(items, rest):
+    return b"".join(iter_json_object("items", items, rest))
+
+
+def test_encoders_agree(page):
+    bodies = [encode(*page) for encode in (_default_encoder, _orjson, _streamed)]
+    assert json.loads(bodies[0]) == json.loads(bodies[1])
+    assert bodies[1] == bodies[2]
+
+
+@pytest.mark.parametrize(
+    "encode", [_default_encoder, _orjson, _streamed], ids=["default", "orjson", "streamed"]
+)
+def test_encode_page(benchmark, page, encode):
+    benchmark(encode, *page)
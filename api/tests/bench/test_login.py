@@ -0,0 +1,137 @@
+"""Benchmarks of ``POST /auth/login`` under a burst of concurrent logins.
+
+Each round sends a burst of logins for one account through an in-process
+ASGI client while a probe measures event-loop lag: the delay past a 10 ms
+sleep plus a trivial ``GET``.  The time reported is the whole burst's;
+``extra_info`` holds the status codes and the login and lag percentiles
+of the last round.
+
+``inline`` verifies the password on the event loop, as the route did
+before the process pool, and is the baseline.  ``pool`` uses
+:class:`PasswordHasher` with its default limits; a burst larger than its
+processes plus queue is partly shed with 503s.
+"""
+
+import asyncio
+import time
+from collections import Counter
+
+import asyncpg
+import httpx
+import pytest
+from fastapi import FastAPI
+from passlib.context import CryptContext
+
+from app.routes.auth import router as auth_router
+from app.services.passwords import PasswordHasher
+
+pytestmark = pytest.mark.bench
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "correct horse battery staple"
+
+_password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class InlineHasher:
+    """bcrypt on the event loop, as the routes called it before."""
+
+    async def verify(self, *, plain_password: str, hashed_password: str) -> bool:
+        return _password_context.verify(plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+@pytest.fixture
+async def account(database):
+    # Committed, since the app reads it through its own pool.
+    conn = await asyncpg.connect(**database["settings"])
+    try:
+        await conn.execute(
+            """
+            INSERT INTO users (user_id, email, password_hash, name, verified)
+            VALUES (gen_random_uuid(), $1, $2, 'Bench', TRUE)
+            """,
+            EMAIL,
+            _password_context.hash(PASSWORD),
+        )
+        yield
+        await conn.execute("DELETE FROM users WHERE email = $1", EMAIL)
+    finally:
+        await conn.close()
+
+
+@pytest.fixture(params=["inline", "pool"])
+async def client(request, database, account, monkeypatch):
+    # The signing key is read on import; set one in case JWT_SECRET_KEY is not.
+    monkeypatch.setattr("app.routes.auth.utils._SECRET_KEY", "bench-" + "x" * 40)
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api/v1")
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    app.state.pool = await asyncpg.create_pool(**database["settings"], min_size=5, max_size=20)
+    if request.param == "pool":
+        app.state.passwords = PasswordHasher(workers=2, queue_limit=16)
+    else:
+        app.state.passwords = InlineHasher()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Start the pool's processes before anything is timed.
+            await asyncio.gather(*(_login(client) for _ in range(2)))
+            yield client
+    finally:
+        app.state.passwords.shutdown()
+        await app.state.pool.close()
+
+
+async def _login(client):
+    return await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+
+
+async def _burst(client, logins):
+    login_latency, lag, codes = [], [], Counter()
+
+    async def login():
+        start = time.perf_counter()
+        response = await _login(client)
+        login_latency.append(time.perf_counter() - start)
+        codes[response.status_code] += 1
+
+    async def probe():
+        while len(login_latency) < logins:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            await client.get("/ping")
+            lag.append(time.perf_counter() - start - 0.01)
+
+    await asyncio.gather(probe(), *(login() for _ in range(logins)))
+    return {
+        "codes": dict(codes),
+        "login_p50_ms": round(_percentile(login_latency, 0.5) * 1000),
+        "login_p99_ms": round(_percentile(login_latency, 0.99) * 1000),
+        "lag_p50_ms": round(_percentile(lag, 0.5) * 1000, 1),
+        "lag_max_ms": round(max(lag) * 1000, 1),
+    }
+
+
+@pytest.mark.parametrize("logins", [16, 64])
+def test_login_burst(benchmark, loop, client, logins):
+    # The inline baseline takes about a quarter second per login.
+    rounds = 1 if logins > 16 else 3
+    result = benchmark.pedantic(
+        lambda: loop.run_until_complete(_burst(client, logins)), rounds=rounds
+    )
+    benchmark.extra_info.update(result)
+    assert set(result["codes"]) <= {200, 503}
+    assert result["codes"].get(200)
@@ -0,0 +1,89 @@
+"""Benchmarks of validating the file, user and refresh-token models from input."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.models.file import File, FileCreate
+from app.models.token import RefreshToken, RefreshTokenCreate
+from app.models.user import User, UserRegister
+
+pytestmark = pytest.mark.bench
+
+SHA256 = "AbCdEf0123456789" * 4
+NOW = datetime.now(timezone.utc)
+
+FILE = {
+    "file_id": uuid4(),
+    "owner_id": uuid4(),
+    "bucket": "user-files",
+    "folder_id": uuid4(),
+    "folder": "/docs/reports",
+    "object_key": "objects/a.pdf",
+    "original_name": "a.pdf",
+    "current_name": "a.pdf",
+    "mime_type": "application/pdf",
+    "size_bytes": 1234,
+    "sha256_hex": SHA256,
+    "created_at": NOW,
+    "updated_at": None,
+}
+FILE_CREATE = {
+    "owner_id": uuid4(),
+    "bucket": "user-files",
+    "folder": "/docs/reports",
+    "name": "a.pdf",
+    "mime_type": "application/pdf",
+    "size_bytes": 1234,
+    "sha256_hex": SHA256,
+}
+USER = {
+    "user_id": uuid4(),
+    "email": "Some.One@Example.com",
+    "password_hash": SHA256,
+    "name": "Some One",
+    "created_at": NOW,
+    "updated_at": None,
+    "last_login": NOW,
+    "storage_used": 0,
+    "storage_quota": 10 * 2**30,
+    "verification_version": 0,
+    "verified": True,
+    "valid_since": NOW,
+    "is_active": True,
+}
+USER_REGISTER = {"name": "Some One", "email": "Some.One@Example.com", "password": "correct horse"}
+REFRESH_TOKEN = {
+    "token_id": uuid4(),
+    "user_id": uuid4(),
+    "token_hash": SHA256,
+    "issued_at": NOW,
+    "expires_at": NOW + timedelta(days=7),
+    "family_id": uuid4(),
+    "device_info": "Firefox on Linux",
+    "ip_address": "203.0.113.7",
+}
+REFRESH_TOKEN_CREATE = {
+    "user_id": uuid4(),
+    "token_hash": SHA256,
+    "family_id": uuid4(),
+    "device_info": "Firefox on Linux",
+    "ip_address": "203.0.113.7",
+}
+
+
+@pytest.mark.parametrize(
+    ("model", "data"),
+    [
+        (File, FILE),
+        (FileCreate, FILE_CREATE),
+        (User, USER),
+        (UserRegister, USER_REGISTER),
+        (RefreshToken, REFRESH_TOKEN),
+        (RefreshTokenCreate, REFRESH_TOKEN_CREATE),
+    ],
+    ids=["File", "FileCreate", "User", "UserRegister", "RefreshToken", "RefreshTokenCreate"],
+)
+def test_model_validate(benchmark, model, data):
+    benchmark(model.model_validate, data)
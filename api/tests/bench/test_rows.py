@@ -0,0 +1,52 @@
+"""Benchmarks of building models from database rows: ``from_rows`` against validation.
+
+Rows are 1000 records fetched from the seeded test database, so both paths
+see the asyncpg types the data-access layer gets.  The validating path
+applies the same column conversions first, so the difference is the cost
+of validation alone.
+"""
+
+import pytest
+
+from app.models.file import File
+from app.models.folder import Folder
+
+pytestmark = pytest.mark.bench
+
+
+def _validate_rows(model, rows):
+    converters = model._row_converters.items()
+    out = []
+    for row in rows:
+        values = dict(row)
+        for name, convert in converters:
+            if values[name] is not None:
+                values[name] = convert(values[name])
+        out.append(model.model_validate(values))
+    return out
+
+
+@pytest.fixture
+async def file_rows(conn, seed):
+    return await conn.fetch("SELECT * FROM v_files WHERE owner_id = $1 LIMIT 1000", seed.owner_id)
+
+
+@pytest.fixture
+async def folder_rows(conn):
+    return await conn.fetch("SELECT * FROM folders LIMIT 1000")
+
+
+def test_file_from_rows(benchmark, file_rows):
+    assert len(benchmark(File.from_rows, file_rows)) == 1000
+
+
+def test_file_model_validate(benchmark, file_rows):
+    assert len(benchmark(_validate_rows, File, file_rows)) == 1000
+
+
+def test_folder_from_rows(benchmark, folder_rows):
+    assert len(benchmark(Folder.from_rows, folder_rows)) == 1000
+
+
+def test_folder_model_validate(benchmark, folder_rows):
+    assert len(benchmark(_validate_rows, Folder, folder_rows)) == 1000
@@ -0,0 +1,36 @@
+"""Benchmarks of the shared field validators in ``app.models.types``."""
+
+from pathlib import PurePosixPath
+
+import pytest
+
+from app.models import types
+
+pytestmark = pytest.mark.bench
+
+SHA256 = "AbCdEf0123456789" * 4
+
+
+@pytest.mark.parametrize(
+    ("validator", "value"),
+    [
+        (types._validate_hex, SHA256),
+        (types._validate_email, "Some.One@Example.com"),
+        (types._validate_bucket_name, "user-files"),
+        (types._validate_mime, "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+        (types._validate_logical_path, PurePosixPath("/docs/reports/2024")),
+    ],
+    ids=["hex", "email", "bucket", "mime", "path"],
+)
+def test_validator(benchmark, validator, value):
+    benchmark(validator, value)
+
+
+def test_validate_many_sha256(benchmark):
+    values = [SHA256] * 1000
+    assert len(benchmark(types.validate_many, types.SHA256Hex, values)) == 1000
+
+
+def test_validate_many_paths(benchmark):
+    values = [f"/docs/reports/{n}" for n in range(1000)]
+    assert len(benchmark(types.validate_many, types.LogicalPath, values)) == 1000
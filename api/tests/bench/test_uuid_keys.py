@@ -0,0 +1,72 @@
+"""Benchmarks of random (v4) against time-ordered (v7) UUID primary keys.
+
+The insert benchmark loads the same number of pre-generated ids, in
+batches, into a fresh table keyed by ``uuid``, so only the index
+maintenance differs between the two.  Each result records the size of the
+primary key index and the WAL written in ``extra_info``.  The generator
+benchmarks time the id functions themselves: ``uuid.uuid4``/``uuid7`` for
+files and users, ``gen_random_uuid()``/``fn_uuid7()`` for the column
+defaults.
+"""
+
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.bench
+
+ROWS = 200_000
+BATCH = 10_000
+GENERATED = 100_000
+
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid.uuid7}
+SQL_GENERATORS = {"v4": "gen_random_uuid()", "v7": "fn_uuid7()"}
+
+
+async def _create_table(conn):
+    await conn.execute("DROP TABLE IF EXISTS bench_keys")
+    await conn.execute("CREATE TABLE bench_keys (id UUID PRIMARY KEY, owner_id UUID, pad TEXT)")
+
+
+async def _insert(conn, owner_id, ids):
+    lsn = await conn.fetchval("SELECT pg_current_wal_insert_lsn()")
+    for start in range(0, len(ids), BATCH):
+        await conn.execute(
+            "INSERT INTO bench_keys SELECT id, $2, repeat('x', 100) FROM unnest($1::uuid[]) AS id",
+            ids[start:start + BATCH],
+            owner_id,
+        )
+    return await conn.fetchrow(
+        """
+        SELECT pg_relation_size('bench_keys_pkey') AS pkey_bytes,
+               pg_wal_lsn_diff(pg_current_wal_insert_lsn(), $1)::BIGINT AS wal_bytes
+        """,
+        lsn,
+    )
+
+
+@pytest.mark.parametrize("version", GENERATORS)
+def test_insert_keys(benchmark, loop, conn, seed, version):
+    ids = [GENERATORS[version]() for _ in range(ROWS)]
+
+    def run():
+        return loop.run_until_complete(_insert(conn, seed.owner_id, ids))
+
+    sizes = benchmark.pedantic(
+        run, setup=lambda: loop.run_until_complete(_create_table(conn)), rounds=5
+    )
+    benchmark.extra_info.update(sizes)
+    assert loop.run_until_complete(conn.fetchval("SELECT count(*) FROM bench_keys")) == ROWS
+
+
+@pytest.mark.parametrize("version", GENERATORS)
+def test_generate_in_python(benchmark, version):
+    generate = GENERATORS[version]
+    benchmark(lambda: [generate() for _ in range(GENERATED)])
+
+
+@pytest.mark.parametrize("version", SQL_GENERATORS)
+def test_generate_in_postgres(benchmark, loop, conn, version):
+    query = f"SELECT count({SQL_GENERATORS[version]}) FROM generate_series(1, {GENERATED})"
+    assert benchmark(lambda: loop.run_until_complete(conn.fetchval(query))) == GENERATED
+
@@ -0,0 +1,298 @@
+"""
+Shared fixtures: a throwaway Postgres database holding the schema and a
+synthetic data set, and an in-memory stand-in for MinIO.
+
+The database is created from ``ini/*.sql`` plus every migration, on the
+server the API is configured for, and dropped again after the run; the
+tests are skipped when that server cannot be reached.  Each test gets a
+connection inside a transaction that is rolled back afterwards, so tests
+can write without seeing each other's changes.
+
+Configuration (environment):
+    POSTGRES_HOST, POSTGRES_PORT:          Server to use (default localhost:5432).
+    POSTGRES_USER, POSTGRES_PASSWORD:      A role allowed to create databases.
+    TEST_POSTGRES_DB:                      Database to create (default
+                                           secure_drive_test); an existing
+                                           one is dropped first.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator
+from uuid import UUID
+
+import asyncpg
+import pytest
+
+from app.database.file import _minio_client
+from app.services.migrations import migrate
+
+# ini/ sits next to api/ in the repository, and is mounted at /ini in the
+# development container.
+INI_DIR = Path(__file__).resolve().parents[2] / "ini"
+
+TEST_DB = os.getenv("TEST_POSTGRES_DB", "secure_drive_test")
+
+# Size of the synthetic data set.  Most owners are small; the one the tests
+# query by has a large account, which is where a plan that reads all of an
+# owner's files instead of an index range would show.
+USERS = 500
+FILES_PER_USER = 200
+LARGE_OWNER_FILES = 10000
+TOP_FOLDERS = 10      # /d0 ... /d9
+SUB_FOLDERS = 5       # /dN/s0 ... /dN/s4
+VERSIONED_EVERY = 10  # every 10th file has two noncurrent versions
+TRASHED_EVERY = 20    # every 20th file is in the trash
+DUPLICATE_EVERY = 7   # every 7th file shares its content with the others
+
+
+def _connect_kwargs(database: str) -> dict[str, Any]:
+    return {
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": os.getenv("POSTGRES_PORT", "5432"),
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD"),
+        "database": database,
+    }
+
+
+@dataclass(frozen=True)
+class Seed:
+    """Rows of the seeded data set that tests query by."""
+
+    owner_id: UUID          # the large account
+    file_id: UUID           # live, in folder_path, one version
+    versioned_file_id: UUID  # live, with noncurrent versions
+    trashed_file_id: UUID
+    folder_id: UUID         # folder_path
+    folder_path: str        # a top-level folder with subfolders
+    leaf_path: str          # one of its subfolders
+    sha256_hex: str         # content shared by several live files
+
+
+_SEED_SQL = """
+INSERT INTO users (user_id, email, password_hash, name, verified)
+SELECT gen_random_uuid(), format('user%s@example.com', n), repeat('x', 60), format('User %s', n), TRUE
+FROM generate_series(1, {users}) AS n;
+
+INSERT INTO folders (owner_id, parent_id, name, path)
+SELECT user_id, NULL, '', '/' FROM users;
+
+INSERT INTO folders (owner_id, parent_id, name, path)
+SELECT owner_id, folder_id, 'd' || t, '/d' || t
+FROM folders, generate_series(0, {top} - 1) AS t;
+
+INSERT INTO folders (owner_id, parent_id, name, path)
+SELECT owner_id, folder_id, 's' || s, path || '/s' || s
+FROM folders, generate_series(0, {sub} - 1) AS s
+WHERE parent_id IS NOT NULL;
+
+INSERT INTO files (
+    file_id, owner_id, bucket, folder_id, object_key, original_name, current_name,
+    mime_type, size_bytes, sha256_hex, version_no, created_at
+)
+SELECT
+    gen_random_uuid(), d.owner_id, 'seed', d.folder_id,
+    format('seed/%s/%s', d.owner_id, n),
+    format('file-%s.txt', n), format('file-%s.txt', n),
+    (ARRAY['text/plain', 'image/png', 'application/pdf', 'video/mp4'])[n % 4 + 1],
+    1000 + n,
+    (SELECT decode(md5(c) || md5(c || '.'), 'hex')
+     FROM (SELECT CASE WHEN n % {dup} = 0 THEN 'dup' ELSE d.owner_id::text || n END) AS x(c)),
+    CASE WHEN n % {versioned} = 0 THEN 3 ELSE 1 END,
+    now() - n * interval '1 hour'
+FROM (
+    SELECT d.folder_id, d.owner_id,
+           row_number() OVER (PARTITION BY d.owner_id ORDER BY d.path) - 1 AS k,
+           count(*) OVER (PARTITION BY d.owner_id) AS folders,
+           CASE WHEN u.email = 'user1@example.com' THEN {large} ELSE {files} END AS files
+    FROM folders d
+    JOIN users u ON u.user_id = d.owner_id
+) d
+JOIN LATERAL generate_series(1, d.files) AS n ON n % d.folders = d.k;
+
+INSERT INTO file_versions (
+    file_id, version_no, owner_id, object_key, mime_type, size_bytes, sha256_hex,
+    created_at, superseded_at
+)
+SELECT f.file_id, v, f.owner_id, f.object_key || '.v' || v, f.mime_type, f.size_bytes,
+       f.sha256_hex, f.created_at - (3 - v) * interval '1 day',
+       f.created_at - (2 - v) * interval '1 day'
+FROM files f, generate_series(1, f.version_no - 1) AS v;
+
+UPDATE files SET trashed_at = created_at WHERE (size_bytes - 1000) % {trashed} = 0;
+
+ANALYZE;
+"""
+
+
+async def _create_schema(conn: asyncpg.Connection) -> None:
+    # ini/06-roles.sh creates the app role with a password from the
+    # environment; the schema only needs it to exist for its GRANTs.
+    await conn.execute(
+        """
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'secure_drive') THEN
+                CREATE ROLE secure_drive NOLOGIN;
+            END IF;
+        END $$
+        """
+    )
+    for script in sorted(INI_DIR.glob("0*.sql")):
+        sql = script.read_text()
+        # Some scripts are entirely commented out, and asyncpg fails on an
+        # empty query string.
+        if any(line.strip() and not line.lstrip().startswith("--") for line in sql.splitlines()):
+            await conn.execute(sql)
+    await migrate(conn)
+
+
+async def _seed(conn: asyncpg.Connection) -> Seed:
+    await conn.execute(
+        _SEED_SQL.format(
+            users=USERS,
+            files=FILES_PER_USER,
+            large=LARGE_OWNER_FILES,
+            top=TOP_FOLDERS,
+            sub=SUB_FOLDERS,
+            versioned=VERSIONED_EVERY,
+            trashed=TRASHED_EVERY,
+            dup=DUPLICATE_EVERY,
+        )
+    )
+    owner_id = await conn.fetchval("SELECT user_id FROM users WHERE email = 'user1@example.com'")
+    folder = await conn.fetchrow(
+        "SELECT folder_id, path FROM folders WHERE owner_id = $1 AND path = '/d3'", owner_id
+    )
+
+    async def live_file(condition: str) -> UUID:
+        return await conn.fetchval(
+            f"SELECT file_id FROM files WHERE owner_id = $1 AND {condition} ORDER BY file_id LIMIT 1",
+            owner_id,
+        )
+
+    return Seed(
+        owner_id=owner_id,
+        file_id=await live_file(
+            f"folder_id = '{folder['folder_id']}' AND trashed_at IS NULL AND version_no = 1"
+        ),
+        versioned_file_id=await live_file("trashed_at IS NULL AND version_no > 1"),
+        trashed_file_id=await live_file("trashed_at IS NOT NULL"),
+        folder_id=folder["folder_id"],
+        folder_path=folder["path"],
+        leaf_path=f"{folder['path']}/s1",
+        sha256_hex=(await conn.fetchval(
+            "SELECT sha256_hex FROM files WHERE owner_id = $1 AND size_bytes = 1000 + $2",
+            owner_id,
+            DUPLICATE_EVERY,
+        )).hex(),
+    )
+
+
+@pytest.fixture(scope="session")
+async def database() -> AsyncIterator[dict[str, Any]]:
+    """Create, migrate and seed the test database; yield its connection settings."""
+    try:
+        admin = await asyncpg.connect(**_connect_kwargs("postgres"), timeout=5)
+    except (OSError, asyncpg.PostgresError) as exc:
+        pytest.skip(f"Postgres is not reachable: {exc}")
+
+    try:
+        await admin.execute(f'DROP DATABASE IF EXISTS "{TEST_DB}" WITH (FORCE)')
+        await admin.execute(f'CREATE DATABASE "{TEST_DB}"')
+        settings = _connect_kwargs(TEST_DB)
+        conn = await asyncpg.connect(**settings)
+        try:
+            await _create_schema(conn)
+            seed = await _seed(conn)
+        finally:
+            await conn.close()
+        yield {"settings": settings, "seed": seed}
+    finally:
+        await admin.execute(f'DROP DATABASE IF EXISTS "{TEST_DB}" WITH (FORCE)')
+        await admin.close()
+
+
+@pytest.fixture(scope="session")
+def seed(database: dict[str, Any]) -> Seed:
+    return database["seed"]
+
+
+@pytest.fixture
+async def conn(database: dict[str, Any]) -> AsyncIterator[asyncpg.Connection]:
+    """A connection inside a transaction that is rolled back after the test.
+
+    The transaction is REPEATABLE READ because the data-access functions
+    that open their own snapshot (the export and change-log reads) nest a
+    REPEATABLE READ transaction, and asyncpg requires a nested transaction
+    to match the outer one's isolation.
+    """
+    connection = await asyncpg.connect(**database["settings"])
+    transaction = connection.transaction(isolation="repeatable_read")
+    await transaction.start()
+    try:
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+
+
+class InMemoryObjectStore:
+    """The subset of the ``minio.Minio`` client the data-access layer uses."""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return True
+
+    def make_bucket(self, bucket_name: str) -> None:
+        pass
+
+    def put_object(self, bucket_name: str, object_name: str, data: io.RawIOBase, length: int, **kwargs: Any) -> None:
+        self.objects[object_name] = data.read()
+
+    def get_object(self, bucket_name: str, object_name: str) -> Any:
+        return _Response(self.objects[object_name])
+
+    def stat_object(self, bucket_name: str, object_name: str) -> Any:
+        from minio.error import S3Error
+
+        if object_name not in self.objects:
+            raise S3Error(None, "NoSuchKey", "Object does not exist", object_name, None, None)
+        return object_name
+
+    def remove_object(self, bucket_name: str, object_name: str) -> None:
+        self.objects.pop(object_name, None)
+
+    def remove_objects(self, bucket_name: str, delete_object_list: Any) -> Iterator[Any]:
+        for obj in delete_object_list:
+            self.objects.pop(obj.name, None)
+        return iter(())
+
+
+class _Response:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    def stream(self, amt: int = 65536) -> Iterator[bytes]:
+        for start in range(0, len(self._data), amt):
+            yield self._data[start:start + amt]
+
+    def close(self) -> None:
+        pass
+
+    def release_conn(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def object_store(monkeypatch: pytest.MonkeyPatch) -> InMemoryObjectStore:
+    """Replace the MinIO client, so no test needs (or touches) a real bucket."""
+    store = InMemoryObjectStore()
+    monkeypatch.setattr(_minio_client, "client", store)
+    return store
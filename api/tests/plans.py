@@ -0,0 +1,146 @@
+"""
+Capturing the query plans of data-access functions.
+
+:class:`PlanRecorder` stands in for the ``asyncpg.Connection`` a data-access
+function is given: every statement it is asked to run is first EXPLAINed,
+with the same arguments, and the plan kept, then run on the real
+connection.  :func:`explain` runs a function through a recorder and returns
+the plans; :func:`assert_plans` checks them.
+
+Only the statements the data-access layer sends are explained.  Statements
+run inside a PL/pgSQL function (``fn_ensure_folder``, the counter triggers)
+show up as the call that invoked them.
+"""
+
+from __future__ import annotations
+
+import json
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator
+
+from asyncpg import Connection
+
+# Tables that grow with every user's files: a plan may never read them in full.
+FULL_SCAN_FORBIDDEN = frozenset({"files", "folders"})
+
+
+@dataclass(frozen=True)
+class Plan:
+    """The plan Postgres chose for one statement."""
+
+    query: str
+    root: dict[str, Any]
+
+    def nodes(self) -> Iterator[dict[str, Any]]:
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.get("Plans", ()))
+
+    @property
+    def indexes(self) -> set[str]:
+        return {node["Index Name"] for node in self.nodes() if "Index Name" in node}
+
+    def index_conds(self, index: str) -> list[str]:
+        return [
+            node.get("Index Cond", "")
+            for node in self.nodes()
+            if node.get("Index Name") == index
+        ]
+
+    @property
+    def seq_scans(self) -> set[str]:
+        return {node["Relation Name"] for node in self.nodes() if node["Node Type"] == "Seq Scan"}
+
+    def describe(self) -> str:
+        lines = [" ".join(self.query.split())[:200]]
+        stack = [(self.root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            parts = [node["Node Type"]]
+            if "Relation Name" in node:
+                parts.append(f"on {node['Relation Name']}")
+            if "Index Name" in node:
+                parts.append(f"using {node['Index Name']}")
+            lines.append("  " * depth + " ".join(parts))
+            stack.extend((child, depth + 1) for child in reversed(node.get("Plans", ())))
+        return "\n".join(lines)
+
+
+class PlanRecorder:
+    """Connection proxy that EXPLAINs every statement before running it."""
+
+    def __init__(self, conn: Connection) -> None:
+        self._conn = conn
+        self.plans: list[Plan] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    async def _explain(self, query: str, args: tuple[Any, ...]) -> None:
+        # A statement may depend on what the previous one wrote, so it is
+        # explained in order, just before it runs.
+        raw = await self._conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *args)
+        self.plans.append(Plan(query=query, root=json.loads(raw)[0]["Plan"]))
+
+    async def execute(self, query: str, *args: Any, **kwargs: Any) -> str:
+        # Without arguments execute() takes a script of several statements,
+        # which EXPLAIN cannot; such a script is run unexplained.
+        if args:
+            await self._explain(query, args)
+        return await self._conn.execute(query, *args, **kwargs)
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list[Any]:
+        await self._explain(query, args)
+        return await self._conn.fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await self._conn.fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await self._conn.fetchval(query, *args, **kwargs)
+
+    async def cursor(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        await self._explain(query, args)
+        return await self._conn.cursor(query, *args, **kwargs)
+
+
+async def explain(
+    func: Callable[..., Awaitable[Any]], conn: Connection, **kwargs: Any
+) -> list[Plan]:
+    """Run ``func(conn=..., **kwargs)`` and return the plans of its statements.
+
+    Async generators (the export functions) are consumed to the end.
+    """
+    recorder = PlanRecorder(conn)
+    result = func(conn=recorder, **kwargs)
+    if inspect.isasyncgen(result):
+        async for _ in result:
+            pass
+    else:
+        await result
+    assert recorder.plans, f"{func.__name__} ran no statements"
+    return recorder.plans
+
+
+def assert_plans(plans: list[Plan], *indexes: str) -> None:
+    """Assert the plans use every one of *indexes* and never seq-scan files or folders."""
+    # A statement run once per batch or per owner is reported once.
+    report = "\n\n".join(dict.fromkeys(plan.describe() for plan in plans))
+    used = set().union(*(plan.indexes for plan in plans))
+    missing = set(indexes) - used
+    assert not missing, f"index(es) {sorted(missing)} not used:\n{report}"
+    scanned = set().union(*(plan.seq_scans for plan in plans)) & FULL_SCAN_FORBIDDEN
+    assert not scanned, f"sequential scan on {sorted(scanned)}:\n{report}"
+
+
+def assert_range_scan(plans: list[Plan], index: str) -> None:
+    """Assert some plan reads *index* by a ``text_pattern_ops`` path range."""
+    conds = [cond for plan in plans for cond in plan.index_conds(index)]
+    assert any("~>=~" in cond and "~<~" in cond for cond in conds), (
+        f"no range scan of {index}; index conditions: {conds}"
+    )
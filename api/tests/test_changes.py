@@ -0,0 +1,55 @@
+"""What ``app.database.change`` and the change-log triggers record and drop."""
+
+from datetime import timedelta
+
+from app.database import change as changes
+from app.database import folder as folders
+
+
+async def test_rename_folder_logs_subtree_root(conn, seed):
+    before = await conn.fetchval("SELECT change_seq FROM users WHERE user_id = $1", seed.owner_id)
+
+    await folders.rename_folder(conn=conn, folder_id=seed.folder_id, new_name="renamed")
+
+    logged = await conn.fetch(
+        "SELECT folder_id, kind FROM file_changes WHERE owner_id = $1 AND seq > $2",
+        seed.owner_id,
+        before,
+    )
+    assert [(r["folder_id"], r["kind"]) for r in logged] == [(seed.folder_id, "folder_moved")]
+
+
+async def test_compact_changes_expires_seq_prefix(conn, seed):
+    # One change that outlives compaction, with every other change aged
+    # past the retention period: those above it must be kept all the same.
+    latest = await conn.fetch(
+        """
+        SELECT seq FROM (
+            SELECT seq, row_number() OVER (PARTITION BY COALESCE(file_id, folder_id)
+                                           ORDER BY seq DESC) AS rn
+            FROM file_changes WHERE owner_id = $1
+        ) x
+        WHERE rn = 1
+        ORDER BY seq
+        """,
+        seed.owner_id,
+    )
+    keep = latest[100]["seq"]
+    await conn.execute(
+        "UPDATE file_changes SET changed_at = changed_at - interval '60 days' "
+        "WHERE owner_id = $1 AND seq <> $2",
+        seed.owner_id,
+        keep,
+    )
+
+    await changes.compact_changes(conn=conn, retain=timedelta(days=30), owner_id=seed.owner_id)
+
+    remaining = [
+        r["seq"]
+        for r in await conn.fetch(
+            "SELECT seq FROM file_changes WHERE owner_id = $1 ORDER BY seq", seed.owner_id
+        )
+    ]
+    assert remaining == [r["seq"] for r in latest[100:]]
+    floor = await conn.fetchval("SELECT change_floor FROM users WHERE user_id = $1", seed.owner_id)
+    assert floor == latest[99]["seq"]
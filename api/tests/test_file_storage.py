@@ -0,0 +1,79 @@
+"""Object storage as ``app.database.file`` writes it: uploads a failed write leaves no trace of."""
+
+import io
+from pathlib import PurePosixPath
+
+import pytest
+
+from app.database import file as files
+from app.database.user.exceptions import StorageQuotaExceededError
+from app.models.file import FileContent, FileCreate
+
+
+async def test_create_over_quota_removes_upload(conn, seed, object_store):
+    await conn.execute(
+        "UPDATE users SET storage_quota = storage_used WHERE user_id = $1", seed.owner_id
+    )
+    meta = FileCreate(
+        owner_id=seed.owner_id,
+        bucket="seed",
+        folder=PurePosixPath(seed.leaf_path),
+        name="new.txt",
+        mime_type="text/plain",
+        size_bytes=5,
+        sha256_hex="ab" * 32,
+    )
+
+    with pytest.raises(StorageQuotaExceededError):
+        await files.create_file_meta_and_bytes(
+            conn=conn, file_meta=meta, file_bytes=io.BytesIO(b"hello")
+        )
+    assert object_store.objects == {}
+
+
+async def test_create_uploads_under_object_key(conn, seed, object_store):
+    meta = FileCreate(
+        owner_id=seed.owner_id,
+        bucket="seed",
+        folder=PurePosixPath(seed.leaf_path),
+        name="new.txt",
+        mime_type="text/plain",
+        size_bytes=5,
+        sha256_hex="ab" * 32,
+    )
+
+    created = await files.create_file_meta_and_bytes(
+        conn=conn, file_meta=meta, file_bytes=io.BytesIO(b"hello")
+    )
+    object_key = await conn.fetchval(
+        "SELECT object_key FROM files WHERE file_id = $1", created.file_id
+    )
+    assert object_store.objects == {object_key: b"hello"}
+
+
+async def test_version_over_quota_removes_upload(conn, seed, object_store):
+    await conn.execute(
+        "UPDATE users SET storage_quota = storage_used WHERE user_id = $1", seed.owner_id
+    )
+    content = FileContent(mime_type="text/plain", size_bytes=5, sha256_hex="cd" * 32)
+
+    with pytest.raises(StorageQuotaExceededError):
+        await files.create_file_version(
+            conn=conn, file_id=seed.file_id, content=content, file_bytes=io.BytesIO(b"hello")
+        )
+    assert object_store.objects == {}
+
+
+async def test_version_of_kept_content_uploads_nothing(conn, seed, object_store):
+    kept = await conn.fetchrow(
+        "SELECT mime_type, size_bytes, sha256_hex FROM file_versions WHERE file_id = $1 LIMIT 1",
+        seed.versioned_file_id,
+    )
+    content = FileContent(
+        mime_type=kept["mime_type"], size_bytes=kept["size_bytes"], sha256_hex=kept["sha256_hex"].hex()
+    )
+
+    await files.create_file_version(
+        conn=conn, file_id=seed.versioned_file_id, content=content, file_bytes=io.BytesIO(b"hello")
+    )
+    assert object_store.objects == {}
@@ -0,0 +1,29 @@
+"""``app.services.passwords``: the bcrypt process pool."""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.passwords import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    yield hasher
+    hasher.shutdown()
+
+
+async def test_verify_unknown_account(hasher):
+    assert await hasher.verify(plain_password="secret", hashed_password=None) is False
+
+
+async def test_pool_replaced_after_worker_dies(hasher):
+    hashed = await hasher.hash("secret")
+
+    with pytest.raises(BrokenProcessPool):
+        await hasher._submit(os._exit, 1)
+
+    assert await hasher.verify(plain_password="secret", hashed_password=hashed)
+    assert hasher.pending == 0
@@ -0,0 +1,32 @@
+"""Query plans of ``app.database.change``: the change log is read and compacted per owner."""
+
+from datetime import timedelta
+
+from app.database import change as changes
+
+from .plans import assert_plans, explain
+
+
+async def test_list_changes(conn, seed):
+    plans = await explain(changes.list_changes, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "file_changes_pkey", "files_pkey")
+
+
+async def test_list_changes_since(conn, seed):
+    since = await conn.fetchval(
+        "SELECT change_seq - 100 FROM users WHERE user_id = $1", seed.owner_id
+    )
+    plans = await explain(changes.list_changes, conn, owner_id=seed.owner_id, since=since)
+    assert_plans(plans, "file_changes_pkey", "files_pkey")
+
+
+async def test_compact_changes_for_owner(conn, seed):
+    plans = await explain(
+        changes.compact_changes, conn, retain=timedelta(days=30), owner_id=seed.owner_id
+    )
+    assert_plans(plans)
+
+
+async def test_compact_changes(conn, seed):
+    plans = await explain(changes.compact_changes, conn, retain=timedelta(days=30))
+    assert_plans(plans)
@@ -0,0 +1,296 @@
+"""Query plans of ``app.database.file``: every statement is owner- or key-scoped."""
+
+import io
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from app.database import file as files
+from app.models.file import FileContent, FileCreate
+
+from .plans import assert_plans, explain
+
+
+# Create
+
+
+async def test_create_file_meta_and_bytes(conn, seed):
+    meta = FileCreate(
+        owner_id=seed.owner_id,
+        bucket="seed",
+        folder=PurePosixPath(seed.leaf_path),
+        name="new.txt",
+        mime_type="text/plain",
+        size_bytes=5,
+        sha256_hex="ab" * 32,
+    )
+    plans = await explain(
+        files.create_file_meta_and_bytes, conn, file_meta=meta, file_bytes=io.BytesIO(b"hello")
+    )
+    assert_plans(plans, "folders_pkey")
+
+
+# Read
+
+
+async def test_get_file_meta(conn, seed):
+    plans = await explain(files.get_file_meta, conn, file_id=seed.file_id)
+    assert_plans(plans, "files_pkey", "folders_pkey")
+
+
+async def test_get_file_meta_by_sha256(conn, seed):
+    plans = await explain(
+        files.get_file_meta_by_sha256, conn, sha256_hex=seed.sha256_hex, owner_id=seed.owner_id
+    )
+    assert_plans(plans, "idx_files_owner_sha256")
+
+
+async def test_get_file_meta_and_bytes(conn, seed, object_store):
+    object_key = await conn.fetchval("SELECT object_key FROM files WHERE file_id = $1", seed.file_id)
+    object_store.objects[object_key] = b"seed"
+    plans = await explain(files.get_file_meta_and_bytes, conn, file_id=seed.file_id)
+    assert_plans(plans, "files_pkey")
+
+
+async def test_list_file_meta_by_owner_newest_first(conn, seed):
+    plans = await explain(files.list_file_meta_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_created")
+
+
+async def test_list_file_meta_by_owner_by_name(conn, seed):
+    plans = await explain(
+        files.list_file_meta_by_owner,
+        conn,
+        owner_id=seed.owner_id,
+        order_by="current_name",
+        ascending=True,
+    )
+    assert_plans(plans, "idx_files_owner_name")
+
+
+async def test_list_file_meta_by_owner_after_cursor(conn, seed):
+    page = await files.list_file_meta_by_owner(conn=conn, owner_id=seed.owner_id, limit=10)
+    plans = await explain(
+        files.list_file_meta_by_owner,
+        conn,
+        owner_id=seed.owner_id,
+        after=(page[-1].created_at, page[-1].file_id),
+    )
+    assert_plans(plans, "idx_files_owner_created")
+
+
+async def test_list_file_meta_by_folder(conn, seed):
+    plans = await explain(
+        files.list_file_meta_by_folder,
+        conn,
+        owner_id=seed.owner_id,
+        folder=PurePosixPath(seed.leaf_path),
+    )
+    assert_plans(plans, "idx_folders_owner_path", "idx_files_folder_id")
+
+
+# Search
+
+
+async def test_search_file_meta_by_owner(conn, seed):
+    plans = await explain(
+        files.search_file_meta_by_owner, conn, owner_id=seed.owner_id, query="file-12"
+    )
+    assert_plans(plans, "idx_files_owner_name_trgm")
+
+
+async def test_count_file_meta_by_search(conn, seed):
+    plans = await explain(
+        files.count_file_meta_by_search, conn, owner_id=seed.owner_id, query="file-12"
+    )
+    assert_plans(plans, "idx_files_owner_name_trgm")
+
+
+# Export
+
+
+async def test_iter_file_meta_by_owner(conn, seed):
+    plans = await explain(files.iter_file_meta_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_created")
+
+
+async def test_iter_file_manifest_by_owner(conn, seed):
+    plans = await explain(files.iter_file_manifest_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_created")
+
+
+# Update
+
+
+async def test_rename_file_meta(conn, seed):
+    plans = await explain(files.rename_file_meta, conn, file_id=seed.file_id, new_name="renamed.txt")
+    assert_plans(plans, "files_pkey")
+
+
+async def test_move_file_meta(conn, seed):
+    plans = await explain(
+        files.move_file_meta, conn, file_id=seed.file_id, folder=PurePosixPath(seed.leaf_path)
+    )
+    assert_plans(plans, "files_pkey")
+
+
+# Delete
+
+
+async def test_delete_file_meta_and_bytes(conn, seed):
+    plans = await explain(files.delete_file_meta_and_bytes, conn, file_id=seed.file_id)
+    assert_plans(plans, "files_pkey")
+
+
+# Trash
+
+
+async def test_trash_file_meta(conn, seed):
+    plans = await explain(files.trash_file_meta, conn, file_id=seed.file_id)
+    assert_plans(plans, "files_pkey")
+
+
+async def test_restore_file_meta(conn, seed):
+    plans = await explain(files.restore_file_meta, conn, file_id=seed.trashed_file_id)
+    assert_plans(plans, "files_pkey")
+
+
+async def test_list_trashed_file_meta(conn, seed):
+    plans = await explain(files.list_trashed_file_meta, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_trashed")
+
+
+async def test_count_trashed_file_meta(conn, seed):
+    plans = await explain(files.count_trashed_file_meta, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_trashed")
+
+
+async def test_purge_trashed_file_meta_and_bytes_for_owner(conn, seed):
+    plans = await explain(files.purge_trashed_file_meta_and_bytes, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_trashed")
+
+
+async def test_purge_trashed_file_meta_and_bytes_past_retention(conn, seed):
+    plans = await explain(files.purge_trashed_file_meta_and_bytes, conn, retain=timedelta(days=30))
+    assert_plans(plans, "idx_files_trashed_at")
+
+
+# Versions
+
+
+async def test_create_file_version(conn, seed):
+    content = FileContent(mime_type="text/plain", size_bytes=5, sha256_hex="cd" * 32)
+    plans = await explain(
+        files.create_file_version,
+        conn,
+        file_id=seed.versioned_file_id,
+        content=content,
+        file_bytes=io.BytesIO(b"hello"),
+    )
+    assert_plans(plans, "files_pkey", "file_versions_pkey")
+
+
+async def test_list_file_versions(conn, seed):
+    plans = await explain(files.list_file_versions, conn, file_id=seed.versioned_file_id)
+    assert_plans(plans, "file_versions_pkey")
+
+
+async def test_restore_file_version(conn, seed):
+    plans = await explain(
+        files.restore_file_version, conn, file_id=seed.versioned_file_id, version_no=1
+    )
+    assert_plans(plans, "files_pkey", "file_versions_pkey")
+
+
+async def test_delete_file_version(conn, seed):
+    plans = await explain(
+        files.delete_file_version, conn, file_id=seed.versioned_file_id, version_no=1
+    )
+    assert_plans(plans, "file_versions_pkey")
+
+
+async def test_prune_file_versions_past_retention(conn, seed):
+    plans = await explain(files.prune_file_versions, conn, retain=timedelta(days=30))
+    assert_plans(plans, "idx_file_versions_superseded_at", "files_pkey")
+
+
+async def test_prune_file_versions_over_keep(conn, seed):
+    plans = await explain(files.prune_file_versions, conn, keep=1)
+    assert_plans(plans, "file_versions_pkey", "files_pkey")
+
+
+# Batch
+
+
+async def test_apply_file_batch(conn, seed):
+    other = await conn.fetchval(
+        "SELECT file_id FROM files WHERE owner_id = $1 AND trashed_at IS NULL AND file_id <> $2 LIMIT 1",
+        seed.owner_id,
+        seed.file_id,
+    )
+    plans = await explain(
+        files.apply_file_batch,
+        conn,
+        owner_id=seed.owner_id,
+        renames={seed.file_id: "renamed.txt"},
+        moves={seed.file_id: PurePosixPath(seed.leaf_path)},
+        deletes=[other],
+    )
+    assert_plans(plans, "files_pkey")
+
+
+# Aggregate / Utility
+
+
+async def test_count_file_meta_by_owner(conn, seed):
+    plans = await explain(files.count_file_meta_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "users_pkey")
+
+
+async def test_count_file_meta_by_folder(conn, seed):
+    plans = await explain(
+        files.count_file_meta_by_folder,
+        conn,
+        owner_id=seed.owner_id,
+        folder=PurePosixPath(seed.folder_path),
+    )
+    assert_plans(plans, "idx_folders_owner_path")
+
+
+async def test_total_bytes_by_owner(conn, seed):
+    plans = await explain(files.total_bytes_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "users_pkey")
+
+
+async def test_trash_bytes_by_owner(conn, seed):
+    plans = await explain(files.trash_bytes_by_owner, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_trashed")
+
+
+async def test_reconcile_file_counters(conn, seed):
+    plans = await explain(files.reconcile_file_counters, conn, owner_id=seed.owner_id, repair=False)
+    assert_plans(plans)
+
+
+async def test_get_storage_breakdown(conn, seed):
+    plans = await explain(files.get_storage_breakdown, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_folders_owner_path")
+
+
+async def test_get_storage_breakdown_of_folder(conn, seed):
+    plans = await explain(
+        files.get_storage_breakdown,
+        conn,
+        owner_id=seed.owner_id,
+        folder=PurePosixPath(seed.folder_path),
+    )
+    assert_plans(plans, "idx_folders_owner_path")
+
+
+async def test_list_duplicate_file_meta(conn, seed):
+    plans = await explain(files.list_duplicate_file_meta, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_files_owner_sha256")
+
+
+async def test_file_meta_and_bytes_exists(conn, seed, object_store):
+    plans = await explain(files.file_meta_and_bytes_exists, conn, file_id=seed.file_id)
+    assert_plans(plans, "files_pkey")
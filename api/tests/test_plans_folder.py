@@ -0,0 +1,57 @@
+"""Query plans of ``app.database.folder``: folders are found by id or by owner and path."""
+
+from pathlib import PurePosixPath
+
+from app.database import folder as folders
+from app.models.folder import FolderCreate
+
+from .plans import assert_plans, explain
+
+
+async def test_create_folder(conn, seed):
+    plans = await explain(
+        folders.create_folder,
+        conn,
+        folder=FolderCreate(owner_id=seed.owner_id, path=PurePosixPath(seed.leaf_path) / "new"),
+    )
+    assert_plans(plans)
+
+
+async def test_delete_folder_and_contents(conn, seed):
+    plans = await explain(folders.delete_folder_and_contents, conn, folder_id=seed.folder_id)
+    assert_plans(plans, "folders_pkey", "idx_folders_owner_path")
+
+
+async def test_get_folder(conn, seed):
+    plans = await explain(folders.get_folder, conn, folder_id=seed.folder_id)
+    assert_plans(plans, "folders_pkey")
+
+
+async def test_get_folder_by_path(conn, seed):
+    plans = await explain(
+        folders.get_folder_by_path, conn, owner_id=seed.owner_id, path=PurePosixPath(seed.leaf_path)
+    )
+    assert_plans(plans, "idx_folders_owner_path")
+
+
+async def test_list_folders_of_root(conn, seed):
+    plans = await explain(folders.list_folders, conn, owner_id=seed.owner_id)
+    assert_plans(plans, "idx_folders_owner_path")
+
+
+async def test_list_folders_of_parent(conn, seed):
+    plans = await explain(folders.list_folders, conn, owner_id=seed.owner_id, parent_id=seed.folder_id)
+    assert_plans(plans, "idx_folders_parent_id")
+
+
+async def test_rename_folder(conn, seed):
+    plans = await explain(folders.rename_folder, conn, folder_id=seed.folder_id, new_name="renamed")
+    assert_plans(plans, "folders_pkey", "idx_folders_owner_path")
+
+
+async def test_move_folder(conn, seed):
+    parent_id = await conn.fetchval(
+        "SELECT folder_id FROM folders WHERE owner_id = $1 AND path = '/d4'", seed.owner_id
+    )
+    plans = await explain(folders.move_folder, conn, folder_id=seed.folder_id, parent_id=parent_id)
+    assert_plans(plans, "folders_pkey", "idx_folders_owner_path")
@@ -0,0 +1,73 @@
+"""Query plans of subtree queries: a folder's descendants are a range of idx_folders_owner_path."""
+
+from pathlib import PurePosixPath
+
+from app.database import file as files
+from app.database import folder as folders
+
+from .plans import assert_plans, assert_range_scan, explain
+
+
+async def test_list_file_meta_by_folder_recursive(conn, seed):
+    plans = await explain(
+        files.list_file_meta_by_folder,
+        conn,
+        owner_id=seed.owner_id,
+        folder=PurePosixPath(seed.folder_path),
+        recursive=True,
+    )
+    assert_plans(plans, "idx_folders_owner_path", "idx_files_folder_id")
+    assert_range_scan(plans, "idx_folders_owner_path")
+
+
+async def test_list_file_meta_by_folder_recursive_from_root(conn, seed):
+    plans = await explain(
+        files.list_file_meta_by_folder,
+        conn,
+        owner_id=seed.owner_id,
+        folder=PurePosixPath("/"),
+        recursive=True,
+    )
+    assert_plans(plans, "idx_folders_owner_path", "idx_files_folder_id")
+
+
+async def test_search_file_meta_by_owner_in_folder(conn, seed):
+    plans = await explain(
+        files.search_file_meta_by_owner,
+        conn,
+        owner_id=seed.owner_id,
+        query="file-12",
+        folder=PurePosixPath(seed.folder_path),
+    )
+    assert_plans(plans, "idx_folders_owner_path")
+    assert_range_scan(plans, "idx_folders_owner_path")
+
+
+async def test_count_file_meta_by_search_in_folder(conn, seed):
+    plans = await explain(
+        files.count_file_meta_by_search,
+        conn,
+        owner_id=seed.owner_id,
+        query="file-12",
+        folder=PurePosixPath(seed.folder_path),
+    )
+    assert_plans(plans, "idx_folders_owner_path")
+    assert_range_scan(plans, "idx_folders_owner_path")
+
+
+async def test_rename_folder_rewrites_subtree(conn, seed):
+    plans = await explain(folders.rename_folder, conn, folder_id=seed.folder_id, new_name="renamed")
+    assert_range_scan(plans, "idx_folders_owner_path")
+
+
+async def test_move_folder_rewrites_subtree(conn, seed):
+    parent_id = await conn.fetchval(
+        "SELECT folder_id FROM folders WHERE owner_id = $1 AND path = '/d4'", seed.owner_id
+    )
+    plans = await explain(folders.move_folder, conn, folder_id=seed.folder_id, parent_id=parent_id)
+    assert_range_scan(plans, "idx_folders_owner_path")
+
+
+async def test_delete_folder_and_contents_finds_subtree(conn, seed):
+    plans = await explain(folders.delete_folder_and_contents, conn, folder_id=seed.folder_id)
+    assert_range_scan(plans, "idx_folders_owner_path")
@@ -3,6 +3,14 @@
 -- scripts can reference them safely.
 -- =============================================================
 
+-- ─────────────────────────────────────────────────────────────
+-- Extensions
+--   pg_trgm   : trigram matching for file-name search
+--   btree_gin : lets a GIN index lead with a scalar column (owner_id)
+-- ─────────────────────────────────────────────────────────────
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
 -- ─────────────────────────────────────────────────────────────
 -- Shared trigger: auto-update updated_at on any table
 -- Named update_updated_at() — single canonical definition.
@@ -34,6 +34,11 @@ CREATE TABLE users (
     -- Storage
     storage_used         BIGINT NOT NULL DEFAULT 0,
     storage_quota        BIGINT NOT NULL DEFAULT 10737418240,    -- 10 GiB
+    file_count           BIGINT NOT NULL DEFAULT 0,              -- maintained by fn_files_counters()
+
+    -- Change feed (see file_changes)
+    change_seq           BIGINT NOT NULL DEFAULT 0,   -- last sequence number handed out
+    change_floor         BIGINT NOT NULL DEFAULT 0,   -- changes up to here may have been pruned
 
     -- Versions
     verification_version INT NOT NULL DEFAULT 0,  -- for email verification tokens
@@ -54,6 +59,10 @@ ALTER TABLE users
         CHECK (storage_quota > 0),
     ADD CONSTRAINT chk_users_storage_within_quota
         CHECK (storage_used <= storage_quota),
+    ADD CONSTRAINT chk_users_file_count_non_negative
+        CHECK (file_count >= 0),
+    ADD CONSTRAINT chk_users_change_floor_within_seq
+        CHECK (change_floor BETWEEN 0 AND change_seq),
     ADD CONSTRAINT chk_users_name_not_blank
         CHECK (LENGTH(TRIM(name)) > 0);
 
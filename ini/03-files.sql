@@ -1,5 +1,5 @@
 -- =============================================================
--- Tables: files, files_audit
+-- Tables: folders, files, files_audit
 -- =============================================================
 -- CREATE TYPE files_audit_action AS ENUM (
 --                         'file_uploaded',
@@ -13,6 +13,145 @@
 --                     );
 
 
+-- ─────────────────────────────────────────────────────────────
+-- Folders  (one row per logical folder, including each owner's root)
+--
+-- Adjacency (parent_id) plus a materialized path.  Files reference
+-- a folder by id, so a folder's path lives in exactly one row.
+-- file_count / size_bytes cover the files *directly* inside the
+-- folder, tree_file_count / tree_size_bytes the whole subtree; all
+-- four are maintained by fn_files_counters().
+-- ─────────────────────────────────────────────────────────────
+CREATE TABLE folders (
+    folder_id       UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    owner_id        UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    parent_id       UUID REFERENCES folders(folder_id) ON DELETE CASCADE,
+
+    -- Identity ('' and '/' for the root folder)
+    name            TEXT NOT NULL,
+    path            TEXT NOT NULL,
+
+    -- Counters (direct children only / whole subtree)
+    file_count      BIGINT NOT NULL DEFAULT 0,
+    size_bytes      BIGINT NOT NULL DEFAULT 0,
+    tree_file_count BIGINT NOT NULL DEFAULT 0,
+    tree_size_bytes BIGINT NOT NULL DEFAULT 0,
+
+    -- Timestamps
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    updated_at      TIMESTAMPTZ DEFAULT NULL
+);
+
+ALTER TABLE folders
+    ADD CONSTRAINT chk_folders_root_shape
+        CHECK ((parent_id IS NULL) = (path = '/')),
+    ADD CONSTRAINT chk_folders_path_format
+        CHECK (path = '/' OR (path ~ '^(/[^/]+)+$')),
+    ADD CONSTRAINT chk_folders_name_matches_path
+        CHECK (right(path, length(name) + 1) = '/' || name OR path = '/'),
+    ADD CONSTRAINT chk_folders_counters_non_negative
+        CHECK (file_count >= 0 AND size_bytes >= 0),
+    ADD CONSTRAINT chk_folders_tree_counters_cover_direct
+        CHECK (tree_file_count >= file_count AND tree_size_bytes >= size_bytes);
+
+-- Path lookups and subtree scans (prefix matches) for one owner
+CREATE UNIQUE INDEX idx_folders_owner_path
+    ON folders(owner_id, path text_pattern_ops);
+
+-- Direct children of a folder
+CREATE INDEX idx_folders_parent_id
+    ON folders(parent_id);
+
+CREATE TRIGGER trg_folders_updated_at
+    BEFORE UPDATE ON folders
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at();
+
+-- Return the folder_id for (owner, path), creating the folder and any
+-- missing ancestors (root included) on the way.
+CREATE OR REPLACE FUNCTION fn_ensure_folder(p_owner_id UUID, p_path TEXT)
+RETURNS UUID AS $$
+DECLARE
+    v_folder_id UUID;
+    v_parent_id UUID;
+    v_path      TEXT := '';
+    v_name      TEXT;
+BEGIN
+    SELECT folder_id INTO v_folder_id
+      FROM folders
+     WHERE owner_id = p_owner_id AND path = p_path;
+    IF FOUND THEN
+        RETURN v_folder_id;
+    END IF;
+
+    INSERT INTO folders (owner_id, parent_id, name, path)
+    VALUES (p_owner_id, NULL, '', '/')
+    ON CONFLICT (owner_id, path) DO NOTHING;
+
+    SELECT folder_id INTO v_parent_id
+      FROM folders
+     WHERE owner_id = p_owner_id AND path = '/';
+
+    FOREACH v_name IN ARRAY string_to_array(btrim(p_path, '/'), '/') LOOP
+        v_path := v_path || '/' || v_name;
+
+        INSERT INTO folders (owner_id, parent_id, name, path)
+        VALUES (p_owner_id, v_parent_id, v_name, v_path)
+        ON CONFLICT (owner_id, path) DO NOTHING
+        RETURNING folder_id INTO v_folder_id;
+
+        IF v_folder_id IS NULL THEN
+            SELECT folder_id INTO v_folder_id
+              FROM folders
+             WHERE owner_id = p_owner_id AND path = v_path;
+        END IF;
+
+        v_parent_id := v_folder_id;
+        v_folder_id := NULL;
+    END LOOP;
+
+    RETURN v_parent_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- '/a/b/c' -> {'/', '/a', '/a/b', '/a/b/c'}: the paths of a folder and all
+-- of its ancestors, each an idx_folders_owner_path lookup.
+CREATE OR REPLACE FUNCTION fn_path_lineage(p_path TEXT)
+RETURNS TEXT[] AS $$
+    SELECT ARRAY['/'] || COALESCE(array_agg(array_to_string(s.parts[1:i], '/') ORDER BY i), '{}')
+      FROM (SELECT string_to_array(p_path, '/') AS parts) s,
+           generate_series(2, cardinality(s.parts)) AS i
+     WHERE p_path <> '/';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- A re-parented folder takes its subtree totals from its old ancestors to
+-- its new ones.  Fires once per move (only the moved root's parent_id
+-- changes), after the whole subtree's paths have been rewritten.
+CREATE OR REPLACE FUNCTION fn_folders_tree_move()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE folders a
+       SET tree_file_count = a.tree_file_count + d.sign * NEW.tree_file_count,
+           tree_size_bytes = a.tree_size_bytes + d.sign * NEW.tree_size_bytes
+      FROM (SELECT path, SUM(sign) AS sign
+              FROM (SELECT unnest(fn_path_lineage(OLD.path)) AS path, -1 AS sign
+                    UNION ALL
+                    SELECT unnest(fn_path_lineage(NEW.path)), 1) l
+             GROUP BY path
+            HAVING SUM(sign) <> 0) d
+     WHERE a.owner_id = NEW.owner_id
+       AND a.path = d.path
+       AND a.folder_id <> NEW.folder_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_folders_tree_move
+    AFTER UPDATE OF parent_id ON folders
+    FOR EACH ROW
+    WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+    EXECUTE FUNCTION fn_folders_tree_move();
+
+
 -- ─────────────────────────────────────────────────────────────
 -- files Metadata  (one row per stored file)
 -- ─────────────────────────────────────────────────────────────
@@ -20,9 +159,10 @@ CREATE TABLE files (
     file_id         UUID PRIMARY KEY,
     owner_id        UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
 
-    -- Storage location
+    -- Storage location (object_key holds the current version's bytes)
     bucket          TEXT NOT NULL,
-    folder          TEXT NOT NULL DEFAULT '/',
+    folder_id       UUID NOT NULL REFERENCES folders(folder_id),
+    object_key      TEXT NOT NULL,
 
     -- File identity
     original_name   TEXT NOT NULL,
@@ -31,9 +171,19 @@ CREATE TABLE files (
     size_bytes      BIGINT NOT NULL,
     sha256_hex      CHAR(64) NOT NULL,
 
+    -- Current version (earlier ones live in file_versions)
+    version_no      INT NOT NULL DEFAULT 1,
+
     -- Timestamps
     created_at      TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
-    updated_at      TIMESTAMPTZ DEFAULT NULL
+    updated_at      TIMESTAMPTZ DEFAULT NULL,
+    version_created_at TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+
+    -- Trash (NULL while live).  A trashed file keeps its row and bytes
+    -- until purged; trashed_from is the folder path to restore it to
+    -- when its folder was deleted while it sat in the trash.
+    trashed_at      TIMESTAMPTZ DEFAULT NULL,
+    trashed_from    TEXT DEFAULT NULL
 );
 
 ALTER TABLE files
@@ -41,20 +191,724 @@ ALTER TABLE files
         CHECK (size_bytes > 0),
     ADD CONSTRAINT chk_files_sha256_format
         CHECK (sha256_hex ~ '^[a-f0-9]{64}$'),
-    ADD CONSTRAINT chk_files_folder_starts_with_slash
-        CHECK (folder ~ '^/'),
     ADD CONSTRAINT chk_files_names_not_blank
-        CHECK (LENGTH(TRIM(original_name)) > 0 AND LENGTH(TRIM(current_name)) > 0);
+        CHECK (LENGTH(TRIM(original_name)) > 0 AND LENGTH(TRIM(current_name)) > 0),
+    ADD CONSTRAINT chk_files_trashed_from_in_trash
+        CHECK (trashed_from IS NULL OR trashed_at IS NOT NULL),
+    ADD CONSTRAINT chk_files_version_no_positive
+        CHECK (version_no > 0);
 
-CREATE INDEX idx_files_folder      ON files(folder);
+-- Not partial: it also serves the folder_id foreign-key checks.
+CREATE INDEX idx_files_folder_id   ON files(folder_id, current_name);
 CREATE INDEX idx_files_owner_id    ON files(owner_id);
 CREATE INDEX idx_files_created_at  ON files(created_at);
 CREATE INDEX idx_files_sha256      ON files(sha256_hex);
 
+-- Owner-scoped content lookups and the duplicate report, which groups
+-- an owner's live files by hash as an index-only scan.
+CREATE INDEX idx_files_owner_sha256
+    ON files(owner_id, sha256_hex) INCLUDE (size_bytes)
+    WHERE trashed_at IS NULL;
+
+-- Owner-scoped name search (ILIKE substring and <% fuzzy matching)
+-- over live files.
+CREATE INDEX idx_files_owner_name_trgm
+    ON files USING gin (owner_id, current_name gin_trgm_ops)
+    WHERE trashed_at IS NULL;
+
+-- An owner's trash, newest first, and the purger's expiry scan; both
+-- stay as small as the trash itself.
+CREATE INDEX idx_files_owner_trashed
+    ON files(owner_id, trashed_at) WHERE trashed_at IS NOT NULL;
+CREATE INDEX idx_files_trashed_at
+    ON files(trashed_at) WHERE trashed_at IS NOT NULL;
+
 CREATE TRIGGER trg_files_updated_at
     BEFORE UPDATE ON files
     FOR EACH ROW EXECUTE FUNCTION update_updated_at();
 
+-- Files together with their folder path; the shape the API reads.
+-- Joining on owner_id too lets an owner filter reach folders' index.
+-- Trashed files whose folder is gone report the path they came from.
+CREATE VIEW v_files AS
+    SELECT f.*, COALESCE(f.trashed_from, d.path) AS folder
+      FROM files f
+      JOIN folders d ON d.folder_id = f.folder_id AND d.owner_id = f.owner_id;
+
+
+-- ─────────────────────────────────────────────────────────────
+-- File counters  (per owner on users.file_count / users.storage_used,
+-- per folder on folders.file_count / folders.size_bytes)
+-- Kept in step with files by fn_files_counters() so listings and
+-- usage stats report totals without aggregating the owner's rows.
+-- Because storage_used moves in the same transaction as the file
+-- rows, chk_users_storage_within_quota enforces the quota.  File
+-- counts and folder sizes cover live files only; storage_used also
+-- covers trashed files, whose bytes are kept until they are purged,
+-- and earlier versions (see fn_file_versions_counters()).
+-- ─────────────────────────────────────────────────────────────
+
+-- Statement-level so a bulk INSERT / UPDATE / DELETE touches each
+-- counter row once, however many files it affects.
+CREATE OR REPLACE FUNCTION fn_files_counters()
+RETURNS TRIGGER AS $$
+DECLARE
+    owners     UUID[];
+    folder_ids UUID[];
+    counts     BIGINT[];   -- live files
+    sizes      BIGINT[];   -- bytes of live files
+    stored     BIGINT[];   -- bytes of all files, trashed included
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(owner_id), array_agg(folder_id), array_agg(n), array_agg(b), array_agg(s)
+          INTO owners, folder_ids, counts, sizes, stored
+          FROM (SELECT owner_id, folder_id,
+                       COUNT(*) FILTER (WHERE trashed_at IS NULL) AS n,
+                       COALESCE(SUM(size_bytes) FILTER (WHERE trashed_at IS NULL), 0) AS b,
+                       SUM(size_bytes) AS s
+                  FROM new_rows
+                 GROUP BY owner_id, folder_id) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(owner_id), array_agg(folder_id), array_agg(n), array_agg(b), array_agg(s)
+          INTO owners, folder_ids, counts, sizes, stored
+          FROM (SELECT owner_id, folder_id,
+                       -COUNT(*) FILTER (WHERE trashed_at IS NULL) AS n,
+                       -COALESCE(SUM(size_bytes) FILTER (WHERE trashed_at IS NULL), 0) AS b,
+                       -SUM(size_bytes) AS s
+                  FROM old_rows
+                 GROUP BY owner_id, folder_id) d;
+    ELSE
+        SELECT array_agg(owner_id), array_agg(folder_id), array_agg(n), array_agg(b), array_agg(s)
+          INTO owners, folder_ids, counts, sizes, stored
+          FROM (SELECT owner_id, folder_id, SUM(n) AS n, SUM(b) AS b, SUM(s) AS s
+                  FROM (SELECT nr.owner_id, nr.folder_id,
+                               (nr.trashed_at IS NULL)::INT AS n,
+                               CASE WHEN nr.trashed_at IS NULL THEN nr.size_bytes ELSE 0 END AS b,
+                               nr.size_bytes AS s
+                          FROM old_rows o JOIN new_rows nr USING (file_id)
+                         WHERE (o.owner_id, o.folder_id, o.size_bytes, o.trashed_at IS NULL)
+                               IS DISTINCT FROM (nr.owner_id, nr.folder_id, nr.size_bytes, nr.trashed_at IS NULL)
+                        UNION ALL
+                        SELECT o.owner_id, o.folder_id,
+                               -(o.trashed_at IS NULL)::INT AS n,
+                               CASE WHEN o.trashed_at IS NULL THEN -o.size_bytes ELSE 0 END AS b,
+                               -o.size_bytes AS s
+                          FROM old_rows o JOIN new_rows nr USING (file_id)
+                         WHERE (o.owner_id, o.folder_id, o.size_bytes, o.trashed_at IS NULL)
+                               IS DISTINCT FROM (nr.owner_id, nr.folder_id, nr.size_bytes, nr.trashed_at IS NULL)) m
+                 GROUP BY owner_id, folder_id
+                HAVING SUM(n) <> 0 OR SUM(b) <> 0 OR SUM(s) <> 0) d;
+    END IF;
+
+    IF owners IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Each changed folder gets the direct delta; it and every ancestor get
+    -- the subtree delta.  Rows already removed by users(...) ON DELETE
+    -- CASCADE simply match nothing.
+    UPDATE folders f
+       SET file_count      = f.file_count + t.dn,
+           size_bytes      = f.size_bytes + t.db,
+           tree_file_count = f.tree_file_count + t.n,
+           tree_size_bytes = f.tree_size_bytes + t.b
+      FROM (SELECT a.folder_id,
+                   COALESCE(SUM(d.n) FILTER (WHERE a.folder_id = d.folder_id), 0) AS dn,
+                   COALESCE(SUM(d.b) FILTER (WHERE a.folder_id = d.folder_id), 0) AS db,
+                   SUM(d.n) AS n,
+                   SUM(d.b) AS b
+              FROM unnest(folder_ids, counts, sizes) AS d(folder_id, n, b)
+              JOIN folders c ON c.folder_id = d.folder_id
+              JOIN folders a ON a.owner_id = c.owner_id
+                            AND a.path = ANY (fn_path_lineage(c.path))
+             WHERE d.n <> 0 OR d.b <> 0
+             GROUP BY a.folder_id) t
+     WHERE f.folder_id = t.folder_id;
+
+    UPDATE users u
+       SET file_count   = u.file_count + d.n,
+           storage_used = u.storage_used + d.s
+      FROM (SELECT owner_id, SUM(n) AS n, SUM(s) AS s
+              FROM unnest(owners, counts, stored) AS x(owner_id, n, s)
+             GROUP BY owner_id) d
+     WHERE u.user_id = d.owner_id
+       AND (d.n <> 0 OR d.s <> 0);
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_files_counters_insert
+    AFTER INSERT ON files
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_counters();
+
+CREATE TRIGGER trg_files_counters_update
+    AFTER UPDATE ON files
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_counters();
+
+CREATE TRIGGER trg_files_counters_delete
+    AFTER DELETE ON files
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_counters();
+
+-- ─────────────────────────────────────────────────────────────
+-- Usage rollups  (per owner: bytes and files by MIME family and by
+-- upload month, live files only)
+-- Kept in step with files by fn_files_usage_rollups() so storage
+-- breakdowns read a handful of rows instead of scanning files.  Age
+-- buckets are derived from the month rows at read time.
+-- ─────────────────────────────────────────────────────────────
+CREATE TABLE file_usage_rollups (
+    owner_id        UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    dimension       TEXT NOT NULL,
+    bucket          TEXT NOT NULL,
+
+    file_count      BIGINT NOT NULL DEFAULT 0,
+    size_bytes      BIGINT NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (owner_id, dimension, bucket)
+);
+
+ALTER TABLE file_usage_rollups
+    ADD CONSTRAINT chk_file_usage_rollups_dimension
+        CHECK (dimension IN ('mime_family', 'month')),
+    ADD CONSTRAINT chk_file_usage_rollups_counters_non_negative
+        CHECK (file_count >= 0 AND size_bytes >= 0);
+
+-- Statement-level, like fn_files_counters(): one upsert per touched
+-- (owner, dimension, bucket) however many files the statement affects.
+CREATE OR REPLACE FUNCTION fn_files_usage_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    owners  UUID[];
+    dims    TEXT[];
+    buckets TEXT[];
+    counts  BIGINT[];
+    sizes   BIGINT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(owner_id), array_agg(dimension), array_agg(bucket), array_agg(n), array_agg(b)
+          INTO owners, dims, buckets, counts, sizes
+          FROM (SELECT r.owner_id, k.dimension, k.bucket, COUNT(*) AS n, SUM(r.size_bytes) AS b
+                  FROM new_rows r,
+                       LATERAL (VALUES ('mime_family', split_part(r.mime_type, '/', 1)),
+                                       ('month', to_char(r.created_at AT TIME ZONE 'utc', 'YYYY-MM')))
+                               AS k(dimension, bucket)
+                 WHERE r.trashed_at IS NULL
+                 GROUP BY 1, 2, 3) d;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(owner_id), array_agg(dimension), array_agg(bucket), array_agg(n), array_agg(b)
+          INTO owners, dims, buckets, counts, sizes
+          FROM (SELECT r.owner_id, k.dimension, k.bucket, -COUNT(*) AS n, -SUM(r.size_bytes) AS b
+                  FROM old_rows r,
+                       LATERAL (VALUES ('mime_family', split_part(r.mime_type, '/', 1)),
+                                       ('month', to_char(r.created_at AT TIME ZONE 'utc', 'YYYY-MM')))
+                               AS k(dimension, bucket)
+                 WHERE r.trashed_at IS NULL
+                 GROUP BY 1, 2, 3) d;
+    ELSE
+        SELECT array_agg(owner_id), array_agg(dimension), array_agg(bucket), array_agg(n), array_agg(b)
+          INTO owners, dims, buckets, counts, sizes
+          FROM (SELECT r.owner_id, k.dimension, k.bucket, SUM(r.n) AS n, SUM(r.b) AS b
+                  FROM (SELECT nr.owner_id, nr.mime_type, nr.created_at, 1 AS n, nr.size_bytes AS b
+                          FROM old_rows o JOIN new_rows nr USING (file_id)
+                         WHERE nr.trashed_at IS NULL
+                           AND (o.owner_id, o.mime_type, o.created_at, o.size_bytes, o.trashed_at IS NULL)
+                               IS DISTINCT FROM (nr.owner_id, nr.mime_type, nr.created_at, nr.size_bytes, TRUE)
+                        UNION ALL
+                        SELECT o.owner_id, o.mime_type, o.created_at, -1 AS n, -o.size_bytes AS b
+                          FROM old_rows o JOIN new_rows nr USING (file_id)
+                         WHERE o.trashed_at IS NULL
+                           AND (o.owner_id, o.mime_type, o.created_at, o.size_bytes, TRUE)
+                               IS DISTINCT FROM (nr.owner_id, nr.mime_type, nr.created_at, nr.size_bytes, nr.trashed_at IS NULL)) r,
+                       LATERAL (VALUES ('mime_family', split_part(r.mime_type, '/', 1)),
+                                       ('month', to_char(r.created_at AT TIME ZONE 'utc', 'YYYY-MM')))
+                               AS k(dimension, bucket)
+                 GROUP BY 1, 2, 3
+                HAVING SUM(r.n) <> 0 OR SUM(r.b) <> 0) d;
+    END IF;
+
+    IF owners IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- Growing buckets may be new; shrinking ones always exist, and are
+    -- only updated so rows already removed by users(...) ON DELETE
+    -- CASCADE are not re-created.
+    INSERT INTO file_usage_rollups AS r (owner_id, dimension, bucket, file_count, size_bytes)
+    SELECT o, dm, bk, n, b
+      FROM unnest(owners, dims, buckets, counts, sizes) AS d(o, dm, bk, n, b)
+     WHERE n > 0
+    ON CONFLICT (owner_id, dimension, bucket) DO UPDATE
+       SET file_count = r.file_count + EXCLUDED.file_count,
+           size_bytes = r.size_bytes + EXCLUDED.size_bytes;
+
+    UPDATE file_usage_rollups r
+       SET file_count = r.file_count + d.n,
+           size_bytes = r.size_bytes + d.b
+      FROM unnest(owners, dims, buckets, counts, sizes) AS d(o, dm, bk, n, b)
+     WHERE d.n <= 0
+       AND (r.owner_id, r.dimension, r.bucket) = (d.o, d.dm, d.bk);
+
+    DELETE FROM file_usage_rollups r
+     USING unnest(owners, dims, buckets) AS d(o, dm, bk)
+     WHERE (r.owner_id, r.dimension, r.bucket) = (d.o, d.dm, d.bk)
+       AND r.file_count = 0;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_files_usage_rollups_insert
+    AFTER INSERT ON files
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_usage_rollups();
+
+CREATE TRIGGER trg_files_usage_rollups_update
+    AFTER UPDATE ON files
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_usage_rollups();
+
+CREATE TRIGGER trg_files_usage_rollups_delete
+    AFTER DELETE ON files
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_usage_rollups();
+
+
+-- ─────────────────────────────────────────────────────────────
+-- File versions  (one row per earlier version of a file)
+--
+-- Replacing a file's content moves its current version here and
+-- bumps files.version_no; restoring copies a row back as the newest
+-- version.  Versions of one file with the same content share one
+-- object, so object_key may repeat within a file and an object is
+-- removed only once no version of the file (current included) uses
+-- it.  Rows are immutable; fn_file_versions_counters() charges them
+-- to the owner's storage_used, and a background pruner enforces the
+-- retention policy.
+-- ─────────────────────────────────────────────────────────────
+CREATE TABLE file_versions (
+    file_id         UUID NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+    version_no      INT NOT NULL,
+    owner_id        UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+
+    -- Content
+    object_key      TEXT NOT NULL,
+    mime_type       VARCHAR(255) NOT NULL,
+    size_bytes      BIGINT NOT NULL,
+    sha256_hex      CHAR(64) NOT NULL,
+
+    -- Became current / was replaced
+    created_at      TIMESTAMPTZ NOT NULL,
+    superseded_at   TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+
+    PRIMARY KEY (file_id, version_no)
+);
+
+ALTER TABLE file_versions
+    ADD CONSTRAINT chk_file_versions_version_no_positive
+        CHECK (version_no > 0),
+    ADD CONSTRAINT chk_file_versions_size_positive
+        CHECK (size_bytes > 0),
+    ADD CONSTRAINT chk_file_versions_sha256_format
+        CHECK (sha256_hex ~ '^[a-f0-9]{64}$');
+
+-- Per-owner totals and the pruner's age scan
+CREATE INDEX idx_file_versions_owner_id      ON file_versions(owner_id);
+CREATE INDEX idx_file_versions_superseded_at ON file_versions(superseded_at);
+
+-- Statement-level, like fn_files_counters().  Rows already removed by
+-- users(...) ON DELETE CASCADE simply match nothing.
+CREATE OR REPLACE FUNCTION fn_file_versions_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE users u
+           SET storage_used = u.storage_used + d.b
+          FROM (SELECT owner_id, SUM(size_bytes) AS b FROM new_rows GROUP BY owner_id) d
+         WHERE u.user_id = d.owner_id;
+    ELSE
+        UPDATE users u
+           SET storage_used = u.storage_used - d.b
+          FROM (SELECT owner_id, SUM(size_bytes) AS b FROM old_rows GROUP BY owner_id) d
+         WHERE u.user_id = d.owner_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_file_versions_counters_insert
+    AFTER INSERT ON file_versions
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_file_versions_counters();
+
+CREATE TRIGGER trg_file_versions_counters_delete
+    AFTER DELETE ON file_versions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_file_versions_counters();
+
+
+-- ─────────────────────────────────────────────────────────────
+-- File change log  (per-owner delta-sync feed)
+--
+-- One row per created / renamed / moved / deleted / rewritten /
+-- trashed / restored file and per created / moved / deleted folder,
+-- appended by triggers on files
+-- and folders.  seq is per owner and handed out by bumping
+-- users.change_seq, which row-locks the owner until commit: an owner's
+-- changes therefore commit in seq order and a reader's cursor never
+-- skips a row that commits later.  Superseded rows are compacted and
+-- old ones pruned by fn_compact_file_changes(), which raises
+-- users.change_floor; cursors below the floor must resync.
+-- ─────────────────────────────────────────────────────────────
+CREATE TABLE file_changes (
+    owner_id        UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    seq             BIGINT NOT NULL,
+
+    -- Subject: exactly one of the two
+    file_id         UUID,
+    folder_id       UUID,
+
+    kind            TEXT NOT NULL,
+    changed_at      TIMESTAMPTZ NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+
+    PRIMARY KEY (owner_id, seq)
+);
+
+ALTER TABLE file_changes
+    ADD CONSTRAINT chk_file_changes_one_subject
+        CHECK ((file_id IS NULL) <> (folder_id IS NULL)),
+    ADD CONSTRAINT chk_file_changes_kind
+        CHECK (kind IN ('created', 'renamed', 'moved', 'deleted', 'content_changed',
+                        'trashed', 'restored',
+                        'folder_created', 'folder_moved', 'folder_deleted'));
+
+-- Retention sweeps
+CREATE INDEX idx_file_changes_changed_at ON file_changes(changed_at);
+
+-- Append changes, numbering them per owner from users.change_seq, and
+-- notify listeners of each owner's new head.  Owners already removed by
+-- users(...) ON DELETE CASCADE log nothing.
+CREATE OR REPLACE FUNCTION fn_log_file_changes(
+    p_owners     UUID[],
+    p_file_ids   UUID[],
+    p_folder_ids UUID[],
+    p_kinds      TEXT[]
+)
+RETURNS VOID AS $$
+    WITH ev AS (
+        SELECT o AS owner_id, fi AS file_id, fo AS folder_id, k AS kind,
+               row_number() OVER (PARTITION BY o ORDER BY ord) AS rn
+          FROM unnest(p_owners, p_file_ids, p_folder_ids, p_kinds)
+               WITH ORDINALITY AS e(o, fi, fo, k, ord)
+    ),
+    bumped AS (
+        UPDATE users u
+           SET change_seq = u.change_seq + c.n
+          FROM (SELECT owner_id, COUNT(*) AS n FROM ev GROUP BY owner_id) c
+         WHERE u.user_id = c.owner_id
+        RETURNING u.user_id, u.change_seq - c.n AS base
+    ),
+    logged AS (
+        INSERT INTO file_changes (owner_id, seq, file_id, folder_id, kind)
+        SELECT ev.owner_id, b.base + ev.rn, ev.file_id, ev.folder_id, ev.kind
+          FROM ev JOIN bumped b ON b.user_id = ev.owner_id
+        RETURNING owner_id, seq
+    )
+    -- Delivered at commit, to every listening API worker: '<owner_id>:<seq>'.
+    SELECT pg_notify('file_changes', owner_id::TEXT || ':' || MAX(seq))
+      FROM logged
+     GROUP BY owner_id;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION fn_files_log_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    owners   UUID[];
+    file_ids UUID[];
+    kinds    TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(owner_id ORDER BY file_id), array_agg(file_id ORDER BY file_id),
+               array_agg('created'::TEXT ORDER BY file_id)
+          INTO owners, file_ids, kinds
+          FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(owner_id ORDER BY file_id), array_agg(file_id ORDER BY file_id),
+               array_agg('deleted'::TEXT ORDER BY file_id)
+          INTO owners, file_ids, kinds
+          FROM old_rows;
+    ELSE
+        -- One change per row; entering or leaving the trash beats content
+        -- beats a move beats a rename.  Changes inside the trash are not
+        -- logged.
+        SELECT array_agg(owner_id ORDER BY file_id), array_agg(file_id ORDER BY file_id),
+               array_agg(kind ORDER BY file_id)
+          INTO owners, file_ids, kinds
+          FROM (SELECT nr.owner_id, nr.file_id,
+                       CASE
+                           WHEN o.trashed_at IS NULL AND nr.trashed_at IS NOT NULL THEN 'trashed'
+                           WHEN o.trashed_at IS NOT NULL AND nr.trashed_at IS NULL THEN 'restored'
+                           WHEN nr.trashed_at IS NOT NULL THEN NULL
+                           WHEN (o.sha256_hex, o.size_bytes) IS DISTINCT FROM (nr.sha256_hex, nr.size_bytes)
+                               THEN 'content_changed'
+                           WHEN o.folder_id IS DISTINCT FROM nr.folder_id THEN 'moved'
+                           WHEN o.current_name IS DISTINCT FROM nr.current_name THEN 'renamed'
+                       END AS kind
+                  FROM old_rows o JOIN new_rows nr USING (file_id)) c
+         WHERE kind IS NOT NULL;
+    END IF;
+
+    IF owners IS NOT NULL THEN
+        PERFORM fn_log_file_changes(owners, file_ids, array_fill(NULL::UUID, ARRAY[cardinality(owners)]), kinds);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_files_log_changes_insert
+    AFTER INSERT ON files
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_log_changes();
+
+CREATE TRIGGER trg_files_log_changes_update
+    AFTER UPDATE ON files
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_log_changes();
+
+CREATE TRIGGER trg_files_log_changes_delete
+    AFTER DELETE ON files
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_files_log_changes();
+
+-- Folder rows also change when their counters move; only path changes
+-- (rename / move, including every descendant of a moved folder) are logged.
+CREATE OR REPLACE FUNCTION fn_folders_log_changes()
+RETURNS TRIGGER AS $$
+DECLARE
+    owners     UUID[];
+    folder_ids UUID[];
+    kinds      TEXT[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(owner_id ORDER BY path), array_agg(folder_id ORDER BY path),
+               array_agg('folder_created'::TEXT ORDER BY path)
+          INTO owners, folder_ids, kinds
+          FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(owner_id ORDER BY path), array_agg(folder_id ORDER BY path),
+               array_agg('folder_deleted'::TEXT ORDER BY path)
+          INTO owners, folder_ids, kinds
+          FROM old_rows;
+    ELSE
+        SELECT array_agg(nr.owner_id ORDER BY nr.path), array_agg(nr.folder_id ORDER BY nr.path),
+               array_agg('folder_moved'::TEXT ORDER BY nr.path)
+          INTO owners, folder_ids, kinds
+          FROM old_rows o JOIN new_rows nr USING (folder_id)
+         WHERE o.path <> nr.path;
+    END IF;
+
+    IF owners IS NOT NULL THEN
+        PERFORM fn_log_file_changes(owners, array_fill(NULL::UUID, ARRAY[cardinality(owners)]), folder_ids, kinds);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_folders_log_changes_insert
+    AFTER INSERT ON folders
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_folders_log_changes();
+
+CREATE TRIGGER trg_folders_log_changes_update
+    AFTER UPDATE ON folders
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_folders_log_changes();
+
+CREATE TRIGGER trg_folders_log_changes_delete
+    AFTER DELETE ON folders
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_folders_log_changes();
+
+-- Keep one owner's log bounded: drop every change superseded by a later
+-- change to the same file or folder (readers always get current state,
+-- so only the latest change matters), then drop changes older than
+-- p_retain and raise change_floor past them.  Returns the rows removed.
+CREATE OR REPLACE FUNCTION fn_compact_file_changes(
+    p_owner_id UUID,
+    p_retain   INTERVAL
+)
+RETURNS BIGINT AS $$
+DECLARE
+    v_superseded BIGINT;
+    v_expired    BIGINT;
+    v_floor      BIGINT;
+BEGIN
+    DELETE FROM file_changes c
+     USING (SELECT seq,
+                   row_number() OVER (PARTITION BY COALESCE(file_id, folder_id)
+                                      ORDER BY seq DESC) AS rn
+              FROM file_changes
+             WHERE owner_id = p_owner_id) x
+     WHERE c.owner_id = p_owner_id
+       AND c.seq = x.seq
+       AND x.rn > 1;
+    GET DIAGNOSTICS v_superseded = ROW_COUNT;
+
+    WITH expired AS (
+        DELETE FROM file_changes
+         WHERE owner_id = p_owner_id
+           AND changed_at < (NOW() AT TIME ZONE 'utc') - p_retain
+        RETURNING seq
+    )
+    SELECT COUNT(*), MAX(seq) INTO v_expired, v_floor FROM expired;
+
+    IF v_floor IS NOT NULL THEN
+        UPDATE users
+           SET change_floor = GREATEST(change_floor, v_floor)
+         WHERE user_id = p_owner_id;
+    END IF;
+
+    RETURN v_superseded + v_expired;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ─────────────────────────────────────────────────────────────
+-- Counter reconciliation
+--
+-- Compare one owner's trigger-maintained counters (users, folders,
+-- file_usage_rollups) with the files they describe and, when p_repair
+-- is set, overwrite the ones that drifted.  Returns one row per drifted
+-- counter: scope 'user', 'folder' (direct), 'folder_tree' (subtree), or
+-- a rollup dimension ('mime_family' / 'month', with its bucket).  The
+-- owner's folder and user rows are locked first, in the triggers' order,
+-- so concurrent file writes wait instead of racing the comparison.
+-- ─────────────────────────────────────────────────────────────
+CREATE OR REPLACE FUNCTION fn_reconcile_file_counters(
+    p_owner_id UUID,
+    p_repair   BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+    scope             TEXT,
+    id                UUID,
+    bucket            TEXT,
+    owner_id          UUID,
+    file_count        BIGINT,
+    actual_file_count BIGINT,
+    size_bytes        BIGINT,
+    actual_size_bytes BIGINT
+) AS $$
+#variable_conflict use_column
+BEGIN
+    PERFORM 1 FROM folders WHERE owner_id = p_owner_id ORDER BY folder_id FOR UPDATE;
+    PERFORM 1 FROM users WHERE user_id = p_owner_id FOR UPDATE;
+
+    RETURN QUERY
+    WITH direct AS (
+        SELECT folder_id,
+               COUNT(*) FILTER (WHERE trashed_at IS NULL) AS n,
+               COALESCE(SUM(size_bytes) FILTER (WHERE trashed_at IS NULL), 0)::BIGINT AS b,
+               SUM(size_bytes)::BIGINT AS s
+          FROM files
+         WHERE owner_id = p_owner_id
+         GROUP BY folder_id
+    ),
+    tree AS (
+        SELECT a.folder_id, SUM(x.n)::BIGINT AS n, SUM(x.b)::BIGINT AS b
+          FROM direct x
+          JOIN folders c ON c.folder_id = x.folder_id
+          JOIN folders a ON a.owner_id = p_owner_id
+                        AND a.path = ANY (fn_path_lineage(c.path))
+         GROUP BY a.folder_id
+    ),
+    usage AS (
+        SELECT k.dimension, k.bucket, COUNT(*) AS n, SUM(f.size_bytes)::BIGINT AS b
+          FROM files f,
+               LATERAL (VALUES ('mime_family', split_part(f.mime_type, '/', 1)),
+                               ('month', to_char(f.created_at AT TIME ZONE 'utc', 'YYYY-MM')))
+                       AS k(dimension, bucket)
+         WHERE f.owner_id = p_owner_id AND f.trashed_at IS NULL
+         GROUP BY 1, 2
+    ),
+    drift AS (
+        SELECT 'folder'::TEXT AS scope, d.folder_id AS id, NULL::TEXT AS bucket, d.owner_id,
+               d.file_count, COALESCE(x.n, 0) AS actual_file_count,
+               d.size_bytes, COALESCE(x.b, 0) AS actual_size_bytes
+          FROM folders d
+          LEFT JOIN direct x USING (folder_id)
+         WHERE d.owner_id = p_owner_id
+           AND (d.file_count, d.size_bytes)
+               IS DISTINCT FROM (COALESCE(x.n, 0), COALESCE(x.b, 0))
+        UNION ALL
+        SELECT 'folder_tree', d.folder_id, NULL, d.owner_id,
+               d.tree_file_count, COALESCE(t.n, 0),
+               d.tree_size_bytes, COALESCE(t.b, 0)
+          FROM folders d
+          LEFT JOIN tree t USING (folder_id)
+         WHERE d.owner_id = p_owner_id
+           AND (d.tree_file_count, d.tree_size_bytes)
+               IS DISTINCT FROM (COALESCE(t.n, 0), COALESCE(t.b, 0))
+        UNION ALL
+        SELECT 'user', u.user_id, NULL, u.user_id,
+               u.file_count, a.n,
+               u.storage_used, a.b
+          FROM users u,
+               (SELECT COALESCE(SUM(n), 0)::BIGINT AS n,
+                       (COALESCE(SUM(s), 0)
+                        + (SELECT COALESCE(SUM(size_bytes), 0)
+                             FROM file_versions
+                            WHERE owner_id = p_owner_id))::BIGINT AS b
+                  FROM direct) a
+         WHERE u.user_id = p_owner_id
+           AND (u.file_count, u.storage_used) IS DISTINCT FROM (a.n, a.b)
+        UNION ALL
+        SELECT COALESCE(r.dimension, g.dimension), p_owner_id, COALESCE(r.bucket, g.bucket), p_owner_id,
+               COALESCE(r.file_count, 0), COALESCE(g.n, 0),
+               COALESCE(r.size_bytes, 0), COALESCE(g.b, 0)
+          FROM (SELECT * FROM file_usage_rollups WHERE owner_id = p_owner_id) r
+          FULL JOIN usage g ON g.dimension = r.dimension AND g.bucket = r.bucket
+         WHERE (r.file_count, r.size_bytes) IS DISTINCT FROM (g.n, g.b)
+    ),
+    fixed_folders AS (
+        UPDATE folders d
+           SET file_count      = COALESCE(x.n, 0),
+               size_bytes      = COALESCE(x.b, 0),
+               tree_file_count = COALESCE(t.n, 0),
+               tree_size_bytes = COALESCE(t.b, 0)
+          FROM (SELECT DISTINCT id FROM drift WHERE scope IN ('folder', 'folder_tree')) c
+          LEFT JOIN direct x ON x.folder_id = c.id
+          LEFT JOIN tree t ON t.folder_id = c.id
+         WHERE p_repair AND d.folder_id = c.id
+    ),
+    fixed_users AS (
+        UPDATE users u
+           SET file_count   = c.actual_file_count,
+               storage_used = c.actual_size_bytes
+          FROM drift c
+         WHERE p_repair AND c.scope = 'user' AND u.user_id = c.id
+    ),
+    fixed_rollups AS (
+        INSERT INTO file_usage_rollups AS r (owner_id, dimension, bucket, file_count, size_bytes)
+        SELECT p_owner_id, c.scope, c.bucket, c.actual_file_count, c.actual_size_bytes
+          FROM drift c
+         WHERE p_repair AND c.bucket IS NOT NULL AND c.actual_file_count > 0
+        ON CONFLICT (owner_id, dimension, bucket) DO UPDATE
+           SET file_count = EXCLUDED.file_count,
+               size_bytes = EXCLUDED.size_bytes
+    ),
+    dropped_rollups AS (
+        DELETE FROM file_usage_rollups r
+         USING drift c
+         WHERE p_repair AND c.bucket IS NOT NULL AND c.actual_file_count = 0
+           AND r.owner_id = p_owner_id AND r.dimension = c.scope AND r.bucket = c.bucket
+    )
+    SELECT * FROM drift;
+END;
+$$ LANGUAGE plpgsql;
+
 
 -- ─────────────────────────────────────────────────────────────
 -- Files Audit
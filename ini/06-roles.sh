@@ -52,14 +52,23 @@ psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" \
     -- Core application tables  (SELECT, INSERT, UPDATE, DELETE)
     -- ─────────────────────────────────────────────────────────────
     GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE
-        users 
+        users,
+        folders,
+        files,
+        file_versions,
+        file_usage_rollups,
+        file_changes
         -- groups,
         -- group_members,
-        -- files_metadata,
         -- shared_files,
         -- refresh_tokens
     TO secure_drive;
 
+    -- Read-only views over the core tables
+    GRANT SELECT ON TABLE
+        v_files
+    TO secure_drive;
+
     -- ─────────────────────────────────────────────────────────────
     -- Audit tables  (INSERT only — the app appends but never edits)
     -- ─────────────────────────────────────────────────────────────